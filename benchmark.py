@@ -0,0 +1,1417 @@
+#!/usr/bin/env python3
+# 计时器上位机性能基准测试
+
+import argparse
+import datetime
+import functools
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+
+from task_thread.capture import CaptureWriter, replay_capture
+from task_thread.communication import CommunicationHub, FrameDecoder, SerialLink, TcpServerLink
+from timer_simulator import SimulatedTimer, open_transport
+
+HISTORY_FILE = "benchmark_history.jsonl"
+
+
+def legacy_parse(line, pattern_callbacks, reset_callback):
+    """ 旧版逐行解析路径：解码、去空白后对每个模式各执行一次 re.search。 """
+    data = line.decode('ascii', errors='ignore').strip()
+    if "Reset" in data:
+        reset_callback(None)
+        return
+    for pattern, callback in pattern_callbacks:
+        match = re.search(pattern, data)
+        if match:
+            callback(float(match.group(1)) / 1000)
+
+
+def generate_feed(seconds, rate=100):
+    """
+    生成模拟计时器输出：每个节拍一帧实时时间，每 20 秒一帧最终成绩与一帧 Reset。
+
+    :return: list，按行切分的原始字节数据。
+    """
+    lines = []
+    for tick in range(int(seconds * rate)):
+        milliseconds = tick * 1000 // rate
+        lines.append(b"{%d}\r\n" % milliseconds)
+        if tick and tick % (20 * rate) == 0:
+            lines.append(b"[%d]\r\n" % milliseconds)
+            lines.append(b"Reset\r\n")
+    return lines
+
+
+def best_of(repeat, function, *args):
+    """ 重复执行并返回最短耗时（秒）。 """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_decoder(args):
+    lines = generate_feed(args.seconds)
+    stream = b"".join(lines)
+    chunks = [stream[i:i + 1024] for i in range(0, len(stream), 1024)]
+    total_frames = len(lines)
+
+    def run_legacy(packets):
+        sink = []
+        pattern_callbacks = [
+            (r"\{([-+]?\d*\.\d+|\d+)\}", sink.append),
+            (r"\[([-+]?\d*\.\d+|\d+)\]", sink.append),
+        ]
+        for packet in packets:
+            legacy_parse(packet, pattern_callbacks, sink.append)
+        return sink
+
+    def run_decoder(packets):
+        sink = []
+        decoder = FrameDecoder()
+        for packet in packets:
+            sink.extend(decoder.feed(packet))
+        return sink
+
+    print(f"数据量: {len(lines)} 行 / {len(stream)} 字节（{args.seconds} 秒 @ 100Hz）")
+    for name, packets in (("逐行读取", lines), ("1024 字节分包", chunks)):
+        legacy = best_of(args.repeat, run_legacy, packets)
+        streaming = best_of(args.repeat, run_decoder, packets)
+        print(f"[{name}] 旧版逐行正则: {legacy * 1e9 / len(stream):.1f} ns/字节，"
+              f"解析出 {len(run_legacy(packets))}/{total_frames} 帧")
+        print(f"[{name}] 增量帧解码器: {streaming * 1e9 / len(stream):.1f} ns/字节，"
+              f"解析出 {len(run_decoder(packets))}/{total_frames} 帧")
+
+
+class CountingMailbox:
+    """ 不合并实时帧、只计数的邮箱，用于统计通信中枢投递的全部帧。 """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = {"real": 0, "final": 0, "reset": 0}
+
+    def post_real(self, _):
+        with self.lock:
+            self.received["real"] += 1
+
+    def post_event(self, kind, value=None, timestamp=None):
+        with self.lock:
+            self.received[kind] += 1
+
+    def total(self):
+        return sum(self.received.values())
+
+
+def temporary_console():
+    """ 创建比赛记录与原始数据记录都写入临时目录的控制台，测试不会写入正式的比赛记录。 """
+    from widget.console import Console
+
+    directory = tempfile.mkdtemp()
+    return Console(os.path.join(directory, "journal"), os.path.join(directory, "capture"))
+
+
+def connect_with_retry(host, port, timeout=5.0):
+    """ 服务器线程启动需要时间，重试连接直到成功或超时。 """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+class ClientCountingMailbox(CountingMailbox):
+    """ 按帧数值区分客户端的邮箱：客户端 i 发送的实时帧与成绩帧数值为 i * CLIENT_SPAN + 序号。 """
+
+    CLIENT_SPAN = 1000000
+
+    def __init__(self, clients):
+        super().__init__()
+        self.per_client = [0] * clients
+
+    def _count(self, value):
+        with self.lock:
+            self.per_client[round(value * 1000) // self.CLIENT_SPAN] += 1
+
+    def post_real(self, value):
+        super().post_real(value)
+        self._count(value)
+
+    def post_event(self, kind, value=None, timestamp=None):
+        super().post_event(kind, value, timestamp)
+        if kind == "final":
+            self._count(value)
+
+
+def bench_tcp(args):
+    assert args.frames < ClientCountingMailbox.CLIENT_SPAN, "每个客户端的帧数过多，无法区分客户端"
+    mailbox = ClientCountingMailbox(args.clients)
+    hub = CommunicationHub(mailbox)
+    hub.start()
+    server = TcpServerLink("127.0.0.1", 0)
+    hub.add_link(server)
+
+    # 每个客户端发送的数据按 7 字节随机切片，模拟拆包与粘包
+    def client_worker(index):
+        base = index * ClientCountingMailbox.CLIENT_SPAN
+        payload = b"".join(b"{%d}" % (base + tick) for tick in range(args.frames)) + \
+            b"[%d]Reset" % (base + args.frames)
+        with connect_with_retry("127.0.0.1", server.port) as client:
+            for i in range(0, len(payload), 7):
+                client.sendall(payload[i:i + 7])
+
+    workers = [threading.Thread(target=client_worker, args=(index,)) for index in range(args.clients)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    expected = args.clients * (args.frames + 2)
+    deadline = time.monotonic() + 10
+    while mailbox.total() < expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    stop_start = time.perf_counter()
+    hub.stop()
+    hub.wait()
+    stop_elapsed = time.perf_counter() - stop_start
+
+    print(f"客户端: {args.clients}，每个客户端 {args.frames + 2} 帧")
+    print(f"收到帧: {mailbox.total()}/{expected} {mailbox.received}")
+    print(f"吞吐量: {mailbox.total() / elapsed:.0f} 帧/秒")
+    print(f"停止耗时: {stop_elapsed * 1000:.1f} ms")
+
+    failures = []
+    for index, count in enumerate(mailbox.per_client):
+        if count != args.frames + 1:
+            failures.append(f"客户端 {index} 收到实时帧与成绩帧 {count}/{args.frames + 1}")
+    if mailbox.received["reset"] != args.clients:
+        failures.append(f"收到 Reset {mailbox.received['reset']}/{args.clients}")
+    if stop_elapsed * 1000 > args.max_stop_ms:
+        failures.append(f"停止耗时 {stop_elapsed * 1000:.1f} ms 超过 {args.max_stop_ms} ms")
+    for failure in failures:
+        print(f"失败: {failure}")
+    if failures:
+        raise SystemExit(1)
+
+
+def bench_serial(args):
+    if not hasattr(os, "openpty"):
+        print("当前平台不支持伪终端，无法进行串口测试")
+        return
+
+    # 伪终端的从端作为串口交给 SerialLink，主端模拟计时器写入数据
+    master, slave = os.openpty()
+    mailbox = CountingMailbox()
+    hub = CommunicationHub(mailbox)
+    hub.start()
+    hub.add_link(SerialLink(os.ttyname(slave), 115200))
+
+    # 空闲阶段：无数据输入时的 CPU 占用（process_time 统计本进程全部线程）
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(args.idle)
+    idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+    # 满载阶段：按给定频率写入实时帧
+    interval = 1 / args.rate
+    total = int(args.rate * args.seconds)
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for tick in range(total):
+        os.write(master, b"{%d}\r\n" % tick)
+        delay = start + (tick + 1) * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    deadline = time.monotonic() + 5
+    while mailbox.total() < total and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    busy_cpu = (time.process_time() - cpu_start) / elapsed
+
+    hub.stop()
+    hub.wait()
+    os.close(master)
+    os.close(slave)
+
+    print(f"空闲 CPU 占用: {idle_cpu * 100:.1f}%（{args.idle} 秒）")
+    print(f"满载 CPU 占用: {busy_cpu * 100:.1f}%（含模拟写入线程）")
+    print(f"收到帧: {mailbox.total()}/{total}，{mailbox.total() / elapsed:.0f} 帧/秒")
+
+
+def bench_receiver(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from task_thread.receiver_process import ReceiverProcess
+
+    app = QApplication.instance() or QApplication([])
+    console = temporary_console()
+    console.receiver_process = ReceiverProcess()
+    console.receiver_process.start()
+    console.open_udp_server(("127.0.0.1", args.port))
+    time.sleep(1)  # 等待接收进程启动并绑定端口
+
+    # 发送线程持续发出最终成绩，同时界面线程阻塞
+    sent = []
+
+    def sender():
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+            for index in range(args.finals):
+                sent.append(time.time())
+                udp.sendto(b"[%d]" % (10000 + index), ("127.0.0.1", args.port))
+                time.sleep(args.block / args.finals)
+
+    progress = console.race_data["比赛进度"]
+    records = console.race_data["队伍名单"][progress]["所有成绩"]
+    existing = len(records)
+
+    worker = threading.Thread(target=sender)
+    worker.start()
+    time.sleep(args.block)  # 模拟界面线程被模态对话框或文件读写阻塞
+    worker.join()
+
+    drain_time = time.time()
+    deadline = time.monotonic() + 5
+    while len(records) - existing < args.finals and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    received = records[existing:]
+    errors = [abs(record["接收时间"] - sent_at) for record, sent_at in zip(received, sent)]
+    console.close()
+
+    print(f"界面阻塞 {args.block} 秒，发送最终成绩 {args.finals} 条，收到 {len(received)} 条")
+    if received:
+        print(f"接收时间与发送时间最大偏差: {max(errors) * 1000:.1f} ms")
+        print(f"最早一条接收时间比界面取出时刻早: {drain_time - received[0]['接收时间']:.2f} 秒")
+
+    failures = []
+    if len(received) != args.finals:
+        failures.append(f"收到最终成绩 {len(received)}/{args.finals} 条")
+    late = sum(error * 1000 > args.max_error_ms for error in errors)
+    if late:
+        failures.append(f"{late} 条成绩的接收时间与发送时间偏差超过 {args.max_error_ms} ms")
+    for failure in failures:
+        print(f"失败: {failure}")
+    if failures:
+        raise SystemExit(1)
+
+
+def bench_replay(args):
+    path = args.path
+    if path is None:
+        # 未指定记录文件时生成一份 100Hz 的模拟记录
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.cap")
+        capture = CaptureWriter(path)
+        for line in generate_feed(args.seconds):
+            capture.write("串口 模拟", line)
+        capture.close()
+
+    mailbox = CountingMailbox()
+    result = replay_capture(path, mailbox, args.speed)
+    print(f"记录文件: {path}（{os.path.getsize(path)} 字节）")
+    print(f"回放: {result['字节数']} 字节，{result['帧数']} 帧，耗时 {result['耗时']:.3f} 秒 {mailbox.received}")
+    print(f"吞吐量: {result['帧数'] / result['耗时']:.0f} 帧/秒")
+
+
+def percentile(values, percent):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def save_history(name, results):
+    """ 追加一条测试结果到历史文件，并返回同名测试的上一条结果。 """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+
+    previous = None
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "r", encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                if entry["测试"] == name:
+                    previous = entry
+
+    with open(HISTORY_FILE, "a", encoding="utf-8") as file:
+        entry = {"测试": name, "时间": datetime.datetime.now().isoformat(timespec="seconds"), "提交": commit,
+                 "结果": results}
+        file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return previous
+
+
+def bench_e2e(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication, QWidget
+
+    app = QApplication.instance() or QApplication([])
+    results = {}
+
+    for transport in args.transports:
+        console = temporary_console()
+        console.show()
+        console.project_to_screen(0)
+
+        # 成绩显示到投屏窗口的时刻：成绩写入后，显示状态推送到投屏窗口的实时时间并完成重绘；
+        # 实时时间的文本未变化（已显示为成绩）且没有待重绘的修改时，成绩已在屏幕上
+        shown_finals = []
+        display = {"新成绩": 0, "待重绘成绩": 0, "待重绘": False}
+        add_record = console.add_record
+        display_state = console.display_state
+        window = console.projector_windows[0][0]
+        label = window.display_labels["real_time"]
+        # QLabel 自行绘制；记分板的字段由窗口统一绘制
+        painted = label if isinstance(label, QWidget) else window
+
+        def settle(display=display, shown_finals=shown_finals):
+            if display["待重绘"]:
+                display["待重绘成绩"] += display["新成绩"]
+            else:
+                shown_finals.extend([time.perf_counter()] * display["新成绩"])
+            display["新成绩"] = 0
+
+        def record_added(time_value, received_at=None, add_record=add_record, display=display, settle=settle,
+                         display_state=display_state):
+            add_record(time_value, received_at)
+            display["新成绩"] += 1
+
+            # 本轮事件循环没有需要推送的修改时，由这里结算；否则在显示状态推送后结算
+            def check():
+                if display["新成绩"] and not display_state._scheduled:
+                    settle()
+
+            QTimer.singleShot(0, check)
+
+        console.add_record = record_added
+        # 在投屏窗口之后连接，推送时投屏窗口的标签已修改
+        display_state.changed.connect(lambda _, display=display, settle=settle: display["新成绩"] and settle())
+
+        def set_text(text, original=label.setText, display=display):
+            original(text)
+            display["待重绘"] = True
+
+        label.setText = set_text
+
+        def paint_event(event, paint=painted.paintEvent, display=display, shown_finals=shown_finals):
+            paint(event)
+            display["待重绘"] = False
+            shown_finals.extend([time.perf_counter()] * display["待重绘成绩"])
+            display["待重绘成绩"] = 0
+
+        painted.paintEvent = paint_event
+
+        if transport == "pty":
+            send, close, path = open_transport("pty")
+            console.open_serial_port((path, 115200))
+        else:
+            name = "TCP" if transport == "tcp" else "UDP"
+            open_link = console.open_tcp_server if transport == "tcp" else console.open_udp_server
+            open_link(("127.0.0.1", 0))
+            time.sleep(0.1)
+            send, close, _ = open_transport(transport, "127.0.0.1", console.communication_links[name].port)
+
+        device = SimulatedTimer(send, rate=args.rate, fragment=args.fragment, run_time=args.run_time, gap=0.2,
+                                runs=args.runs, seed=0)
+        mailbox = console.mailbox
+        frames_before = mailbox.real_posted + mailbox.events_posted
+        start = time.perf_counter()
+        device.start()
+
+        def check_finished():
+            if not device.is_alive() and len(shown_finals) >= len(device.sent_finals):
+                app.quit()
+            elif time.perf_counter() - start > args.run_time * args.runs * 2 + 10:
+                app.quit()
+
+        timer = QTimer()
+        timer.timeout.connect(check_finished)
+        timer.start(50)
+        app.exec()
+        timer.stop()
+
+        elapsed = time.perf_counter() - start
+        frames = mailbox.real_posted + mailbox.events_posted - frames_before
+        latencies = [(shown - sent) * 1000 for (_, sent), shown in zip(device.sent_finals, shown_finals)]
+        results[transport] = {
+            "成绩数": len(latencies),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "帧/秒": round(frames / elapsed),
+            "合并实时帧": mailbox.real_coalesced + mailbox.real_dropped,
+        }
+
+        console.close()
+        close()
+
+    print(f"实时帧频率 {args.rate} 帧/秒，每种传输 {args.runs} 轮（每轮 {args.run_time} 秒）")
+    previous = save_history("e2e", results)
+    for transport, result in results.items():
+        line = (f"[{transport}] 成绩延迟 p50 {result['p50']:.2f} ms / p95 {result['p95']:.2f} ms / "
+                f"p99 {result['p99']:.2f} ms，持续 {result['帧/秒']} 帧/秒")
+        if previous and transport in previous["结果"]:
+            old = previous["结果"][transport]
+            line += f"（上次 {previous['提交'] or previous['时间']}: p95 {old['p95']:.2f} ms，{old['帧/秒']} 帧/秒）"
+        print(line)
+
+
+def bench_countdown(args):
+    from PySide6.QtCore import QCoreApplication, QTimer
+    from race import Team
+    from task_thread.countdown import CountdownEngine
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    seconds = args.seconds
+
+    # 旧版：每 1000 ms 减 1
+    legacy_team = {"剩余时间": seconds}
+    legacy_timer = QTimer()
+    legacy_timer.timeout.connect(lambda: legacy_team.__setitem__("剩余时间", legacy_team["剩余时间"] - 1))
+
+    team = Team("", "", "", "正式比赛阶段", seconds)
+    engine = CountdownEngine(lambda: seconds)
+    wakeups = []
+    engine.remaining_changed.connect(lambda value: wakeups.append(value))
+
+    # 每个整秒预定一个提示，记录触发时刻相对整秒的延迟
+    cue_delays = []
+    for at in range(seconds - 1, seconds - int(args.run), -1):
+        engine.schedule("正式比赛阶段", at, lambda at=at: cue_delays.append((at - engine.remaining()) * 1000))
+
+    # 模拟界面线程周期性卡顿（模态对话框、文件读写等）
+    stall_timer = QTimer()
+    stall_timer.timeout.connect(lambda: time.sleep(args.stall / 1000))
+
+    start = time.monotonic()
+    legacy_timer.start(1000)
+    engine.attach(team)
+    engine.start()
+    stall_timer.start(args.stall_interval)
+    QTimer.singleShot(int(args.run * 1000), app.quit)
+    app.exec()
+    elapsed = time.monotonic() - start
+
+    expected = seconds - elapsed
+    print(f"运行 {elapsed:.2f} 秒，每 {args.stall_interval} ms 卡顿 {args.stall} ms，理论剩余 {expected:.3f} 秒")
+    print(f"旧版 QTimer 递减: 显示 {legacy_team['剩余时间']} 秒，误差 {legacy_team['剩余时间'] - expected:+.3f} 秒")
+    print(f"倒计时引擎: 显示 {team.remaining_time} 秒（精确 {engine.remaining():.3f}），"
+          f"误差 {engine.remaining() - expected:+.3f} 秒，唤醒 {len(wakeups)} 次")
+    print(f"整秒提示 {len(cue_delays)} 次，触发延迟 p50 {percentile(cue_delays, 50):.2f} ms，"
+          f"p95 {percentile(cue_delays, 95):.2f} ms（卡顿期间到期的提示在卡顿结束后立即补发）")
+
+
+def bench_clock(args):
+    from task_thread.realtime_clock import RealTimeClock
+
+    generator = random.Random(0)
+    print(f"模拟 {args.seconds} 秒计时，网络延迟 {args.delay}±{args.jitter} ms，显示刷新 {args.fps} Hz")
+    for rate in args.rates:
+        # 帧按 rate 发出，经过随机延迟到达（保持到达顺序）
+        arrivals = []
+        last_arrival = 0.0
+        for index in range(int(args.seconds * rate)):
+            sent = index / rate
+            arrival = max(last_arrival, sent + (args.delay + generator.uniform(-args.jitter, args.jitter)) / 1000)
+            arrivals.append((arrival, sent))
+            last_arrival = arrival
+
+        now = 0.0
+        real_time_clock = RealTimeClock(clock=lambda: now)
+        frame_index = 0
+        latest = 0.0
+        extrapolated_errors = []
+        stepped_errors = []
+        for tick in range(1, int(args.seconds * args.fps)):
+            now = tick / args.fps
+            while frame_index < len(arrivals) and arrivals[frame_index][0] <= now:
+                arrival, latest = arrivals[frame_index]
+                real_time_clock.anchor(latest, arrival)
+                frame_index += 1
+            # 以发送端的真实计时为基准（扣除平均网络延迟）
+            truth = now - args.delay / 1000
+            if frame_index:
+                extrapolated_errors.append(abs(real_time_clock.value() - truth) * 1000)
+                stepped_errors.append(abs(latest - truth) * 1000)
+
+        stats = real_time_clock.statistics()
+        print(f"[{rate} 帧/秒] 显示误差 p50/p95/最大: 外推 {percentile(extrapolated_errors, 50):.1f}/"
+              f"{percentile(extrapolated_errors, 95):.1f}/{max(extrapolated_errors):.1f} ms，"
+              f"逐帧 {percentile(stepped_errors, 50):.1f}/{percentile(stepped_errors, 95):.1f}/"
+              f"{max(stepped_errors):.1f} ms；校准偏差 平均 {stats['平均偏差']:.1f} ms，"
+              f"均方根 {stats['均方根偏差']:.1f} ms，最大 {stats['最大偏差']:.1f} ms")
+
+        # 计时器停止（暂停）后或空闲时重复发送同一数值：收到重复的数值后，显示值应回落并停在该数值
+        results = []
+        for stop_at in (5.0, 0.0):
+            now = 0.0
+            real_time_clock = RealTimeClock(clock=lambda: now)
+            arrivals = [(index / rate + args.delay / 1000, min(index / rate, stop_at))
+                        for index in range(int((stop_at + 2) * rate))]
+            frame_index = 0
+            repeated = False
+            overshoot = settled_overshoot = 0.0
+            for tick in range(1, int((stop_at + 2) * args.fps)):
+                now = tick / args.fps
+                while frame_index < len(arrivals) and arrivals[frame_index][0] <= now:
+                    arrival, value = arrivals[frame_index]
+                    repeated = repeated or (frame_index and value == arrivals[frame_index - 1][1])
+                    real_time_clock.anchor(value, arrival)
+                    frame_index += 1
+                if frame_index and arrivals[frame_index - 1][1] == stop_at:
+                    excess = (real_time_clock.value() - stop_at) * 1000
+                    overshoot = max(overshoot, excess)
+                    if repeated:
+                        settled_overshoot = max(settled_overshoot, excess)
+            results.append(f"{stop_at:.3f} s 最大超出 {overshoot:.1f} ms，收到重复数值后 {settled_overshoot:.1f} ms")
+        print(f"[{rate} 帧/秒] 停止于 {results[0]}；空闲于 {results[1]}")
+
+
+def bench_audio(args):
+    import pygame
+    from task_thread.audio_play import AudioService, CUE_PREEMPT
+
+    paths = {"重置": os.path.join("audio", "reset.mp3"), "时间到": os.path.join("audio", "timeup.mp3")}
+
+    # 旧版：每次提示新建线程，初始化混音器并从磁盘加载 MP3
+    legacy_latencies = []
+
+    def legacy_play(path, requested_at):
+        pygame.mixer.init()
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.play()
+        legacy_latencies.append(time.perf_counter() - requested_at)
+
+    for index in range(args.cues):
+        worker = threading.Thread(target=legacy_play, args=(paths["重置"], time.perf_counter()))
+        worker.start()
+        worker.join()
+        time.sleep(args.interval / 1000)
+    pygame.mixer.quit()
+
+    service = AudioService(paths, {"重置": (2, CUE_PREEMPT), "时间到": (1, CUE_PREEMPT)})
+    service.start()
+    service.ready.wait()
+    for index in range(args.cues):
+        service.play("重置" if index % 2 else "时间到")
+        time.sleep(args.interval / 1000)
+    service.stop()
+    service.wait()
+
+    stats = service.statistics()
+    print(f"提示音 {args.cues} 次，间隔 {args.interval} ms")
+    print(f"旧版逐次线程: 平均延迟 {sum(legacy_latencies) / len(legacy_latencies) * 1000:.2f} ms，"
+          f"最大 {max(legacy_latencies) * 1000:.2f} ms")
+    print(f"常驻音频服务: 平均延迟 {stats['平均延迟']:.2f} ms，最大 {stats['最大延迟']:.2f} ms")
+
+
+def bench_startup(args):
+    import sys
+
+    environment = dict(os.environ, QT_QPA_PLATFORM="offscreen", SDL_AUDIODRIVER="dummy")
+    directory = tempfile.mkdtemp()
+    output = os.path.join(directory, "startup.json")
+    runs = []
+    for run in range(args.repeat):
+        # 每次启动使用新的比赛记录目录（与全新比赛一致），不写入正式的比赛记录
+        subprocess.run([sys.executable, "main.py", "--profile-startup", "--profile-output", output,
+                        "--journal-dir", os.path.join(directory, f"journal{run}"),
+                        "--capture-dir", os.path.join(directory, "capture")],
+                       env=environment, capture_output=True, check=True)
+        with open(output, "r", encoding="utf-8") as file:
+            runs.append(json.load(file))
+
+    # 各阶段取中位数，减少磁盘缓存与调度带来的波动
+    phases = {phase: round(statistics.median(run["阶段"][phase] for run in runs), 1) for phase in runs[0]["阶段"]}
+    eager = sorted({name for run in runs for name in run["已导入"]} - {"numpy", "pygame"})
+    previous = save_history("startup", {"阶段": phases, "已导入": eager})
+
+    print(f"启动 {args.repeat} 次（中位数）:")
+    for phase, elapsed in phases.items():
+        line = f"{elapsed:9.1f} ms  {phase}"
+        if previous and phase in previous["结果"]["阶段"]:
+            line += f"（上次 {previous['结果']['阶段'][phase]:.1f} ms）"
+        print(line)
+
+    # 回归检查：总耗时超过上限，或界面线程提前导入了应延迟加载的依赖（音频服务线程导入的 numpy、pygame 除外）
+    failures = []
+    if phases["总计"] > args.max_ms:
+        failures.append(f"启动总耗时 {phases['总计']:.1f} ms 超过上限 {args.max_ms} ms")
+    if eager:
+        failures.append(f"启动时导入了应延迟加载的依赖: {'、'.join(eager)}")
+    for failure in failures:
+        print(f"失败: {failure}")
+    if failures:
+        raise SystemExit(1)
+
+
+def bench_resource(args):
+    from utils.resource import ResourceResolver
+
+    def legacy_search(filename, search_root):
+        for root, _, files in os.walk(search_root):
+            if filename in files:
+                return os.path.join(root, filename)
+        return None
+
+    # 模拟从一个很大的目录（如用户主目录）启动
+    working_directory = tempfile.mkdtemp()
+    for index in range(args.directories):
+        directory = os.path.join(working_directory, f"目录{index:04d}")
+        os.makedirs(directory)
+        for file_index in range(args.files):
+            open(os.path.join(directory, f"文件{file_index}.txt"), "w").close()
+
+    start = time.perf_counter()
+    legacy_search("timeup.mp3", working_directory)
+    legacy_time = time.perf_counter() - start
+
+    resolver = ResourceResolver(index_path=os.path.join(working_directory, "index.json"))
+    start = time.perf_counter()
+    for name in ["reset.mp3", "timeup.mp3", "icon.ico", "config.json"]:
+        assert resolver.resolve(name), name
+    resolver_time = time.perf_counter() - start
+
+    print(f"工作目录: {args.directories} 个子目录 × {args.files} 个文件")
+    print(f"旧版 os.walk 搜索 1 个文件: {legacy_time * 1000:.1f} ms（且未找到）")
+    print(f"资源查找器查找 4 个文件: {resolver_time * 1000:.3f} ms")
+
+
+def bench_journal(args):
+    from race import RaceData, RaceJournal, apply_event, EVENT_IMPORT_TEAMS, EVENT_SWITCH_TEAM, EVENT_ADD_RECORD, \
+        EVENT_ADD_PENALTY, EVENT_SET_RECORD_STATE
+
+    # 一整天的比赛：每支队伍若干成绩，每个成绩添加一次罚时并确认
+    teams = [{"队伍编号": f"{index:04d}", "队伍名称": f"队伍{index}", "队伍成员": "甲、乙、丙",
+              "比赛阶段": "赛前准备阶段", "剩余时间": 60, "是否暂停": True, "所有成绩": [], "最好成绩": 999.999}
+             for index in range(args.teams)]
+    events = [{"类型": EVENT_IMPORT_TEAMS, "队伍": teams, "比赛进度": 0}]
+    for team in range(args.teams):
+        events.append({"类型": EVENT_SWITCH_TEAM, "比赛进度": team})
+        for record in range(args.records):
+            value = 10 + random.random() * 20
+            events.append({"类型": EVENT_ADD_RECORD, "队伍": team, "成绩": {
+                "原始时间": value, "修正时间": value, "状态": "未处理", "罚时": [], "接收时间": time.time()}})
+            events.append({"类型": EVENT_ADD_PENALTY, "队伍": team, "成绩": record, "罚时": ["压线", 2]})
+            events.append({"类型": EVENT_SET_RECORD_STATE, "队伍": team, "成绩": record, "状态": "已确认"})
+
+    results = {}
+    for mode, snapshot_every in [("快照+日志尾部", args.snapshot_every), ("完整重放", len(events) + 1)]:
+        directory = tempfile.mkdtemp()
+        journal = RaceJournal(directory, snapshot_every=snapshot_every)
+        race_data = RaceData()
+        journal.start(race_data)
+
+        append_times = []
+        snapshot_times = []
+        start = time.perf_counter()
+        for event in json.loads(json.dumps(events)):
+            begin = time.perf_counter()
+            apply_event(race_data, event)
+            journal.append(event)
+            append_times.append(time.perf_counter() - begin)
+            if journal.needs_snapshot():
+                begin = time.perf_counter()
+                journal.snapshot(race_data)
+                snapshot_times.append(time.perf_counter() - begin)
+        journal.close()
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recovered, replayed = RaceJournal(directory).recover(apply_event)
+        recover_time = time.perf_counter() - start
+        assert recovered == race_data, "恢复的比赛数据与原数据不一致"
+
+        results[mode] = {"恢复": recover_time * 1000, "重放事件": replayed}
+        print(f"== {mode} ==")
+        print(f"写入 {len(events)} 个事件: {write_time:.2f} s（含全部 fsync），"
+              f"单次操作 p50 {percentile(append_times, 50) * 1e6:.0f} us，p99 {percentile(append_times, 99) * 1e6:.0f} us")
+        if snapshot_times:
+            print(f"快照 {len(snapshot_times)} 次（界面线程序列化）: 平均 {statistics.mean(snapshot_times) * 1000:.1f} ms，"
+                  f"最大 {max(snapshot_times) * 1000:.1f} ms，"
+                  f"大小 {os.path.getsize(os.path.join(directory, 'snapshot.json')) / 1024:.0f} KiB")
+        print(f"恢复: {recover_time * 1000:.1f} ms（重放 {replayed} 个事件）")
+        shutil.rmtree(directory)
+
+    save_history("journal", results)
+
+
+def bench_undo(args):
+    import copy
+
+    from race import RaceData, UndoHistory, apply_event, EVENT_ADD_PENALTY, EVENT_SET_RECORD_STATE
+
+    race_data = RaceData.from_dict({"比赛进度": 0, "队伍名单": [
+        {"队伍编号": f"{index:04d}", "队伍名称": f"队伍{index}", "队伍成员": "甲、乙、丙", "比赛阶段": "赛前准备阶段",
+         "剩余时间": 60, "是否暂停": True, "最好成绩": 999.999,
+         "所有成绩": [{"原始时间": value, "修正时间": value, "状态": "未处理", "罚时": [], "接收时间": None}
+                    for value in (10 + random.random() * 20 for _ in range(args.records))]}
+        for index in range(args.teams)]})
+    steps = []
+    for _ in range(args.steps):
+        team, record = random.randrange(args.teams), random.randrange(args.records)
+        steps.append({"类型": EVENT_ADD_PENALTY, "队伍": team, "成绩": record, "罚时": ["压线", 2]})
+        steps.append({"类型": EVENT_SET_RECORD_STATE, "队伍": team, "成绩": record, "状态": "已确认"})
+
+    # 旧的思路：每步操作前深拷贝整个比赛数据，撤销时整体替换
+    start = time.perf_counter()
+    for event in steps[:args.copy_steps]:
+        copy.deepcopy(race_data)
+    copy_time = (time.perf_counter() - start) / args.copy_steps
+
+    history = UndoHistory(limit=len(steps))
+    apply = functools.partial(apply_event, race_data)
+    expected = copy.deepcopy(race_data)
+    start = time.perf_counter()
+    for event in steps:
+        history.push(event, apply(event))
+    do_time = time.perf_counter() - start
+    done = copy.deepcopy(race_data)
+
+    start = time.perf_counter()
+    while history.undo(apply):
+        pass
+    undo_time = time.perf_counter() - start
+    assert race_data == expected, "全部撤销后比赛数据与初始数据不一致"
+
+    start = time.perf_counter()
+    while history.redo(apply):
+        pass
+    redo_time = time.perf_counter() - start
+    assert race_data == done, "全部重做后比赛数据不一致"
+
+    print(f"比赛数据: {args.teams} 支队伍 × {args.records} 个成绩，{len(steps)} 步操作")
+    print(f"深拷贝快照: {copy_time * 1000:.1f} ms/步")
+    print(f"事件: 执行 {do_time / len(steps) * 1e6:.1f} us/步，撤销 {undo_time / len(steps) * 1e6:.1f} us/步，"
+          f"重做 {redo_time / len(steps) * 1e6:.1f} us/步")
+
+
+def bench_model(args):
+    import gc
+    import tracemalloc
+
+    from race import RaceData, Team
+
+    def legacy_data():
+        return {"比赛进度": 0, "队伍名单": [
+            {"队伍编号": f"{index:04d}", "队伍名称": f"队伍{index}", "队伍成员": "甲、乙、丙", "比赛阶段": "赛前准备阶段",
+             "剩余时间": 60, "是否暂停": True, "最好成绩": 999.999,
+             "所有成绩": [{"原始时间": value, "修正时间": value + 2, "状态": "已确认", "罚时": [("压线", 2)],
+                       "接收时间": time.time()} for value in (round(10 + random.random() * 20, 3) for _ in range(args.runs))]}
+            for index in range(args.teams)]}
+
+    def measure(build):
+        tracemalloc.start()
+        data = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return data, size
+
+    legacy, legacy_size = measure(legacy_data)
+    model, model_size = measure(lambda: RaceData.from_dict(legacy_data()))
+
+    def legacy_best():
+        for team in legacy["队伍名单"]:
+            team["最好成绩"] = min((record["修正时间"] for record in team["所有成绩"] if record["状态"] == "已确认"),
+                               default=999.999)
+
+    def model_best():
+        for team in model.teams:
+            team.update_best_record()
+
+    legacy_text = json.dumps(legacy, ensure_ascii=False)
+    model_text = json.dumps([team.to_row() for team in model.teams], ensure_ascii=False)
+    timings = {
+        "遍历计算最好成绩": (best_of(args.repeat, legacy_best), best_of(args.repeat, model_best)),
+        "序列化": (best_of(args.repeat, lambda: json.dumps(legacy, ensure_ascii=False)),
+                best_of(args.repeat, lambda: json.dumps([team.to_row() for team in model.teams], ensure_ascii=False))),
+        "反序列化": (best_of(args.repeat, json.loads, legacy_text),
+                 best_of(args.repeat, lambda: [Team.from_row(row) for row in json.loads(model_text)])),
+    }
+    # 恢复比赛记录时暂停了循环垃圾回收
+    gc.disable()
+    timings["反序列化（暂停回收）"] = (best_of(args.repeat, json.loads, legacy_text),
+                                best_of(args.repeat, lambda: [Team.from_row(row) for row in json.loads(model_text)]))
+    gc.enable()
+
+    print(f"比赛数据: {args.teams} 支队伍 × {args.runs} 个成绩")
+    print(f"{'':16}{'中文键字典':>12}{'数据模型':>12}")
+    print(f"{'内存':14}{legacy_size / 1024 ** 2:10.1f} MiB{model_size / 1024 ** 2:9.1f} MiB")
+    print(f"{'快照大小':12}{len(legacy_text.encode()) / 1024:10.0f} KiB{len(model_text.encode()) / 1024:9.0f} KiB")
+    for name, (legacy_time, model_time) in timings.items():
+        print(f"{name:{16 - len(name)}}{legacy_time * 1000:11.1f} ms{model_time * 1000:10.1f} ms")
+
+
+def bench_leaderboard(args):
+    from race import Leaderboard, Team, NO_RECORD
+
+    teams = [Team(f"{index:04d}", f"队伍{index}", "", "正式比赛阶段", 0) for index in range(args.teams + 1)]
+    leaderboard = Leaderboard()
+    leaderboard.rebuild(teams)
+
+    # 确认、作废与罚时都表现为某支队伍最好成绩的变化
+    changes = [(random.randint(1, args.teams), random.choice([NO_RECORD, round(10 + random.random() * 20, 3)]))
+               for _ in range(args.updates)]
+
+    start = time.perf_counter()
+    for index, best_record in changes:
+        teams[index].best_record = best_record
+        leaderboard.update(index, teams[index])
+    update_time = (time.perf_counter() - start) / len(changes)
+
+    expected = sorted((team.best_record, team.number, index) for index, team in enumerate(teams[1:], 1)
+                      if team.best_record < NO_RECORD)
+    assert leaderboard.keys == expected, "增量维护的排行榜与重新排序的结果不一致"
+    bests = [key[0] for key in expected]
+    assert all(leaderboard.rank(index) == bests.index(best_record) + 1 for best_record, _, index in expected), \
+        "排行榜名次与逐一比较的结果不一致"
+
+    # 对照：每次变化后重新排序全部队伍
+    start = time.perf_counter()
+    for index, best_record in changes[:args.sort_updates]:
+        teams[index].best_record = best_record
+        sorted((team.best_record, team.number, index) for index, team in enumerate(teams[1:], 1)
+               if team.best_record < NO_RECORD)
+    sort_time = (time.perf_counter() - start) / args.sort_updates
+
+    start = time.perf_counter()
+    for index in range(1, args.teams + 1):
+        leaderboard.rank(index)
+    rank_time = (time.perf_counter() - start) / args.teams
+    top_time = best_of(args.repeat, leaderboard.top, 10)
+
+    print(f"{args.teams} 支队伍，{len(leaderboard)} 支有成绩，{len(changes)} 次成绩变化")
+    print(f"增量更新: {update_time * 1e6:.2f} us/次（重新排序: {sort_time * 1e6:.0f} us/次）")
+    print(f"查询名次: {rank_time * 1e6:.2f} us/次，前 10 名: {top_time * 1e6:.2f} us")
+
+
+def legacy_record_option(combo_box, records):
+    """ 旧版成绩下拉框刷新：清空后重新添加全部成绩并逐项设置居中。 """
+    from PySide6.QtCore import Qt
+
+    old_index = combo_box.currentIndex() if combo_box.currentText() else 0
+    combo_box.clear()
+    for data in records:
+        combo_box.addItem(f"{data.raw_time:.3f}+{sum(penalty[1] for penalty in data.penalties)} ({data.state})")
+    combo_box.setCurrentIndex(old_index)
+    for i in range(combo_box.count()):
+        index = combo_box.model().index(i, 0)
+        combo_box.model().setData(index, Qt.AlignmentFlag.AlignCenter, Qt.ItemDataRole.TextAlignmentRole)
+
+
+def bench_records(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QComboBox
+
+    from race import Record, Team
+    from widget.record_list import RecordListModel
+
+    app = QApplication.instance() or QApplication([])
+
+    print(f"{'成绩数量':8}{'操作':8}{'清空重建':>12}{'列表模型':>12}")
+    for runs in args.runs:
+        values = [round(10 + random.random() * 20, 3) for _ in range(runs)]
+        # 两种方式各用一份相同的队伍数据，并以相同的随机序列修改
+        legacy_team, team = (Team("0001", "队伍", "", "正式比赛阶段", 0,
+                                  records=[Record(value, value, "已确认") for value in values]) for _ in range(2))
+        legacy_combo_box = QComboBox()
+        legacy_combo_box.show()
+        legacy_record_option(legacy_combo_box, legacy_team.records)
+        model = RecordListModel()
+        model.set_team(team)
+        combo_box = QComboBox()
+        combo_box.setModel(model)
+        combo_box.show()
+        app.processEvents()
+
+        def change(records, refresh, rng):
+            # 给随机一个成绩添加罚时并刷新下拉框
+            row = rng.randrange(len(records))
+            records[row].penalties.append(("压线", 1))
+            records[row].update_corrected_time()
+            refresh(row)
+            app.processEvents()
+
+        def insert(records, refresh):
+            records.append(Record(12.345, 12.345))
+            refresh(len(records) - 1)
+            app.processEvents()
+
+        def legacy_refresh(row):
+            legacy_record_option(legacy_combo_box, legacy_team.records)
+
+        for name in ("修改成绩", "新增成绩"):
+            if name == "修改成绩":
+                legacy_rng, rng = random.Random(runs), random.Random(runs)
+                legacy = functools.partial(change, legacy_team.records, legacy_refresh, legacy_rng)
+                incremental = functools.partial(change, team.records, model.record_changed, rng)
+            else:
+                legacy = functools.partial(insert, legacy_team.records, legacy_refresh)
+                incremental = functools.partial(insert, team.records, model.record_inserted)
+            legacy_time = best_of(args.repeat, legacy)
+            model_time = best_of(args.repeat, incremental)
+            print(f"{runs:<12}{name:8}{legacy_time * 1000:10.2f} ms{model_time * 1000:10.3f} ms")
+
+        assert [legacy_combo_box.itemText(i) for i in range(legacy_combo_box.count())] == \
+               [combo_box.itemText(i) for i in range(combo_box.count())], "列表模型与清空重建的显示内容不一致"
+        legacy_combo_box.close()
+        combo_box.close()
+
+
+
+def bench_penalty(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QEvent, QObject
+    from PySide6.QtWidgets import QApplication, QFormLayout, QGridLayout, QPushButton, QWidget
+
+    from widget.button_panel import ButtonPanel
+
+    app = QApplication.instance() or QApplication([])
+
+    class ChildCounter(QObject):
+        """ 统计新加入界面的控件数量。 """
+        count = 0
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.ChildAdded and event.child().isWidgetType():
+                ChildCounter.count += 1
+            return False
+
+    counter = ChildCounter()
+    app.installEventFilter(counter)
+    option = ("碰撞路障", 15)
+
+    def text(penalty):
+        return f"{penalty[0]} (+{penalty[1]}s)"
+
+    def legacy_panel(penalties):
+        # 旧版已执行罚时区域：删除全部按钮后重建网格、占位控件与回调
+        container = QWidget()
+        form_layout = QFormLayout(container)
+        buttons = []
+
+        def refresh():
+            for i in reversed(range(form_layout.count())):
+                widget = form_layout.itemAt(i).widget()
+                if widget:
+                    widget.deleteLater()
+            buttons.clear()
+            grid_layout = QGridLayout()
+            for index, penalty in enumerate(penalties):
+                button = QPushButton(text(penalty))
+                button.setStyleSheet("padding: 8px;")
+                button.clicked.connect(lambda _, i=index: remove(i))
+                grid_layout.addWidget(button, *divmod(index, 4))
+                buttons.append(button)
+            if len(penalties) % 4:
+                for column in range(len(penalties) % 4, 4):
+                    grid_layout.addWidget(QWidget(), len(penalties) // 4, column)
+            grid_widget = QWidget()
+            grid_widget.setLayout(grid_layout)
+            form_layout.addRow(grid_widget)
+
+        def remove(index):
+            del penalties[index]
+            refresh()
+
+        return container, refresh, buttons
+
+    def pooled_panel(penalties):
+        panel = ButtonPanel(columns=4)
+
+        def refresh():
+            panel.set_texts([text(penalty) for penalty in penalties])
+
+        def remove(index):
+            del penalties[index]
+            refresh()
+
+        panel.clicked.connect(remove)
+        return panel, refresh, panel.buttons
+
+    print(f"{'已有罚时':8}{'方式':8}{'点击到重绘':>12}{'新建控件/次':>12}")
+    for count in args.penalties:
+        for name, build in (("重建", legacy_panel), ("复用", pooled_panel)):
+            penalties = [option] * count
+            widget, refresh, buttons = build(penalties)
+            widget.resize(600, 400)
+            widget.show()
+            refresh()
+            app.processEvents()
+
+            def click():
+                # 添加一个罚时，再点击它的按钮撤销，两次刷新后重绘
+                penalties.append(option)
+                refresh()
+                buttons[len(penalties) - 1].click()
+                app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+                app.processEvents()
+                widget.repaint()
+
+            click()
+            ChildCounter.count = 0
+            samples = []
+            for _ in range(args.clicks):
+                start = time.perf_counter()
+                click()
+                samples.append(time.perf_counter() - start)
+            created = ChildCounter.count / args.clicks / 2
+            print(f"{count:<12}{name:8}{statistics.median(samples) * 1000:10.2f} ms{created:12.1f}")
+            widget.close()
+            widget.deleteLater()
+            app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    app.removeEventFilter(counter)
+
+
+
+def bench_display(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
+
+    from widget.display_state import DisplayState
+
+    app = QApplication.instance() or QApplication([])
+    fields = ("race_phase", "remaining_time", "best_record")
+
+    def build():
+        # 控制台与投屏窗口各一组标签
+        windows = []
+        for _ in range(2):
+            window = QWidget()
+            layout = QVBoxLayout(window)
+            labels = {field: QLabel() for field in fields}
+            for field, label in labels.items():
+                layout.addWidget(label)
+                setattr(window, field + "_display", label)
+            window.show()
+            windows.append((window, labels))
+        return windows
+
+    set_text_calls = [0]
+
+    def counted(labels):
+        for label in labels.values():
+            set_text = label.setText
+
+            def wrapper(text, set_text=set_text):
+                set_text_calls[0] += 1
+                set_text(text)
+
+            label.setText = wrapper
+
+    def remaining_text(remaining_time):
+        return f'{remaining_time // 60} 分 {remaining_time % 60} 秒'
+
+    # 旧版：每秒为两个窗口设置全部标签，投屏窗口按名称查找标签并比较文本，再整体刷新
+    (console, console_labels), (screen, screen_labels) = build()
+    counted(console_labels)
+    counted(screen_labels)
+
+    def legacy_tick(remaining_time):
+        values = {"race_phase": "正式比赛阶段", "remaining_time": remaining_text(remaining_time),
+                  "best_record": "12.345s"}
+        for field, text in values.items():
+            console_labels[field].setText(text)
+            label = getattr(screen, field + "_display", None)
+            if label and label.text() != text:
+                label.setText(text)
+        screen.update()
+        app.processEvents()
+
+    # 显示状态：只推送变化的字段，两个窗口共用同一组修改
+    (new_console, new_console_labels), (new_screen, new_screen_labels) = build()
+    counted(new_console_labels)
+    counted(new_screen_labels)
+    state = DisplayState()
+    state.subscribe(new_console_labels)
+    state.subscribe(new_screen_labels)
+
+    def state_tick(remaining_time):
+        state.update(race_phase="正式比赛阶段", remaining_time=remaining_text(remaining_time), best_record="12.345s")
+        app.processEvents()
+
+    print(f"{'方式':8}{'每秒刷新':>12}{'setText/次':>12}")
+    for name, tick in (("逐字段设置", legacy_tick), ("显示状态", state_tick)):
+        tick(args.ticks + 1)
+        set_text_calls[0] = 0
+        samples = []
+        for remaining_time in range(args.ticks, 0, -1):
+            start = time.perf_counter()
+            tick(remaining_time)
+            samples.append(time.perf_counter() - start)
+        print(f"{name:10}{statistics.median(samples) * 1000:9.3f} ms{set_text_calls[0] / args.ticks:12.1f}")
+
+    assert [label.text() for label in new_screen_labels.values()] == \
+           [label.text() for label in screen_labels.values()], "两种方式的显示内容不一致"
+
+
+
+def bench_scoreboard(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    from widget.display_state import DisplayState
+    from widget.scoreboard import ScoreboardWindow
+    from widget.screen import FullScreenWindow
+
+    app = QApplication.instance() or QApplication([])
+    configuration = {"比赛名称": "北京科技大学智能汽车竞赛", "比赛阶段": "总决赛", "比赛组别": "摄像头组",
+                     "投屏显示排行榜": True, "排行榜显示数量": 10}
+    width, height = args.resolution
+
+    print(f"{width}x{height}，{args.frames} 帧（每帧更新实时时间，每 60 帧更新剩余时间）")
+    print(f"{'投屏窗口':10}{'p50':>10}{'p99':>10}{'最大':>10}{'超过 16.7 ms':>14}")
+    for name, window_type in (("标签", FullScreenWindow), ("自绘记分板", ScoreboardWindow)):
+        state = DisplayState()
+        state.update(title="北京科技大学智能汽车竞赛总决赛", subheading="摄像头组", progress="12/80",
+                     next_team="0013：下一支队伍", team_id="0012", team_name="测试队伍", team_members="甲、乙、丙",
+                     best_record="12.345s", remaining_time="10 分 0 秒", real_time="0.000s",
+                     leaderboard="\n".join(f"{rank}. {rank:04d} 队伍{rank}  {10 + rank:.3f}s" for rank in range(1, 11)))
+        window = window_type(configuration)
+        state.subscribe(window.display_labels)
+        window.resize(width, height)
+        window.show()
+        app.processEvents()
+
+        samples = []
+        for frame in range(args.frames):
+            start = time.perf_counter()
+            if frame % 60 == 0:
+                remaining_time = 600 - frame // 60
+                state.update(remaining_time=f"{remaining_time // 60} 分 {remaining_time % 60} 秒")
+            state.update(real_time=f"{frame / 60:.3f}s")
+            # 第一次处理事件发出显示状态的修改，第二次完成重绘
+            app.processEvents()
+            app.processEvents()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        over = sum(sample > 1000 / 60 for sample in samples)
+        print(f"{name:12}{percentile(samples, 50):8.2f} ms{percentile(samples, 99):7.2f} ms"
+              f"{max(samples):7.2f} ms{over:10d} 帧")
+        window.close()
+
+
+
+def bench_projectors(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    from widget.display_state import DisplayState
+    from widget.scoreboard import GlyphCache, ScoreboardWindow, PROJECTOR_LAYOUTS, LAYOUT_SCOREBOARD
+
+    app = QApplication.instance() or QApplication([])
+    configuration = {"投屏显示排行榜": False, "排行榜显示数量": 10}
+    width, height = args.resolution
+
+    state = DisplayState()
+    state.update(title="北京科技大学智能汽车竞赛总决赛", subheading="摄像头组", progress="12/80",
+                 next_team="0013：下一支队伍", team_id="0012", team_name="测试队伍", team_members="甲、乙、丙",
+                 best_record="12.345s", remaining_time="10 分 0 秒", real_time="0.000s",
+                 leaderboard="\n".join(f"{rank}. {rank:04d} 队伍{rank}  {10 + rank:.3f}s" for rank in range(1, 11)))
+
+    def open_window(glyph_cache, board_layout):
+        window = ScoreboardWindow(configuration, glyph_cache, board_layout)
+        binding = state.subscribe(window.display_labels)
+        window.resize(width, height)
+        return window, binding
+
+    def close_window(window, binding):
+        state.unsubscribe(binding)
+        window.close()
+        window.deleteLater()
+
+    def first_frame(glyph_cache):
+        # grab 完整绘制一次窗口，相当于新窗口的第一帧；返回 (耗时, 新绘制的字符数)
+        glyphs = len(glyph_cache.glyphs)
+        window, binding = open_window(glyph_cache, LAYOUT_SCOREBOARD)
+        start = time.perf_counter()
+        window.grab()
+        elapsed = time.perf_counter() - start
+        close_window(window, binding)
+        return elapsed, len(glyph_cache.glyphs) - glyphs
+
+    first_frame(GlyphCache())
+
+    print(f"{width}x{height}，每帧更新实时时间，{args.frames} 帧；已打开的窗口交替使用记分板与排行榜布局")
+    print(f"{'窗口数':6}{'每帧 p50':>12}{'每帧 p99':>12}{'再开一个记分板的首帧（新绘制字符）':>30}")
+    for count in args.windows:
+        glyph_cache = GlyphCache()
+        windows = [open_window(glyph_cache, PROJECTOR_LAYOUTS[index % len(PROJECTOR_LAYOUTS)]) for index in range(count)]
+        for window, _ in windows:
+            window.show()
+        app.processEvents()
+
+        samples = []
+        for frame in range(args.frames):
+            start = time.perf_counter()
+            state.update(real_time=f"{frame / 60:.3f}s")
+            app.processEvents()
+            app.processEvents()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        own = min(first_frame(GlyphCache()) for _ in range(3))
+        shared = min(first_frame(glyph_cache) for _ in range(3))
+        print(f"{count:<9}{percentile(samples, 50):7.2f} ms{percentile(samples, 99):9.2f} ms"
+              f"    共用缓存 {shared[0] * 1000:.2f} ms（{shared[1]}） / 单独缓存 {own[0] * 1000:.2f} ms（{own[1]}）")
+        for window, binding in windows:
+            close_window(window, binding)
+
+    # 整场比赛的队名、队员名汉字种类很多，缓存按字节数上限淘汰，不随字符种类增长
+    glyph_cache = GlyphCache()
+    window, binding = open_window(glyph_cache, LAYOUT_SCOREBOARD)
+    window.grab()
+    for code in range(0x4E00, 0x4E00 + args.names):
+        state.update(team_members=chr(code) * 3)
+        app.processEvents()
+        window.grab()
+    close_window(window, binding)
+    print(f"逐个显示 {args.names} 个不同汉字后：缓存 {len(glyph_cache.glyphs)} 个字符，"
+          f"{glyph_cache.size / 1024 / 1024:.1f} MB（上限 {glyph_cache.capacity / 1024 / 1024:.0f} MB）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="计时器上位机性能基准测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    decoder_parser = subparsers.add_parser("decoder", help="帧解码吞吐量")
+    decoder_parser.add_argument("--seconds", type=float, default=600, help="模拟数据时长（秒）")
+    decoder_parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最短耗时）")
+    decoder_parser.set_defaults(func=bench_decoder)
+
+    tcp_parser = subparsers.add_parser("tcp", help="多客户端 TCP 压力测试")
+    tcp_parser.add_argument("--clients", type=int, default=32, help="并发客户端数量")
+    tcp_parser.add_argument("--frames", type=int, default=2000, help="每个客户端发送的实时帧数量")
+    tcp_parser.add_argument("--max-stop-ms", type=float, default=100, help="通信中枢停止耗时上限（毫秒）")
+    tcp_parser.set_defaults(func=bench_tcp)
+
+    serial_parser = subparsers.add_parser("serial", help="伪终端串口读取测试")
+    serial_parser.add_argument("--idle", type=float, default=3, help="空闲阶段时长（秒）")
+    serial_parser.add_argument("--rate", type=int, default=1000, help="写入频率（帧/秒）")
+    serial_parser.add_argument("--seconds", type=float, default=5, help="满载阶段时长（秒）")
+    serial_parser.set_defaults(func=bench_serial)
+
+    receiver_parser = subparsers.add_parser("receiver", help="独立接收进程在界面阻塞时的可靠性")
+    receiver_parser.add_argument("--block", type=float, default=5, help="界面阻塞时长（秒）")
+    receiver_parser.add_argument("--finals", type=int, default=50, help="阻塞期间发送的最终成绩数量")
+    receiver_parser.add_argument("--port", type=int, default=32768, help="UDP 端口")
+    receiver_parser.add_argument("--max-error-ms", type=float, default=50, help="接收时间与发送时间的偏差上限（毫秒）")
+    receiver_parser.set_defaults(func=bench_receiver)
+
+    replay_parser = subparsers.add_parser("replay", help="通信记录回放吞吐量")
+    replay_parser.add_argument("--path", help="记录文件路径（默认生成模拟记录）")
+    replay_parser.add_argument("--seconds", type=float, default=600, help="模拟记录时长（秒）")
+    replay_parser.add_argument("--speed", type=float, default=0, help="回放倍速，0 为最快速度")
+    replay_parser.set_defaults(func=bench_replay)
+
+    e2e_parser = subparsers.add_parser("e2e", help="端到端（计时器到屏幕）延迟与吞吐量")
+    e2e_parser.add_argument("--transports", nargs="+", default=["pty", "tcp", "udp"], choices=["pty", "tcp", "udp"],
+                            help="测试的传输方式")
+    e2e_parser.add_argument("--rate", type=int, default=1000, help="实时时间帧频率（帧/秒）")
+    e2e_parser.add_argument("--fragment", type=int, default=0, help="拆包最大字节数，0 为不拆包")
+    e2e_parser.add_argument("--run-time", type=float, default=1, help="每轮比赛时长（秒）")
+    e2e_parser.add_argument("--runs", type=int, default=20, help="每种传输的比赛轮数")
+    e2e_parser.set_defaults(func=bench_e2e)
+
+    countdown_parser = subparsers.add_parser("countdown", help="倒计时在界面卡顿下的漂移")
+    countdown_parser.add_argument("--seconds", type=int, default=600, help="倒计时总时长（秒）")
+    countdown_parser.add_argument("--run", type=float, default=20, help="测试运行时长（秒）")
+    countdown_parser.add_argument("--stall", type=int, default=1500, help="每次卡顿时长（毫秒）")
+    countdown_parser.add_argument("--stall-interval", type=int, default=4000, help="卡顿间隔（毫秒）")
+    countdown_parser.set_defaults(func=bench_countdown)
+
+    clock_parser = subparsers.add_parser("clock", help="实时时间本地外推的显示误差")
+    clock_parser.add_argument("--seconds", type=float, default=60, help="模拟计时时长（秒）")
+    clock_parser.add_argument("--rates", type=int, nargs="+", default=[5, 10, 20, 100], help="实时帧频率（帧/秒）")
+    clock_parser.add_argument("--fps", type=int, default=60, help="显示刷新率")
+    clock_parser.add_argument("--delay", type=float, default=20, help="平均网络延迟（毫秒）")
+    clock_parser.add_argument("--jitter", type=float, default=15, help="网络延迟抖动（毫秒）")
+    clock_parser.set_defaults(func=bench_clock)
+
+    audio_parser = subparsers.add_parser("audio", help="提示音请求到开始播放的延迟")
+    audio_parser.add_argument("--cues", type=int, default=20, help="提示次数")
+    audio_parser.add_argument("--interval", type=int, default=50, help="提示间隔（毫秒）")
+    audio_parser.set_defaults(func=bench_audio)
+
+    startup_parser = subparsers.add_parser("startup", help="冷启动耗时回归检查")
+    startup_parser.add_argument("--repeat", type=int, default=5, help="启动次数")
+    startup_parser.add_argument("--max-ms", type=float, default=1500, help="启动总耗时上限（毫秒）")
+    startup_parser.set_defaults(func=bench_startup)
+
+    resource_parser = subparsers.add_parser("resource", help="资源查找耗时与工作目录大小的关系")
+    resource_parser.add_argument("--directories", type=int, default=200, help="工作目录中的子目录数量")
+    resource_parser.add_argument("--files", type=int, default=100, help="每个子目录中的文件数量")
+    resource_parser.set_defaults(func=bench_resource)
+
+    journal_parser = subparsers.add_parser("journal", help="比赛记录写入与崩溃恢复耗时")
+    journal_parser.add_argument("--teams", type=int, default=2000, help="队伍数量")
+    journal_parser.add_argument("--records", type=int, default=20, help="每支队伍的成绩数量")
+    journal_parser.add_argument("--snapshot-every", type=int, default=1000, help="每隔多少个事件写一次快照")
+    journal_parser.set_defaults(func=bench_journal)
+
+    undo_parser = subparsers.add_parser("undo", help="撤销与重做耗时")
+    undo_parser.add_argument("--teams", type=int, default=2000, help="队伍数量")
+    undo_parser.add_argument("--records", type=int, default=20, help="每支队伍的成绩数量")
+    undo_parser.add_argument("--steps", type=int, default=5000, help="操作次数（每次添加罚时并确认）")
+    undo_parser.add_argument("--copy-steps", type=int, default=5, help="深拷贝对照的测量次数")
+    undo_parser.set_defaults(func=bench_undo)
+
+    model_parser = subparsers.add_parser("model", help="比赛数据模型的内存占用与访问、序列化速度")
+    model_parser.add_argument("--teams", type=int, default=2000, help="队伍数量")
+    model_parser.add_argument("--runs", type=int, default=20, help="每支队伍的成绩数量")
+    model_parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最短耗时）")
+    model_parser.set_defaults(func=bench_model)
+
+    leaderboard_parser = subparsers.add_parser("leaderboard", help="排行榜增量更新与查询耗时")
+    leaderboard_parser.add_argument("--teams", type=int, default=2000, help="队伍数量")
+    leaderboard_parser.add_argument("--updates", type=int, default=100000, help="成绩变化次数")
+    leaderboard_parser.add_argument("--sort-updates", type=int, default=200, help="重新排序对照的测量次数")
+    leaderboard_parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最短耗时）")
+    leaderboard_parser.set_defaults(func=bench_leaderboard)
+
+    records_parser = subparsers.add_parser("records", help="成绩下拉框在成绩变化时的刷新耗时")
+    records_parser.add_argument("--runs", type=int, nargs="+", default=[100, 300, 1000], help="每支队伍的成绩数量")
+    records_parser.add_argument("--repeat", type=int, default=50, help="重复次数（取最短耗时）")
+    records_parser.set_defaults(func=bench_records)
+
+    penalty_parser = subparsers.add_parser("penalty", help="罚时按钮面板从点击到重绘的耗时")
+    penalty_parser.add_argument("--penalties", type=int, nargs="+", default=[4, 12, 40], help="成绩已有的罚时数量")
+    penalty_parser.add_argument("--clicks", type=int, default=200, help="点击次数")
+    penalty_parser.set_defaults(func=bench_penalty)
+
+    display_parser = subparsers.add_parser("display", help="倒计时每秒刷新控制台与投屏窗口的耗时")
+    display_parser.add_argument("--ticks", type=int, default=500, help="刷新次数")
+    display_parser.set_defaults(func=bench_display)
+
+    scoreboard_parser = subparsers.add_parser("scoreboard", help="投屏窗口在高分辨率下的帧耗时")
+    scoreboard_parser.add_argument("--resolution", type=int, nargs=2, default=[3840, 2160], help="窗口宽度与高度")
+    scoreboard_parser.add_argument("--frames", type=int, default=600, help="帧数")
+    scoreboard_parser.set_defaults(func=bench_scoreboard)
+
+    projectors_parser = subparsers.add_parser("projectors", help="多个投屏窗口同时显示时的帧耗时")
+    projectors_parser.add_argument("--windows", type=int, nargs="+", default=[1, 2, 3, 4], help="投屏窗口数量")
+    projectors_parser.add_argument("--resolution", type=int, nargs=2, default=[1920, 1080], help="窗口宽度与高度")
+    projectors_parser.add_argument("--frames", type=int, default=600, help="帧数")
+    projectors_parser.add_argument("--names", type=int, default=1000, help="依次显示的不同汉字数量")
+    projectors_parser.set_defaults(func=bench_projectors)
+
+    arguments = parser.parse_args()
+    arguments.func(arguments)
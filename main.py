@@ -1,3 +1,4 @@
+import os
 import sys
 import warnings
 
@@ -7,11 +8,95 @@ from widget.console import *
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+# 启动时不应导入的重量级依赖（用于启动分析）
+HEAVY_MODULES = ["pandas", "openpyxl", "chardet", "psutil", "numpy", "pygame", "serial"]
+
+
+def option_value(name):
+    """ 命令行中 name 之后的参数值，未指定时返回 None。 """
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else None
+
+
+def profile_startup(output=None, journal_directory=None, capture_directory="capture"):
+    """
+    启动性能分析：在新的解释器中统计各模块的导入耗时，并在本进程中统计窗口构造与首次显示的耗时。
+
+    :param output: str，结果（毫秒）另存为 JSON 的路径。
+    :param journal_directory: str，比赛记录目录，默认使用配置中的目录（分析时会写入快照）。
+    :param capture_directory: str，原始通信数据记录目录。
+    """
+    import cProfile
+    import pstats
+    import subprocess
+    import time
+
+    # 导入耗时（-X importtime 输出的累计耗时，单位微秒）
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import widget.console"],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    imports = []
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() != "widget.console":
+            # 解释器自身启动时的导入，与本程序无关
+            imports.clear()
+            continue
+        imports.append((int(fields[1]) / 1000, name.strip(), depth))
+    import_total = imports.pop()[0] if imports else 0.0
+
+    timings = {"导入": import_total}
+    start = time.perf_counter()
+    app = QApplication(sys.argv)
+    timings["QApplication"] = (time.perf_counter() - start) * 1000
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    console = Console(journal_directory, capture_directory)
+    profiler.disable()
+    timings["Console 构造"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    console.setWindowIcon(QIcon(resolve_resource("icon.ico")))
+    console.show()
+    app.processEvents()
+    timings["首次显示"] = (time.perf_counter() - start) * 1000
+    timings["总计"] = sum(timings.values())
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    print("== 导入耗时（累计，前 15 项，三层以内）==")
+    for cumulative, name, depth in sorted((item for item in imports if item[2] <= 3), reverse=True)[:15]:
+        print(f"{cumulative:9.1f} ms  {'  ' * (depth - 1)}{name}")
+    print("== 启动阶段 ==")
+    for phase, elapsed in timings.items():
+        print(f"{elapsed:9.1f} ms  {phase}")
+    print(f"窗口显示时已导入的重量级依赖: {'、'.join(loaded) or '无'}")
+    print("== Console 构造耗时（累计，前 15 项）==")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(r"(widget|task_thread|utils)[\\/]", 15)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump({"阶段": timings, "已导入": loaded}, file, ensure_ascii=False)
+
+    console.close()
+
+
 if __name__ == "__main__":
+    # --journal-dir、--capture-dir 指定比赛记录与原始通信数据记录的目录（测试时使用临时目录，不影响正式记录）
+    journal_dir = option_value("--journal-dir")
+    capture_dir = option_value("--capture-dir") or "capture"
+
+    if "--profile-startup" in sys.argv:
+        profile_startup(option_value("--profile-output"), journal_dir, capture_dir)
+        sys.exit()
+
     app = QApplication(sys.argv)
 
-    console = Console()
-    console.setWindowIcon(QIcon("icon.ico"))
+    console = Console(journal_dir, capture_dir)
+    console.setWindowIcon(QIcon(resolve_resource("icon.ico")))
     console.show()
 
     sys.exit(app.exec())
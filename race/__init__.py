@@ -0,0 +1,5 @@
+from .model import *
+from .events import *
+from .history import *
+from .journal import *
+from .leaderboard import *
@@ -0,0 +1,116 @@
+""" 比赛数据事件：对比赛数据的每一次修改都表示为一个可序列化的事件 """
+
+from .model import *
+
+EVENT_IMPORT_TEAMS = "导入名单"
+EVENT_ADD_RECORD = "添加成绩"
+EVENT_REMOVE_RECORD = "删除成绩"
+EVENT_SET_RECORD_STATE = "修改状态"
+EVENT_ADD_PENALTY = "添加罚时"
+EVENT_REMOVE_PENALTY = "撤销罚时"
+EVENT_SWITCH_TEAM = "切换队伍"
+EVENT_SET_TIMER = "更新计时"
+
+
+def _record_changed(team, record, old_time, was_confirmed):
+    # 增量维护最好成绩：只有原来的最好成绩失效时才重新计算
+    confirmed = record is not None and record.confirmed
+    if confirmed and record.corrected_time < team.best_record:
+        team.best_record = record.corrected_time
+    elif was_confirmed and old_time == team.best_record and \
+            (not confirmed or record.corrected_time > old_time):
+        team.update_best_record()
+
+
+def _import_teams(race_data, event):
+    race_data.teams += [Team.from_dict(team) for team in event["队伍"]]
+    race_data.progress = event["比赛进度"]
+
+
+def _add_record(race_data, event):
+    team = race_data.teams[event["队伍"]]
+    record = Record.from_dict(event["成绩"])
+    position = event.get("位置", len(team.records))
+    team.records.insert(position, record)
+    _record_changed(team, record, None, False)
+    return {"类型": EVENT_REMOVE_RECORD, "队伍": event["队伍"], "成绩": position}
+
+
+def _remove_record(race_data, event):
+    team = race_data.teams[event["队伍"]]
+    record = team.records.pop(event["成绩"])
+    _record_changed(team, None, record.corrected_time, record.confirmed)
+    return {"类型": EVENT_ADD_RECORD, "队伍": event["队伍"], "成绩": record.to_dict(), "位置": event["成绩"]}
+
+
+def _set_record_state(race_data, event):
+    team = race_data.teams[event["队伍"]]
+    record = team.records[event["成绩"]]
+    was_confirmed = record.confirmed
+    old_state = record.state
+    record.state = event["状态"]
+    _record_changed(team, record, record.corrected_time, was_confirmed)
+    return dict(event, 状态=old_state)
+
+
+def _add_penalty(race_data, event):
+    team = race_data.teams[event["队伍"]]
+    record = team.records[event["成绩"]]
+    position = event.get("位置", len(record.penalties))
+    record.penalties.insert(position, tuple(event["罚时"]))
+    old_time = record.corrected_time
+    record.update_corrected_time()
+    _record_changed(team, record, old_time, record.confirmed)
+    return {"类型": EVENT_REMOVE_PENALTY, "队伍": event["队伍"], "成绩": event["成绩"], "罚时序号": position}
+
+
+def _remove_penalty(race_data, event):
+    team = race_data.teams[event["队伍"]]
+    record = team.records[event["成绩"]]
+    penalty = record.penalties.pop(event["罚时序号"])
+    old_time = record.corrected_time
+    record.update_corrected_time()
+    _record_changed(team, record, old_time, record.confirmed)
+    return {"类型": EVENT_ADD_PENALTY, "队伍": event["队伍"], "成绩": event["成绩"], "罚时": penalty,
+            "位置": event["罚时序号"]}
+
+
+def _switch_team(race_data, event):
+    inverse = {"类型": EVENT_SWITCH_TEAM, "比赛进度": race_data.progress}
+    race_data.progress = event["比赛进度"]
+    return inverse
+
+
+def _set_timer(race_data, event):
+    team = race_data.teams[event["队伍"]]
+    inverse = {"类型": EVENT_SET_TIMER, "队伍": event["队伍"], "比赛阶段": team.phase,
+               "剩余时间": team.remaining_time, "是否暂停": team.paused}
+    team.phase = event["比赛阶段"]
+    team.remaining_time = event["剩余时间"]
+    team.paused = event["是否暂停"]
+    return inverse
+
+
+EVENT_HANDLERS = {
+    EVENT_IMPORT_TEAMS: _import_teams,
+    EVENT_ADD_RECORD: _add_record,
+    EVENT_REMOVE_RECORD: _remove_record,
+    EVENT_SET_RECORD_STATE: _set_record_state,
+    EVENT_ADD_PENALTY: _add_penalty,
+    EVENT_REMOVE_PENALTY: _remove_penalty,
+    EVENT_SWITCH_TEAM: _switch_team,
+    EVENT_SET_TIMER: _set_timer,
+}
+
+
+def apply_event(race_data, event):
+    """
+    把事件应用到比赛数据（实时操作、撤销重做与崩溃恢复共用）。
+
+    修正时间只根据该成绩的罚时计算，最好成绩随事件增量更新，只有原最好成绩失效时才重新遍历该队伍的成绩。
+
+    :param race_data: RaceData，比赛数据。
+    :param event: dict，事件，"类型" 为 EVENT_* 之一，其余字段见各处理函数。
+    :return: dict，撤销该事件的逆事件；不可撤销的事件（导入名单）返回 None。
+    """
+    return EVENT_HANDLERS[event["类型"]](race_data, event)
@@ -0,0 +1,54 @@
+from collections import deque
+
+
+class UndoHistory:
+    """
+    撤销与重做栈。
+
+    每一步只保存 (事件, 逆事件)，撤销时应用逆事件、重做时重新应用事件，两者都只修改事件涉及的数据，
+    不复制整个比赛数据。撤销和重做产生的事件与普通事件一样写入比赛记录。
+    """
+
+    def __init__(self, limit=1000):
+        """
+        :param limit: int，最多可撤销的步数。
+        """
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def push(self, event, inverse):
+        """ 记录一步新的操作，清空重做栈。 """
+        self.undo_stack.append((event, inverse))
+        self.redo_stack.clear()
+
+    def peek_undo(self):
+        """ 下一步撤销的 (事件, 逆事件)，没有时返回 None。 """
+        return self.undo_stack[-1] if self.undo_stack else None
+
+    def peek_redo(self):
+        return self.redo_stack[-1] if self.redo_stack else None
+
+    def undo(self, apply):
+        """
+        撤销最近一步。
+
+        :param apply: callable，apply(event) 应用事件并返回逆事件。
+        :return: dict，应用的逆事件；没有可撤销的操作时返回 None。
+        """
+        if not self.undo_stack:
+            return None
+        event, inverse = self.undo_stack.pop()
+        self.redo_stack.append((inverse, apply(inverse)))
+        return inverse
+
+    def redo(self, apply):
+        """ 重做最近撤销的一步，返回重新应用的事件；没有可重做的操作时返回 None。 """
+        if not self.redo_stack:
+            return None
+        inverse, event = self.redo_stack.pop()
+        self.undo_stack.append((event, apply(event)))
+        return event
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
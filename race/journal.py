@@ -0,0 +1,304 @@
+import datetime
+import gc
+import glob
+import json
+import os
+import shutil
+import threading
+
+from .model import *
+
+SNAPSHOT_FILE = "snapshot.json"
+SEGMENT_PATTERN = "journal-*.jsonl"
+LOCK_FILE = "journal.lock"
+
+
+class JournalLockedError(RuntimeError):
+    """ 比赛记录目录正被另一个程序使用。 """
+
+
+def _lock_file(file):
+    # 非阻塞的独占锁，进程退出（包括崩溃）时由操作系统释放
+    if os.name == "nt":
+        import msvcrt
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock_file(file):
+    if os.name == "nt":
+        import msvcrt
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def _fsync_directory(directory):
+    # 重命名后同步目录项，Windows 不支持打开目录，跳过即可
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+class RaceJournal:
+    """
+    崩溃安全的比赛记录：只追加的事件日志 + 定期快照。
+
+    append 只把事件序列化后放入缓冲区，后台线程每隔 flush_interval 秒批量写入并 fsync；
+    snapshot 把完整状态原子地写入 snapshot.json（临时文件 + fsync + 重命名），之后的事件写入新的日志分段，
+    已被快照覆盖的旧分段随即删除。启动时 recover 读取快照并重放其后的事件。
+    记录目录由锁文件独占，第二个程序无法覆盖正在使用的记录；快照无法读取时原有记录移入 damaged 子目录，不会被删除。
+    快照按队伍缓存序列化结果，只重新序列化上次快照后有事件涉及的队伍和当前队伍，全天的比赛数据也只需毫秒级。
+    快照中的队伍与成绩以按字段顺序排列的列表（Team.to_row）保存，不重复保存键名。
+    """
+
+    def __init__(self, directory, flush_interval=0.2, snapshot_every=1000):
+        """
+        :param directory: str，记录目录。
+        :param flush_interval: float，批量写入与 fsync 的间隔（秒）。
+        :param snapshot_every: int，距上次快照的事件数达到该值时 needs_snapshot 返回 True。
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.sequence = 0
+        self.events_since_snapshot = 0
+
+        # 每支队伍序列化后的 JSON 与之后被修改过的队伍序号
+        self._fragments = []
+        self._dirty = set()
+
+        self._condition = threading.Condition()
+        self._pending = []
+        self._file = None
+        self._thread = None
+        self._running = False
+        self._lock = None
+
+        # 无法读取而被移走的记录所在目录
+        self.damaged = None
+
+    def lock(self):
+        """ 独占记录目录（recover 与 start 会自动调用），目录已被其他程序使用时抛出 JournalLockedError。 """
+        if self._lock:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        file = open(os.path.join(self.directory, LOCK_FILE), "a+")
+        try:
+            _lock_file(file)
+        except OSError:
+            file.close()
+            raise JournalLockedError(f"比赛记录目录 {os.path.abspath(self.directory)} 正被另一个计时程序使用")
+        self._lock = file
+
+    def recover(self, apply):
+        """
+        从快照与日志尾部恢复状态。
+
+        :param apply: callable，apply(state, event)，把事件应用到比赛数据。
+        :return: tuple，(RaceData, 重放的事件数)；没有任何记录时返回 (None, 0)，
+                 快照无法读取时原有记录移入 damaged 子目录（见 self.damaged），同样返回 (None, 0)。
+        """
+        self.lock()
+        # 恢复时一次性创建大量对象且不会产生循环引用，暂停循环垃圾回收可省去约一半的耗时
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._recover(apply)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _recover(self, apply):
+        segments = sorted(glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)))
+        try:
+            with open(os.path.join(self.directory, SNAPSHOT_FILE), "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+            if "状态" in snapshot:
+                # 旧格式：以中文键保存的字典
+                state = RaceData.from_dict(dict(snapshot["状态"], 队伍名单=snapshot["队伍名单"]))
+            else:
+                state = RaceData(snapshot["比赛进度"], [Team.from_row(row) for row in snapshot["队伍名单"]])
+            sequence = snapshot["序号"]
+        except FileNotFoundError:
+            if segments:
+                # 有日志分段却没有快照，不能当作全新的比赛
+                self.damaged = self._move_records("damaged")
+            return None, 0
+        except (OSError, ValueError, LookupError, TypeError):
+            # start 会写入新的快照并删除日志分段，先把无法读取的记录移走
+            self.damaged = self._move_records("damaged")
+            return None, 0
+
+        self.sequence = sequence
+        replayed = 0
+        for path in segments:
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # 崩溃时写到一半的最后一行
+                        break
+                    sequence = event.pop("序号")
+                    if sequence <= self.sequence:
+                        continue
+                    apply(state, event)
+                    self.sequence = sequence
+                    replayed += 1
+
+        self.events_since_snapshot = replayed
+        return state, replayed
+
+    def start(self, state):
+        """ 开始记录：先写一份当前状态的快照，保证之后总能从快照恢复。 """
+        self.lock()
+        self._fragments = []
+        self._write_snapshot(*self._serialize(state))
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="race-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, event):
+        """
+        追加事件（界面线程调用，不等待磁盘）。
+
+        :return: int，事件序号。
+        """
+        with self._condition:
+            self.sequence += 1
+            self._pending.append(json.dumps(dict(event, 序号=self.sequence), ensure_ascii=False) + "\n")
+            self.events_since_snapshot += 1
+            if isinstance(event.get("队伍"), int):
+                self._dirty.add(event["队伍"])
+            return self.sequence
+
+    def needs_snapshot(self):
+        return self.events_since_snapshot >= self.snapshot_every
+
+    def snapshot(self, state):
+        """ 在调用线程中序列化有变化的队伍（保证与事件序号一致），由后台线程拼接并按顺序写入。 """
+        with self._condition:
+            self._pending.append(self._serialize(state))
+            self.events_since_snapshot = 0
+            self._condition.notify()
+
+    def _serialize(self, state):
+        # 倒计时不产生事件，当前队伍的剩余时间可能已经变化，总是重新序列化
+        teams = state.teams
+        dirty = self._dirty | {state.progress}
+        self._dirty = set()
+        del self._fragments[len(teams):]
+        for index in dirty:
+            if index < len(self._fragments):
+                self._fragments[index] = json.dumps(teams[index].to_row(), ensure_ascii=False)
+        for index in range(len(self._fragments), len(teams)):
+            self._fragments.append(json.dumps(teams[index].to_row(), ensure_ascii=False))
+
+        # 拼接在后台线程中完成，这里只复制片段列表
+        return self.sequence, state.progress, list(self._fragments)
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                if self._running and not self._pending:
+                    self._condition.wait(self.flush_interval)
+                items = self._pending
+                self._pending = []
+                running = self._running
+            if items:
+                self._write(items)
+            if not running:
+                break
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, items):
+        lines = []
+        for item in items:
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+            self._write_lines(lines)
+            lines = []
+            self._write_snapshot(*item)
+        self._write_lines(lines)
+
+    def _write_lines(self, lines):
+        if not lines:
+            return
+        if self._file is None:
+            # 新分段以其第一个事件的序号命名
+            first = json.loads(lines[0])["序号"]
+            self._file = open(os.path.join(self.directory, f"journal-{first:012d}.jsonl"), "a", encoding="utf-8")
+        self._file.write("".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _write_snapshot(self, sequence, progress, fragments):
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            file.write(f'{{"序号": {sequence}, "比赛进度": {progress}, "队伍名单": [{", ".join(fragments)}]}}')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+        _fsync_directory(self.directory)
+
+        # 快照之前的事件都已包含在快照中，关闭当前分段并删除全部旧分段
+        if self._file:
+            self._file.close()
+            self._file = None
+        for segment in glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)):
+            os.remove(segment)
+
+    def archive(self):
+        """ 把现有记录移入 archive 子目录（开始新的比赛记录前调用），返回归档目录。 """
+        self._stop()
+        archive = self._move_records("archive")
+        self.sequence = 0
+        self.events_since_snapshot = 0
+        return archive
+
+    def _move_records(self, name):
+        # 移入 name 子目录下以当前时间命名的目录，同一秒内多次移动时加序号区分
+        base = os.path.join(self.directory, name, f"{datetime.datetime.now():%Y%m%d-%H%M%S}")
+        target = base
+        suffix = 1
+        while os.path.exists(target):
+            target = f"{base}-{suffix}"
+            suffix += 1
+        os.makedirs(target)
+        for path in glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)) + \
+                glob.glob(os.path.join(self.directory, SNAPSHOT_FILE)):
+            shutil.move(path, target)
+        return target
+
+    def close(self):
+        """ 写入全部缓冲的事件，停止后台线程并释放记录目录。 """
+        self._stop()
+        if self._lock:
+            _unlock_file(self._lock)
+            self._lock.close()
+            self._lock = None
+
+    def _stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
@@ -0,0 +1,78 @@
+from bisect import bisect_left, insort
+
+from .model import *
+
+
+class Leaderboard:
+    """
+    按最好成绩排序的排行榜。
+
+    排序键为 (最好成绩, 队伍编号, 队伍序号)，成绩相同的队伍按队伍编号排列，顺序与操作先后无关；
+    没有已确认成绩的队伍不参与排名。键保存在有序列表中，队伍成绩变化时二分查找旧键与新位置，
+    只需 O(log n) 次比较（列表的插入删除为一次内存移动，两千支队伍时可忽略）。
+
+    名次不做缓存，每次查询二分查找同成绩的第一支队伍，前 N 名直接取列表开头。缓存每支队伍的名次需要在成绩变化时
+    改写新旧位置之间全部队伍的名次（首次有成绩或成绩作废时为之后的全部队伍），更新耗时随队伍数线性增长，
+    而排行榜每次更新后只查询一次名次与前 N 名。
+    """
+
+    def __init__(self, first=1):
+        """
+        :param first: int，参与排名的第一支队伍的序号（0 号为测试队伍，与导出结果一致）。
+        """
+        self.first = first
+        self.keys = []
+        self.key_of = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def _key(index, team):
+        if team.best_record >= NO_RECORD:
+            return None
+        return team.best_record, team.number, index
+
+    def rebuild(self, teams):
+        """ 按全部队伍重建（导入名单或恢复比赛数据后调用）。 """
+        self.key_of = {}
+        for index in range(self.first, len(teams)):
+            key = self._key(index, teams[index])
+            if key is not None:
+                self.key_of[index] = key
+        self.keys = sorted(self.key_of.values())
+
+    def update(self, index, team):
+        """
+        队伍成绩变化后调用。
+
+        :return: bool，排行榜是否变化。
+        """
+        if index < self.first:
+            return False
+        old = self.key_of.get(index)
+        new = self._key(index, team)
+        if old == new:
+            return False
+        if old is not None:
+            del self.keys[bisect_left(self.keys, old)]
+            del self.key_of[index]
+        if new is not None:
+            insort(self.keys, new)
+            self.key_of[index] = new
+        return True
+
+    def rank(self, index):
+        """ 队伍的名次（成绩相同的队伍名次相同），未参与排名时返回 None。 """
+        key = self.key_of.get(index)
+        if key is None:
+            return None
+        return bisect_left(self.keys, (key[0],)) + 1
+
+    def top(self, count):
+        """ 前 count 名，返回 [(名次, 队伍序号, 最好成绩)]。 """
+        result = []
+        for position, (best_record, _, index) in enumerate(self.keys[:count]):
+            rank = result[-1][0] if result and result[-1][2] == best_record else position + 1
+            result.append((rank, index, best_record))
+        return result
@@ -0,0 +1,128 @@
+""" 比赛数据模型：队伍、成绩与罚时 """
+
+from dataclasses import dataclass, field
+
+NO_RECORD = 999.999
+
+STATE_PENDING = "未处理"
+STATE_CONFIRMED = "已确认"
+STATE_VOID = "已作废"
+
+
+class KeyAdapter:
+    """
+    按原来的中文键读写属性，供仍以字典方式访问队伍的代码（如修改剩余时间对话框）使用。
+
+    与字典不同，拼错的键会抛出 KeyError，而不是悄悄返回默认值或新增一个键。
+    """
+    __slots__ = ()
+    KEYS = {}
+
+    def __getitem__(self, key):
+        return getattr(self, self.KEYS[key])
+
+    def __setitem__(self, key, value):
+        setattr(self, self.KEYS[key], value)
+
+    def to_dict(self):
+        """ 转换为以中文键表示的字典（事件与导出使用）。 """
+        return {key: getattr(self, attribute) for key, attribute in self.KEYS.items()}
+
+
+@dataclass(slots=True)
+class Record(KeyAdapter):
+    """ 一次成绩，罚时为 (名称, 秒数) 元组的列表。 """
+    raw_time: float
+    corrected_time: float
+    state: str = STATE_PENDING
+    penalties: list = field(default_factory=list)
+    received_at: float | None = None
+
+    KEYS = {"原始时间": "raw_time", "修正时间": "corrected_time", "状态": "state", "罚时": "penalties",
+            "接收时间": "received_at"}
+
+    @property
+    def confirmed(self):
+        return self.state == STATE_CONFIRMED
+
+    @property
+    def total_penalty(self):
+        return sum(penalty[1] for penalty in self.penalties)
+
+    def update_corrected_time(self):
+        """ 修正时间 = 原始时间 + 全部罚时（只遍历该成绩的罚时，撤销后与修改前完全一致）。 """
+        self.corrected_time = self.raw_time + self.total_penalty
+
+    def to_row(self):
+        """ 紧凑的快照表示：按字段顺序排列的列表，不重复保存键名。 """
+        return [self.raw_time, self.corrected_time, self.state, self.penalties, self.received_at]
+
+    @classmethod
+    def from_row(cls, row):
+        raw_time, corrected_time, state, penalties, received_at = row
+        return cls(raw_time, corrected_time, state, [tuple(penalty) for penalty in penalties], received_at)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["原始时间"], data["修正时间"], data.get("状态", STATE_PENDING),
+                   [tuple(penalty) for penalty in data.get("罚时", [])], data.get("接收时间"))
+
+
+@dataclass(slots=True)
+class Team(KeyAdapter):
+    number: str
+    name: str
+    members: str
+    phase: str
+    remaining_time: int
+    paused: bool = True
+    records: list = field(default_factory=list)
+    best_record: float = NO_RECORD
+
+    KEYS = {"队伍编号": "number", "队伍名称": "name", "队伍成员": "members", "比赛阶段": "phase",
+            "剩余时间": "remaining_time", "是否暂停": "paused", "所有成绩": "records", "最好成绩": "best_record"}
+
+    def update_best_record(self):
+        """ 最好成绩 = 已确认成绩中最小的修正时间。 """
+        self.best_record = min((record.corrected_time for record in self.records if record.state == STATE_CONFIRMED),
+                               default=NO_RECORD)
+
+    def to_dict(self):
+        data = KeyAdapter.to_dict(self)
+        data["所有成绩"] = [record.to_dict() for record in self.records]
+        return data
+
+    def to_row(self):
+        return [self.number, self.name, self.members, self.phase, self.remaining_time, self.paused,
+                self.best_record, [record.to_row() for record in self.records]]
+
+    @classmethod
+    def from_row(cls, row):
+        number, name, members, phase, remaining_time, paused, best_record, records = row
+        return cls(number, name, members, phase, remaining_time, paused,
+                   [Record.from_row(record) for record in records], best_record)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["队伍编号"], data["队伍名称"], data["队伍成员"], data["比赛阶段"], data["剩余时间"],
+                   data.get("是否暂停", True), [Record.from_dict(record) for record in data.get("所有成绩", [])],
+                   data.get("最好成绩", NO_RECORD))
+
+
+@dataclass(slots=True)
+class RaceData(KeyAdapter):
+    progress: int = 0
+    teams: list = field(default_factory=list)
+
+    KEYS = {"比赛进度": "progress", "队伍名单": "teams"}
+
+    @property
+    def current_team(self):
+        return self.teams[self.progress]
+
+    def to_dict(self):
+        return {"比赛进度": self.progress, "队伍名单": [team.to_dict() for team in self.teams]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["比赛进度"], [Team.from_dict(team) for team in data["队伍名单"]])
@@ -1,2 +1,7 @@
 from .audio_play import *
 from .communication import *
+from .mailbox import *
+from .receiver_process import *
+from .capture import *
+from .countdown import *
+from .realtime_clock import *
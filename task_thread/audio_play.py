@@ -1,18 +1,222 @@
-import pygame
-from PySide6.QtCore import QThread
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
 
+from PySide6.QtCore import QThread, Signal
 
-class AudioPlayThread(QThread):
-    def __init__(self, audio_file):
+from utils.lazy_import import lazy_import
+
+# 由音频服务线程首次使用时导入，不占用启动时间
+np = lazy_import("numpy")
+pygame = lazy_import("pygame")
+
+# 提示音播放方式：与正在播放的提示音叠加、打断优先级不高于自己的提示音、或等待其播放结束
+CUE_OVERLAP = "overlap"
+CUE_PREEMPT = "preempt"
+CUE_QUEUE = "queue"
+
+# 倒计时提示音：{名称: 依次发出的音高（Hz）}
+WARNING_TONES = {
+    "倒计时提示": (660, 660),
+    "倒计时读秒": (880,),
+    "倒计时末秒": (1320,),
+}
+
+
+def warning_cue(seconds):
+    """ 按剩余秒数选择倒计时提示音：半分钟以上为双音，最后三秒为高音，其余为单音。 """
+    if seconds >= 30:
+        return "倒计时提示"
+    if seconds <= 3:
+        return "倒计时末秒"
+    return "倒计时读秒"
+
+
+def synthesize_tone(frequencies, duration=0.15, gap=0.08, sample_rate=44100, volume=0.4, fade=0.005):
+    """
+    合成提示音：依次发出 frequencies 中的各个正弦音，首尾淡入淡出避免爆音。
+
+    :return: numpy.ndarray，形状为 (采样数, 2) 的 int16 立体声采样，可直接交给 AudioService。
+    """
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    envelope = np.minimum(1.0, np.minimum(t, duration - t) / fade)
+    silence = np.zeros(int(gap * sample_rate))
+
+    parts = []
+    for index, frequency in enumerate(frequencies):
+        if index:
+            parts.append(silence)
+        parts.append(np.sin(2 * np.pi * frequency * t) * envelope)
+    samples = (np.concatenate(parts) * volume * 32767).astype(np.int16)
+    return np.ascontiguousarray(np.column_stack((samples, samples)))
+
+
+def match_mixer_format(samples, mixer_format):
+    """
+    把 int16 采样转换为混音器的格式（pygame.mixer.get_init() 的位深与声道数）。
+
+    :param samples: numpy.ndarray，形状为 (采样数, 2) 的 int16 立体声采样。
+    :param mixer_format: tuple，(采样率, 位深, 声道数)，位深为负表示有符号，32 位为浮点。
+    :return: numpy.ndarray，可交给 pygame.mixer.Sound(array=...)。
+    """
+    _, size, channels = mixer_format
+    if channels == 1:
+        samples = samples.mean(axis=1).astype(np.int16)
+    elif channels != 2:
+        samples = samples[:, [channel % 2 for channel in range(channels)]]
+
+    if size == -16:
+        converted = samples
+    elif size == 16:
+        converted = (samples.astype(np.int32) + 32768).astype(np.uint16)
+    elif size == -8:
+        converted = (samples >> 8).astype(np.int8)
+    elif size == 8:
+        converted = ((samples >> 8) + 128).astype(np.uint8)
+    elif abs(size) == 32:
+        # pygame 的 32 位混音器为浮点格式（get_init 返回 -32）
+        converted = samples.astype(np.float32) / 32768
+    else:
+        raise ValueError(f"不支持的混音器位深：{size}")
+    return np.ascontiguousarray(converted)
+
+
+class AudioService(QThread):
+    """
+    常驻音频服务。
+
+    启动时初始化一次混音器并把全部提示音解码为内存中的 Sound，之后按优先级队列播放，
+    不再为每次提示创建线程、初始化混音器和读取文件。
+    规则为 {提示音名称: (优先级, 播放方式)}，优先级数值越大越优先，未配置的提示音为 (0, CUE_OVERLAP)。
+    """
+    send_status = Signal(str)
+
+    def __init__(self, sources, rules=None, buffer=512):
+        """
+        :param sources: dict，{提示音名称: 音频文件路径、(采样数, 2) 的 int16 数组或返回该数组的函数}，
+                        函数以关键字参数 sample_rate 接收混音器的采样率，数组按混音器的位深与声道数转换。
+        :param rules: dict，{提示音名称: (优先级, 播放方式)}。
+        :param buffer: int，混音器缓冲区采样数，越小延迟越低。
+        """
         super().__init__()
-        self.audio_file = audio_file
+        self.sources = dict(sources)
+        self.rules = rules or {}
+        self.buffer = buffer
+        self.sounds = {}
+        self.running = True
+        self.failed = False
+        self.ready = threading.Event()
+        self._loading = False
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._playing = []
+
+        # 请求到开始播放的延迟（秒）
+        self.latencies = deque(maxlen=256)
+
+    def register(self, name, source):
+        """ 添加提示音（可在服务启动前后调用，启动后在服务线程中解码）。 """
+        with self._condition:
+            self.sources[name] = source
+            if self._loading and not self.failed:
+                self._queue_request(name, None)
+
+    def play(self, name):
+        """ 请求播放提示音（任意线程调用，立即返回），混音器初始化失败后忽略。 """
+        with self._condition:
+            if not self.failed:
+                self._queue_request(name, time.perf_counter())
+
+    def _queue_request(self, name, requested_at):
+        # 解码请求（requested_at 为 None）优先于播放请求
+        priority = float("inf") if requested_at is None else self.rules.get(name, (0, CUE_OVERLAP))[0]
+        heapq.heappush(self._queue, (-priority, next(self._sequence), name, requested_at))
+        self._condition.notify()
 
     def run(self):
         try:
+            pygame.mixer.pre_init(44100, -16, 2, self.buffer)
             pygame.mixer.init()
-            pygame.mixer.music.load(self.audio_file)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-        except Exception:
+            pygame.mixer.set_num_channels(16)
+            with self._condition:
+                names = list(self.sources)
+                self._loading = True
+            for name in names:
+                self._load(name)
+        except Exception as e:
+            # 服务线程退出，之后的播放请求不再排队
+            with self._condition:
+                self.failed = True
+                self._queue.clear()
+            self.send_status.emit(f"音频初始化失败：{e}")
+            return
+        finally:
+            self.ready.set()
+
+        while True:
+            with self._condition:
+                while self.running and not self._queue:
+                    self._condition.wait()
+                if not self.running:
+                    break
+                _, _, name, requested_at = heapq.heappop(self._queue)
+
+            if requested_at is None:
+                self._load(name)
+            else:
+                self._play(name, requested_at)
+
+        pygame.mixer.quit()
+
+    def _load(self, name):
+        source = self.sources[name]
+        try:
+            mixer_format = pygame.mixer.get_init()
+            if callable(source):
+                source = source(sample_rate=mixer_format[0])
+            if isinstance(source, np.ndarray):
+                self.sounds[name] = pygame.mixer.Sound(array=match_mixer_format(source, mixer_format))
+            else:
+                self.sounds[name] = pygame.mixer.Sound(source)
+        except Exception as e:
+            self.send_status.emit(f"提示音“{name}”加载失败：{e}")
+
+    def _play(self, name, requested_at):
+        sound = self.sounds.get(name)
+        if sound is None:
             return
+        priority, mode = self.rules.get(name, (0, CUE_OVERLAP))
+        self._playing = [(p, channel) for p, channel in self._playing if channel.get_busy()]
+
+        if mode == CUE_PREEMPT:
+            for playing_priority, channel in self._playing:
+                if playing_priority <= priority:
+                    channel.stop()
+        elif mode == CUE_QUEUE:
+            while self.running and any(channel.get_busy() for _, channel in self._playing):
+                time.sleep(0.005)
+
+        channel = pygame.mixer.find_channel(True)
+        channel.play(sound)
+        self._playing.append((priority, channel))
+        self.latencies.append(time.perf_counter() - requested_at)
+
+    def statistics(self):
+        """ 返回请求到开始播放的延迟统计（毫秒）。 """
+        latencies = list(self.latencies)
+        if not latencies:
+            return {"播放次数": 0, "平均延迟": 0.0, "最大延迟": 0.0}
+        return {
+            "播放次数": len(latencies),
+            "平均延迟": sum(latencies) / len(latencies) * 1000,
+            "最大延迟": max(latencies) * 1000,
+        }
+
+    def stop(self):
+        with self._condition:
+            self.running = False
+            self._condition.notify()
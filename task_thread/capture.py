@@ -0,0 +1,205 @@
+import os
+import struct
+import threading
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+from .communication import FRAME_REAL, FRAME_FINAL, FRAME_RESET, FrameDecoder, dispatch_frames
+
+# 文件格式：魔数 + 记录序列；记录头为（记录类型、数据源编号、单调时钟时间戳、数据长度）
+# 每次打开文件先写一条时钟记录，数据为同一时刻的系统时间，用于把单调时钟时间戳换算为系统时间
+CAPTURE_MAGIC = b"USTBCAP1"
+CAPTURE_RECORD = struct.Struct("<BIdI")
+CAPTURE_CLOCK = struct.Struct("<d")
+RECORD_SOURCE = 0
+RECORD_DATA = 1
+RECORD_CLOCK = 2
+# 回放等待期间检查停止请求的间隔（秒）
+REPLAY_POLL_INTERVAL = 0.05
+
+
+class CaptureWriter:
+    """
+    原始数据记录器：以追加方式记录每条链路收到的每一段原始数据。
+
+    数据源（串口、TCP 客户端、UDP 发送端）首次出现时写入一条声明记录，之后只写编号。
+    文件在收到第一段数据时才创建。
+
+    数据按 flush_interval 定时写入磁盘：通信中枢空闲时按 flush_timeout 唤醒并调用 flush，
+    包含最终成绩或 Reset 的数据段写入后立即刷新。
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.file = None
+        self.closed = False
+        self.sources = {}
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def write(self, source, data, flush=False):
+        """
+        :param source: str，数据源名称，如 "TCP 192.168.4.2:5000"。
+        :param data: bytes，原始数据。
+        :param flush: bool，为 True 时立即写入磁盘。
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.closed:
+                return
+            if self.file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self.file = open(self.path, "ab")
+                if self.file.tell() == 0:
+                    self.file.write(CAPTURE_MAGIC)
+                self.file.write(CAPTURE_RECORD.pack(RECORD_CLOCK, 0, now, CAPTURE_CLOCK.size) +
+                                CAPTURE_CLOCK.pack(time.time()))
+            index = self.sources.get(source)
+            if index is None:
+                index = self.sources[source] = len(self.sources)
+                name = source.encode("utf-8")
+                self.file.write(CAPTURE_RECORD.pack(RECORD_SOURCE, index, now, len(name)) + name)
+            self.file.write(CAPTURE_RECORD.pack(RECORD_DATA, index, now, len(data)) + data)
+            self.dirty = True
+
+            if flush or now - self.last_flush >= self.flush_interval:
+                self._flush(now)
+
+    def flush_timeout(self):
+        """
+        :return: float，距下次定时刷新的秒数；没有未写入磁盘的数据时为 None。
+        """
+        if not self.dirty:
+            return None
+        return max(0.0, self.last_flush + self.flush_interval - time.monotonic())
+
+    def flush(self):
+        """ 到达刷新间隔时把缓冲的数据写入磁盘。 """
+        now = time.monotonic()
+        with self._lock:
+            if self.dirty and not self.closed and now - self.last_flush >= self.flush_interval:
+                self._flush(now)
+
+    def _flush(self, now):
+        self.file.flush()
+        self.dirty = False
+        self.last_flush = now
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            if self.file:
+                self.file.close()
+
+
+def read_capture(path, wall_clock=False):
+    """
+    按顺序读取记录文件。
+
+    :param wall_clock: bool，为 True 时按时钟记录把时间戳换算为系统时间（与成绩的接收时间一致），
+                       没有时钟记录的旧文件保持单调时钟时间戳。
+    :return: generator，逐条产出 (时间戳, 数据源名称, 原始数据)，文件末尾不完整的记录被忽略。
+    """
+    with open(path, "rb") as file:
+        if file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"{path} 不是有效的通信记录文件")
+
+        sources = {}
+        offset = 0.0
+        while True:
+            header = file.read(CAPTURE_RECORD.size)
+            if len(header) < CAPTURE_RECORD.size:
+                return
+            kind, index, timestamp, length = CAPTURE_RECORD.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+
+            if kind == RECORD_SOURCE:
+                sources[index] = payload.decode("utf-8")
+            elif kind == RECORD_CLOCK:
+                if wall_clock:
+                    offset = CAPTURE_CLOCK.unpack(payload)[0] - timestamp
+            else:
+                yield timestamp + offset, sources.get(index, str(index)), payload
+
+
+def _sleep_until(deadline, should_stop):
+    """
+    等待到 time.perf_counter() 的 deadline 时刻。记录之间的间隔可能很长，分段等待以便及时响应停止请求。
+
+    :return: bool，被停止时返回 False。
+    """
+    while True:
+        delay = deadline - time.perf_counter()
+        if delay <= 0:
+            return True
+        if should_stop and should_stop():
+            return False
+        time.sleep(min(delay, REPLAY_POLL_INTERVAL))
+
+
+def replay_capture(path, mailbox, speed=1.0, should_stop=None):
+    """
+    把记录文件重新送入帧解码器并投递到邮箱。
+
+    :param path: str，记录文件路径。
+    :param mailbox: 提供 post_real 与 post_event 的对象。
+    :param speed: float，回放倍速，0 表示不等待、以最快速度回放。
+    :param should_stop: callable，返回 True 时提前结束。
+    :return: dict，回放的字节数、帧数与耗时。
+    """
+    decoders = {}
+    frame_callbacks = {
+        FRAME_REAL: mailbox.post_real,
+        FRAME_FINAL: lambda value: mailbox.post_event(FRAME_FINAL, value),
+        FRAME_RESET: lambda: mailbox.post_event(FRAME_RESET),
+    }
+    total_bytes = 0
+    total_frames = 0
+    first_timestamp = None
+    start = time.perf_counter()
+
+    for timestamp, source, data in read_capture(path):
+        if should_stop and should_stop():
+            break
+
+        if speed > 0:
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            if not _sleep_until(start + (timestamp - first_timestamp) / speed, should_stop):
+                break
+
+        decoder = decoders.setdefault(source, FrameDecoder())
+        frames = decoder.feed(data)
+        dispatch_frames(frames, frame_callbacks)
+        total_bytes += len(data)
+        total_frames += len(frames)
+
+    return {"字节数": total_bytes, "帧数": total_frames, "耗时": time.perf_counter() - start}
+
+
+class ReplayThread(QThread):
+    """ 在后台线程中把记录文件回放到控制台的邮箱。 """
+    send_status = Signal(str)
+
+    def __init__(self, path, mailbox, speed=1.0):
+        super().__init__()
+        self.path = path
+        self.mailbox = mailbox
+        self.speed = speed
+        self.running = True
+
+    def run(self):
+        try:
+            result = replay_capture(self.path, self.mailbox, self.speed, lambda: not self.running)
+        except Exception as e:
+            self.send_status.emit(f"回放失败：{e}")
+            return
+        self.send_status.emit(f"回放结束（{result['帧数']} 帧，{result['耗时']:.1f} 秒）")
+
+    def stop(self):
+        self.running = False
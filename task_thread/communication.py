@@ -1,30 +1,253 @@
+import os
 import re
+import selectors
 import socket
+import threading
+import time
+from collections import deque
 
-import serial
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import QObject, QThread, Signal
 
+from utils.lazy_import import lazy_import
 
-def parse_data(data, pattern_callbacks):
+serial = lazy_import("serial")
+
+FRAME_REAL = "real"
+FRAME_FINAL = "final"
+FRAME_RESET = "reset"
+
+# 一次匹配三种帧：{实时时间}、[最终成绩]、Reset
+FRAME_PATTERN = re.compile(rb"\{([-+]?\d*\.\d+|\d+)\}|\[([-+]?\d*\.\d+|\d+)\]|Reset")
+# 缓冲区尾部可能被截断的帧前缀
+PARTIAL_FRAME_PATTERN = re.compile(rb"[{\[][-+]?\d*\.?\d*|R|Re|Res|Rese")
+PARTIAL_FRAME_LAST_BYTES = frozenset(b"{[+-.0123456789Rese")
+
+
+class FrameDecoder:
+    """
+    增量帧解码器，串口、TCP 与 UDP 共用。
+
+    数据以字节形式追加到内部缓冲区，一次扫描取出全部完整帧并按到达顺序返回；
+    被拆包截断的帧尾部会保留到下一次 feed，粘包中的多帧也会逐一返回。
+    """
+
+    def __init__(self, max_pending=64):
+        """
+        :param max_pending: int，未完成帧允许保留的最大字节数，超出后视为噪声丢弃。
+        """
+        self.buffer = bytearray()
+        self.max_pending = max_pending
+        # 既不属于任何帧、也不是换行的字节数（噪声或格式错误的帧）
+        self.discarded = 0
+
+    def feed(self, data):
+        """
+        追加数据并解析出所有完整帧。
+
+        :param data: bytes，新收到的原始数据。
+        :return: list，[(帧类型, 数值), ...]，时间单位为秒，Reset 帧的数值为 None。
+        """
+        if self.buffer:
+            self.buffer += data
+            data = self.buffer
+
+        frames = []
+        end = 0
+        consumed = 0
+        search = FRAME_PATTERN.search
+        match = search(data)
+        while match:
+            index = match.lastindex
+            if index == 1:
+                frames.append((FRAME_REAL, float(match[1]) / 1000))
+            elif index == 2:
+                frames.append((FRAME_FINAL, float(match[2]) / 1000))
+            else:
+                frames.append((FRAME_RESET, None))
+            start, end = match.span()
+            consumed += end - start
+            match = search(data, end)
+        unused = len(data) - consumed - data.count(b"\n") - data.count(b"\r")
+
+        # 仅保留可能是未完成帧的尾部（绝大多数数据以换行或完整帧结尾，直接跳过）
+        if end < len(data) and data[-1] in PARTIAL_FRAME_LAST_BYTES:
+            start = max(data.rfind(b"{", end), data.rfind(b"[", end), data.rfind(b"R", end))
+            if 0 <= start and len(data) - start <= self.max_pending and \
+                    PARTIAL_FRAME_PATTERN.fullmatch(data, start):
+                self.discarded += unused - (len(data) - start)
+                self.buffer = bytearray(data[start:])
+                return frames
+        if self.buffer:
+            self.buffer = bytearray()
+
+        self.discarded += unused
+        return frames
+
+    def reset(self):
+        self.buffer.clear()
+
+
+class LinkStats:
     """
-    通用函数，用于匹配指定模式并触发相应的回调。
+    链路健康统计。
 
-    :param data: str，要解析的字符串。
-    :param pattern_callbacks: list，包含元组，每个元组定义一个模式和回调函数。
-                              格式为 [(pattern, callback), ...]。
+    计数只由通信线程在 record 中写入，界面线程通过 snapshot 读取，不加锁；
+    快照中的计数彼此之间可能相差一次接收，对显示而言足够准确。
     """
-    for pattern, callback in pattern_callbacks:
-        match = re.search(pattern, data)
-        if match:
-            message = float(match.group(1)) / 1000
-            callback(message)
 
+    # 抖动的平滑系数（同 RFC 3550 的到达间隔抖动估计）
+    JITTER_GAIN = 1 / 16
+
+    def __init__(self):
+        self.bytes_received = 0
+        self.frames = {FRAME_REAL: 0, FRAME_FINAL: 0, FRAME_RESET: 0}
+        self.discarded_bytes = 0
+        self.jitter = 0.0
+        self.last_frame_at = None
+        self._last_real = {}
+
+    def record(self, source, size, frames, discarded):
+        """
+        记录一次接收（通信线程调用）。
+
+        :param source: str，数据源名称，抖动按数据源分别计算。
+        :param size: int，收到的字节数。
+        :param frames: list，解码出的帧。
+        :param discarded: int，本次被丢弃的字节数。
+        """
+        self.bytes_received += size
+        self.discarded_bytes += discarded
+        if not frames:
+            return
+
+        now = time.monotonic()
+        self.last_frame_at = now
+        counts = self.frames
+        last_real = None
+        for kind, value in frames:
+            counts[kind] += 1
+            if kind == FRAME_REAL:
+                last_real = value
+
+        # 实时帧到达间隔与帧内时间差之差即为传输抖动；计时器重置后时间回退，此时只更新基准
+        if last_real is not None:
+            previous = self._last_real.get(source)
+            if previous and last_real > previous[1]:
+                deviation = abs((now - previous[0]) - (last_real - previous[1]))
+                self.jitter += (deviation - self.jitter) * self.JITTER_GAIN
+            self._last_real[source] = (now, last_real)
+
+    def snapshot(self, pending=0):
+        """
+        :param pending: int，解码器中等待拼接的字节数。
+        :return: dict，累计计数与当前状态，最近帧间隔单位为秒（尚未收到帧时为 None）。
+        """
+        last_frame_at = self.last_frame_at
+        return {
+            "字节数": self.bytes_received,
+            "实时帧": self.frames[FRAME_REAL],
+            "成绩帧": self.frames[FRAME_FINAL],
+            "Reset": self.frames[FRAME_RESET],
+            "丢弃字节": self.discarded_bytes,
+            "抖动": self.jitter,
+            "最近帧间隔": None if last_frame_at is None else time.monotonic() - last_frame_at,
+            "待解码字节": pending,
+        }
+
+
+def dispatch_frames(frames, frame_callbacks):
+    """
+    按顺序把解码出的帧分发给对应的回调。
+
+    :param frames: list，FrameDecoder.feed 的返回值。
+    :param frame_callbacks: dict，{帧类型: 回调函数}，Reset 帧的回调不带参数。
+    """
+    for kind, value in frames:
+        callback = frame_callbacks.get(kind)
+        if callback is None:
+            continue
+        if value is None:
+            callback()
+        else:
+            callback(value)
+
+
+class CommunicationLink(QObject):
+    """
+    通信链路基类，由 CommunicationHub 统一在同一个线程中收发。
 
-class SerialPortThread(QThread):
-    real_received = Signal(float)
-    final_received = Signal(float)
-    timer_reset = Signal()
+    子类在构造时打开端口（失败时 running 为 False 并发出 send_status），
+    attach 时通过 register 把自己的文件对象注册到选择器，key.data 为 (链路, 读回调)。
+    """
     send_status = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.running = False
+        self.hub = None
+        self.selector = None
+        self.registered = []
+        self.status_message = ""
+        self.stats = LinkStats()
+
+    def report_status(self, message):
+        """ 记录并发出状态消息，构造期间的消息可通过 status_message 补取。 """
+        self.status_message = message
+        self.send_status.emit(message)
+
+    def attach(self, selector):
+        self.selector = selector
+
+    def register(self, fileobj, callback):
+        self.selector.register(fileobj, selectors.EVENT_READ, (self, callback))
+        self.registered.append(fileobj)
+
+    def unregister(self, fileobj):
+        self.registered.remove(fileobj)
+        self.selector.unregister(fileobj)
+
+    def detach(self):
+        """ 注销全部文件对象，子类在此基础上关闭端口（在通信线程中调用）。 """
+        self.running = False
+        for fileobj in self.registered:
+            try:
+                self.selector.unregister(fileobj)
+            except (KeyError, ValueError):
+                pass
+        self.registered.clear()
+
+    def receive(self, decoder, data, source):
+        """
+        记录、统计并解码收到的数据。
+
+        :param source: str，数据源名称，用于原始数据记录。
+        :return: list，帧列表。
+        """
+        discarded = decoder.discarded
+        frames = decoder.feed(data)
+        if self.hub and self.hub.capture:
+            # 最终成绩与 Reset 立即写入磁盘，不等待定时刷新
+            self.hub.capture.write(source, data, flush=any(kind != FRAME_REAL for kind, _ in frames))
+        self.stats.record(source, len(data), frames, decoder.discarded - discarded)
+        return frames
+
+    def pending_bytes(self):
+        """ 解码器中等待拼接的字节数，由子类按自己的解码器汇总。 """
+        return 0
+
+    def statistics(self):
+        """ 返回链路统计快照（可在界面线程调用）。 """
+        return self.stats.snapshot(self.pending_bytes())
+
+    def stop(self):
+        self.running = False
+        if self.hub:
+            self.hub.remove_link(self)
+        else:
+            self.detach()
+
+
+class SerialLink(CommunicationLink):
     message_received = Signal(str)
 
     def __init__(self, port, baudrate):
@@ -32,129 +255,328 @@ class SerialPortThread(QThread):
         self.port = port
         self.baudrate = baudrate
         self.serial_connection = None
-        self.patterns_callbacks = [
-            (r"\{([-+]?\d*\.\d+|\d+)\}", self.real_received.emit),
-            (r"\[([-+]?\d*\.\d+|\d+)\]", self.final_received.emit),
-        ]
+        self.decoder = FrameDecoder()
+        self.line_buffer = b""
+        self._pump_thread = None
+        self._pump_reader = None
+        self._pump_writer = None
 
         try:
             self.serial_connection = serial.Serial(self.port, self.baudrate, bytesize=8, stopbits=serial.STOPBITS_ONE,
-                                                   parity=serial.PARITY_NONE, timeout=1)
+                                                   parity=serial.PARITY_NONE, timeout=0)
             self.running = True
         except Exception as e:
-            self.send_status.emit(f"打开串口失败：{e}")
-            self.running = False
+            self.report_status(f"打开串口失败：{e}")
             return
 
-        self.send_status.emit(f"串口打开成功！（绑定端口：{self.port}, 波特率：{self.baudrate}）")
+        self.report_status(f"串口打开成功！（绑定端口：{self.port}, 波特率：{self.baudrate}）")
 
-    def run(self):
+    def attach(self, selector):
+        super().attach(selector)
+        try:
+            self.register(self.serial_connection.fileno(), self._read_port)
+        except (AttributeError, OSError, ValueError):
+            # Windows 下串口句柄不能交给 select，改由转发线程阻塞读取后写入本地套接字
+            self._pump_reader, self._pump_writer = socket.socketpair()
+            self._pump_reader.setblocking(False)
+            self.register(self._pump_reader, self._read_pump)
+            self.serial_connection.timeout = 0.5
+            self._pump_thread = threading.Thread(target=self._pump, daemon=True)
+            self._pump_thread.start()
+
+    def _read_port(self, _):
+        # 可读但无数据说明设备已断开，pyserial 会抛出 SerialException
+        return self._handle(self.serial_connection.read(self.serial_connection.in_waiting or 1))
+
+    def _read_pump(self, _):
+        data = self._pump_reader.recv(65536)
+        if not data:
+            raise ConnectionError("串口转发线程已退出")
+        return self._handle(data)
+
+    def _pump(self):
         try:
             while self.running:
-                if self.serial_connection.in_waiting > 0:
-                    data = self.serial_connection.readline().decode('ascii', errors='ignore').strip()
-                    self.message_received.emit(data)
-                    if "Reset" in data:
-                        self.timer_reset.emit()
-                    else:
-                        try:
-                            parse_data(data, self.patterns_callbacks)
-                        except Exception:
-                            continue
-        except Exception as e:
-            self.stop()
-            self.send_status.emit(f"串口连接崩溃: {e}")
+                data = self.serial_connection.read(1)
+                if not data:
+                    continue
+                waiting = self.serial_connection.in_waiting
+                if waiting:
+                    data += self.serial_connection.read(waiting)
+                self._pump_writer.sendall(data)
+        except Exception:
+            pass
+        finally:
+            self._pump_writer.close()
 
-    def stop(self):
-        self.running = False
+    def _handle(self, data):
+        self._emit_lines(data)
+        return self.receive(self.decoder, data, f"串口 {self.port}")
+
+    def _emit_lines(self, data):
+        """ 按行转发原始数据给调试面板，未完成的行留待下次拼接。 """
+        *lines, self.line_buffer = (self.line_buffer + data).split(b"\n")
+        if len(self.line_buffer) > 1024:
+            lines.append(self.line_buffer)
+            self.line_buffer = b""
+        for line in lines:
+            self.message_received.emit(line.decode('ascii', errors='ignore').strip())
+
+    def pending_bytes(self):
+        return len(self.decoder.buffer)
+
+    def detach(self):
+        super().detach()
+        if self._pump_reader:
+            self._pump_reader.close()
         if self.serial_connection and self.serial_connection.is_open:
+            if self._pump_thread:
+                self.serial_connection.cancel_read()
             self.serial_connection.close()
 
 
-class TcpServerThread(QThread):
-    real_received = Signal(float)
-    final_received = Signal(float)
-    timer_reset = Signal()
-    send_status = Signal(str)
+class TcpClient:
+    """ 单个 TCP 客户端的连接状态，每个客户端独立缓冲与计数。 """
+
+    def __init__(self, connection, address):
+        self.connection = connection
+        self.address = address
+        self.decoder = FrameDecoder()
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.connected_at = time.monotonic()
 
+
+class TcpServerLink(CommunicationLink):
     def __init__(self, host='0.0.0.0', port=32767):
         super().__init__()
         self.host = host
         self.port = port
-        self.running = True
-        self.clients = []
-        self.patterns_callbacks = [
-            (r"\{([-+]?\d*\.\d+|\d+)\}", self.real_received.emit),
-            (r"\[([-+]?\d*\.\d+|\d+)\]", self.final_received.emit),
-        ]
+        self.clients = {}
 
-    def run(self):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as tcp_server:
-            tcp_server.bind((self.host, self.port))
-            tcp_server.listen(5)
-            tcp_server.settimeout(1.0)
+        self.tcp_server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            if os.name == "nt":
+                # Windows 的 SO_REUSEADDR 允许其他程序绑定同一端口，改为独占端口
+                self.tcp_server.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            else:
+                # 程序重启时允许立即重新绑定处于 TIME_WAIT 的端口
+                self.tcp_server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.tcp_server.bind((self.host, self.port))
+            self.port = self.tcp_server.getsockname()[1]
+            self.tcp_server.listen(64)
+            self.tcp_server.setblocking(False)
+            self.running = True
+        except OSError as e:
+            self.tcp_server.close()
+            self.report_status(f"TCP服务器启动失败：{e}")
 
-            while self.running:
-                try:
-                    client_socket, client_address = tcp_server.accept()
-                except socket.timeout:
-                    continue
-                else:
-                    with client_socket:
-                        self.clients.append(client_socket)
-                        while self.running:
-                            try:
-                                data = client_socket.recv(1024)
-                                if not data:
-                                    break
-                                data = data.decode('ascii', errors='ignore').strip()
-                                if "Reset" in data:
-                                    self.timer_reset.emit()
-                                else:
-                                    try:
-                                        parse_data(data, self.patterns_callbacks)
-                                    except Exception:
-                                        continue
-                            except ConnectionResetError:
-                                break
-
-                        self.clients.remove(client_socket)
+    def attach(self, selector):
+        super().attach(selector)
+        self.register(self.tcp_server, self._accept)
 
-    def stop(self):
-        self.running = False
+    def _accept(self, _):
+        try:
+            connection, address = self.tcp_server.accept()
+        except BlockingIOError:
+            return None
+        connection.setblocking(False)
+        client = TcpClient(connection, address)
+        self.clients[connection] = client
+        self.register(connection, self._receive_client)
+        return None
+
+    def _receive_client(self, connection):
+        client = self.clients[connection]
+        try:
+            data = connection.recv(4096)
+        except BlockingIOError:
+            return None
+        except OSError:
+            data = b""
 
+        if not data:
+            self._disconnect(client)
+            return None
 
-class UdpServerThread(QThread):
-    real_received = Signal(float)
-    final_received = Signal(float)
-    timer_reset = Signal()
-    send_status = Signal(str)
+        frames = self.receive(client.decoder, data, "TCP {}:{}".format(*client.address))
+        client.bytes_received += len(data)
+        client.frames_received += len(frames)
+        return frames
+
+    def pending_bytes(self):
+        return sum(len(client.decoder.buffer) for client in list(self.clients.values()))
+
+    def _disconnect(self, client):
+        self.unregister(client.connection)
+        client.connection.close()
+        del self.clients[client.connection]
 
+    def detach(self):
+        super().detach()
+        for client in self.clients.values():
+            client.connection.close()
+        self.clients.clear()
+        self.tcp_server.close()
+
+
+class UdpServerLink(CommunicationLink):
     def __init__(self, host='0.0.0.0', port=32767):
         super().__init__()
         self.host = host
         self.port = port
+        self.decoders = {}
+
+        self.udp_server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # 加大接收缓冲区，避免高频小数据报在通信线程繁忙时被系统丢弃
+            self.udp_server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            self.udp_server.bind((self.host, self.port))
+            self.port = self.udp_server.getsockname()[1]
+            self.udp_server.setblocking(False)
+            self.running = True
+        except OSError as e:
+            self.udp_server.close()
+            self.report_status(f"UDP服务器启动失败：{e}")
+
+    def attach(self, selector):
+        super().attach(selector)
+        self.register(self.udp_server, self._receive)
+
+    def _receive(self, _):
+        try:
+            data, address = self.udp_server.recvfrom(2048)
+        except (BlockingIOError, ConnectionResetError):
+            # Windows 下对端不可达时 recvfrom 会报 ConnectionResetError，忽略即可
+            return None
+        decoder = self.decoders.setdefault(address, FrameDecoder())
+        return self.receive(decoder, data, "UDP {}:{}".format(*address))
+
+    def pending_bytes(self):
+        return sum(len(decoder.buffer) for decoder in list(self.decoders.values()))
+
+    def detach(self):
+        super().detach()
+        self.udp_server.close()
+
+
+LINK_TYPES = {
+    "串口": SerialLink,
+    "TCP": TcpServerLink,
+    "UDP": UdpServerLink,
+}
+
+
+class CommunicationHub(QThread):
+    """
+    通信中枢：在一个线程中通过 selectors 复用全部串口与套接字。
+
+    链路可在运行时增删；解码后的帧统一投递到 mailbox（需提供 post_real 与 post_event），
+    设置 capture（CaptureWriter）后所有原始数据同时写入记录文件。
+    """
+    send_status = Signal(str)
+
+    def __init__(self, mailbox, capture=None):
+        super().__init__()
+        self.mailbox = mailbox
+        self.capture = capture
         self.running = True
-        self.patterns_callbacks = [
-            (r"\{([-+]?\d*\.\d+|\d+)\}", self.real_received.emit),
-            (r"\[([-+]?\d*\.\d+|\d+)\]", self.final_received.emit),
-        ]
+        self.links = []
+        self.selector = selectors.DefaultSelector()
+        self.frame_callbacks = {
+            FRAME_REAL: mailbox.post_real,
+            FRAME_FINAL: lambda time: mailbox.post_event(FRAME_FINAL, time),
+            FRAME_RESET: lambda: mailbox.post_event(FRAME_RESET),
+        }
+
+        # 跨线程增删链路的命令队列，通过本地套接字唤醒 select
+        self._commands = deque()
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self.selector.register(self._wakeup_reader, selectors.EVENT_READ)
+
+    def add_link(self, link):
+        """ 添加已打开的链路，打开失败的链路直接忽略。 """
+        if link.running:
+            link.hub = self
+            self._post_command(self._attach, link)
+
+    def remove_link(self, link):
+        self._post_command(self._detach, link)
+
+    def _post_command(self, command, link):
+        self._commands.append((command, link))
+        self._wakeup()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_writer.send(b"\0")
+        except OSError:
+            pass
 
     def run(self):
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp_server:
-            udp_server.bind((self.host, self.port))
-
-            while True:
-                data, _ = udp_server.recvfrom(1024)
-                data = data.decode('ascii', errors='ignore').strip()
-                print(data)
-                if "Reset" in data:
-                    self.timer_reset.emit()
-                else:
+        try:
+            while self.running:
+                timeout = self.capture.flush_timeout() if self.capture else None
+                for key, _ in self.selector.select(timeout):
+                    if key.data is None:
+                        self._apply_commands()
+                        continue
+
+                    link, callback = key.data
                     try:
-                        parse_data(data, self.patterns_callbacks)
-                    except Exception:
+                        frames = callback(key.fileobj)
+                    except Exception as e:
+                        self._detach(link)
+                        self.send_status.emit(f"通信链路异常断开: {e}")
                         continue
 
+                    if frames:
+                        dispatch_frames(frames, self.frame_callbacks)
+
+                if self.capture:
+                    self.capture.flush()
+        finally:
+            self._apply_commands()
+            for link in list(self.links):
+                self._detach(link)
+            self.selector.close()
+            if self.capture:
+                self.capture.close()
+            self._wakeup_reader.close()
+            self._wakeup_writer.close()
+
+    def _apply_commands(self):
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+        while self._commands:
+            command, link = self._commands.popleft()
+            command(link)
+
+    def _attach(self, link):
+        if link.running and link not in self.links:
+            self.links.append(link)
+            try:
+                link.attach(self.selector)
+            except Exception as e:
+                self._detach(link)
+                self.send_status.emit(f"通信链路注册失败: {e}")
+
+    def _detach(self, link):
+        if link in self.links:
+            self.links.remove(link)
+        elif link.selector is not None:
+            return
+
+        try:
+            link.detach()
+        except Exception as e:
+            self.send_status.emit(f"通信链路关闭异常: {e}")
+
     def stop(self):
         self.running = False
+        self._wakeup()
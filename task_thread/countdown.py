@@ -0,0 +1,149 @@
+import math
+import time
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+PHASE_PREPARATION = "赛前准备阶段"
+PHASE_RACE = "正式比赛阶段"
+
+
+class CountdownEngine(QObject):
+    """
+    比赛倒计时引擎。
+
+    以 time.monotonic() 截止时刻计时，不累加定时器间隔，界面卡顿或模态对话框不会造成漂移；
+    只在显示的整秒变化或到达预定回调时刻时唤醒。
+    队伍（race.Team）的 remaining_time 仍为整数秒（向上取整），毫秒级余量保存在引擎内，暂停与继续不丢失。
+    """
+    remaining_changed = Signal(int)
+    phase_changed = Signal(str)
+    finished = Signal()
+
+    def __init__(self, race_time, clock=time.monotonic):
+        """
+        :param race_time: callable，返回正式比赛时长（秒），在赛前准备结束的时刻读取。
+        :param clock: callable，单调时钟，返回秒。
+        """
+        super().__init__()
+        self.race_time = race_time
+        self.clock = clock
+        self.team = None
+        self.remaining_time = 0.0
+        self.deadline = None
+        self.displayed = None
+        self.callbacks = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._wake)
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def attach(self, team):
+        """
+        绑定队伍（切换队伍或修改剩余时间后调用）。
+
+        同一队伍且剩余时间未被外部修改时保留毫秒余量，否则以队伍的整数秒为准。
+        """
+        self.timer.stop()
+        if team is not self.team or team.remaining_time != self.displayed:
+            self.remaining_time = float(team.remaining_time)
+        self.team = team
+        self.displayed = team.remaining_time
+        self.deadline = None
+        if not team.paused:
+            self.start()
+
+    def remaining(self):
+        """ 当前阶段的剩余时间（秒，浮点）。 """
+        if self.deadline is None:
+            return self.remaining_time
+        return max(0.0, self.deadline - self.clock())
+
+    def start(self):
+        if self.team is None or self.running:
+            return
+        self.team.paused = False
+        self.deadline = self.clock() + self.remaining_time
+        self._wake()
+
+    def pause(self):
+        if self.team is None:
+            return
+        if self.running:
+            self.remaining_time = self.remaining()
+            self.deadline = None
+            self.timer.stop()
+        self.team.paused = True
+
+    def schedule(self, phase, at, callback):
+        """
+        预定回调：指定阶段的剩余时间降到 at 秒时调用一次 callback（每次倒计时经过该时刻都会触发）。
+
+        :return: tuple，可传给 cancel 取消。
+        """
+        entry = (phase, at, callback)
+        self.callbacks.append(entry)
+        if self.running:
+            self._schedule_next(self.remaining())
+        return entry
+
+    def cancel(self, entry):
+        if entry in self.callbacks:
+            self.callbacks.remove(entry)
+
+    def _wake(self):
+        if not self.running:
+            return
+        team = self.team
+        now = self.clock()
+        remaining = self.deadline - now
+
+        # 触发本次唤醒之前已经越过的预定回调
+        previous = self.remaining_time
+        for phase, at, callback in list(self.callbacks):
+            if phase == team.phase and remaining <= at < previous:
+                callback()
+        self.remaining_time = max(0.0, remaining)
+
+        if remaining <= 0:
+            if team.phase == PHASE_PREPARATION:
+                # 正式比赛从准备阶段结束的精确时刻开始，唤醒延迟不计入比赛时间
+                race_time = self.race_time()
+                team.phase = PHASE_RACE
+                self.deadline += race_time
+                self.remaining_time = float(race_time)
+                self._update_display(self.deadline - now)
+                self.phase_changed.emit(PHASE_RACE)
+                self._wake()
+                return
+
+            self.deadline = None
+            self.remaining_time = 0.0
+            team.paused = True
+            self._update_display(0.0)
+            self.finished.emit()
+            return
+
+        self._update_display(remaining)
+        self._schedule_next(remaining)
+
+    def _update_display(self, remaining):
+        displayed = max(0, math.ceil(remaining))
+        if displayed != self.displayed:
+            self.displayed = displayed
+            self.team.remaining_time = displayed
+            self.remaining_changed.emit(displayed)
+
+    def _schedule_next(self, remaining):
+        # 下一次显示变化的时刻：剩余时间降到下一个整数秒
+        target = math.ceil(remaining) - 1
+        phase = self.team.phase
+        for callback_phase, at, _ in self.callbacks:
+            if callback_phase == phase and target < at < remaining:
+                target = at
+        delay = remaining - max(target, 0)
+        self.timer.start(max(0, math.ceil(delay * 1000)))
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import deque
+
+from .communication import FRAME_FINAL, FRAME_RESET
+
+
+class FrameMailbox:
+    """
+    通信线程与界面线程之间的邮箱。
+
+    实时时间只保留最新值，界面每帧最多取一次；最终成绩与 Reset 按顺序排队，绝不丢弃。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._real_time = None
+        self._real_received_at = None
+        self._events = deque()
+
+        # 统计计数
+        self.real_posted = 0
+        self.real_coalesced = 0
+        self.real_dropped = 0
+        self.events_posted = 0
+        self.drain_count = 0
+
+    def post_real(self, value, received_at=None):
+        """
+        写入最新实时时间（通信线程调用），未被取走的旧值直接覆盖。
+
+        :param received_at: float，接收时刻（time.monotonic()），默认为投递时刻。
+        """
+        if received_at is None:
+            received_at = time.monotonic()
+        with self._lock:
+            if self._real_time is not None:
+                self.real_coalesced += 1
+            self._real_time = value
+            self._real_received_at = received_at
+            self.real_posted += 1
+
+    def post_event(self, kind, value=None, timestamp=None):
+        """
+        追加必须送达的事件（通信线程调用）。
+
+        :param timestamp: float，接收时间（time.time()），默认为投递时刻。
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            # 成绩与 Reset 结束了本轮计时，之前尚未显示的实时时间已无意义
+            if kind in (FRAME_FINAL, FRAME_RESET) and self._real_time is not None:
+                self._real_time = None
+                self.real_dropped += 1
+            self._events.append((kind, value, timestamp))
+            self.events_posted += 1
+
+    def take(self):
+        """
+        取出邮箱内容（界面线程调用）。
+
+        :return: tuple，((最新实时时间, 接收时刻) 或 None, [(事件类型, 数值, 接收时间), ...])，
+                 实时时间总是晚于全部事件到达。
+        """
+        with self._lock:
+            real_time = None if self._real_time is None else (self._real_time, self._real_received_at)
+            self._real_time = None
+            events = list(self._events)
+            self._events.clear()
+            self.drain_count += 1
+        return real_time, events
+
+    def statistics(self):
+        """ 返回统计计数的快照。 """
+        with self._lock:
+            return {
+                "实时帧": self.real_posted,
+                "合并实时帧": self.real_coalesced,
+                "丢弃实时帧": self.real_dropped,
+                "事件": self.events_posted,
+                "待处理事件": len(self._events),
+            }
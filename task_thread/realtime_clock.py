@@ -0,0 +1,143 @@
+import math
+import time
+
+
+class RealTimeClock:
+    """
+    本地外推的实时时间时钟。
+
+    每收到一帧实时时间就以 (帧数值, 接收时刻) 为锚点，两帧之间按本地单调时钟外推，
+    界面按显示刷新率取值，计时器只需低频发送实时帧也能平滑显示。
+    新帧与外推值之间的偏差在 slew_time 内逐渐消除，显示不会跳变或倒退；偏差过大（如新一轮计时开始）时直接校准。
+    超过超时时间未收到新帧则停止外推，收到成绩时冻结为成绩，Reset 时归零。
+
+    计时器暂停、停止或空闲时会重复发送同一数值，此时停止外推并显示收到的数值（已超出的外推值直接回落），
+    直到数值再次增加；比上一帧略小的帧视为乱序到达的旧帧，直接忽略。
+    """
+
+    # 帧间隔估计的平滑系数
+    INTERVAL_GAIN = 1 / 8
+
+    def __init__(self, slew_time=0.25, snap_threshold=0.5, min_timeout=0.3, clock=time.monotonic):
+        """
+        :param slew_time: float，消除偏差所用的时间（秒）。
+        :param snap_threshold: float，偏差超过该值（秒）时直接校准。
+        :param min_timeout: float，停止外推的最短超时（秒），实际超时为平均帧间隔的 3 倍与该值中的较大者。
+        :param clock: callable，单调时钟，返回秒。
+        """
+        self.slew_time = slew_time
+        self.snap_threshold = snap_threshold
+        self.min_timeout = min_timeout
+        self.clock = clock
+
+        self.running = False
+        self.stalled = False
+        self.held_value = 0.0
+        self.anchor_value = 0.0
+        self.anchor_at = 0.0
+        self.residual = 0.0
+        self.shown = 0.0
+        self.interval = None
+        self.last_frame_at = None
+
+        # 偏差统计（收到的帧数值 - 收到时刻的外推值）
+        self.sync_count = 0
+        self.snap_count = 0
+        self.error_sum = 0.0
+        self.error_square_sum = 0.0
+        self.error_max = 0.0
+
+    def timeout(self):
+        if self.interval is None:
+            return self.min_timeout
+        return max(self.min_timeout, self.interval * 3)
+
+    def anchor(self, value, received_at=None):
+        """
+        以新收到的实时帧校准时钟。
+
+        :param value: float，帧中的实时时间（秒）。
+        :param received_at: float，接收时刻（与 clock 同一时钟），默认为当前时刻。
+        """
+        now = self.clock() if received_at is None else received_at
+
+        if self.running and value <= self.anchor_value:
+            if value != self.anchor_value and self.anchor_value - value <= self.snap_threshold:
+                return
+            # 数值没有增加（或新一轮计时从更小的数值开始）：停止外推，显示收到的数值
+            self.stalled = True
+            self.shown = value
+        elif self.running and self.stalled:
+            # 数值重新增加，从该帧开始外推
+            self.stalled = False
+            self._snap(value)
+        elif self.running:
+            error = value - self._value_at(now)
+            if self.last_frame_at is not None and now > self.last_frame_at:
+                interval = now - self.last_frame_at
+                self.interval = interval if self.interval is None else \
+                    self.interval + (interval - self.interval) * self.INTERVAL_GAIN
+
+            if abs(error) <= self.snap_threshold:
+                self.sync_count += 1
+                self.error_sum += abs(error)
+                self.error_square_sum += error * error
+                self.error_max = max(self.error_max, abs(error))
+                self.residual = error
+            else:
+                self._snap(value)
+        else:
+            # 第一帧：数值增加后才开始外推，空闲时重复发送的数值不会被外推
+            self.running = True
+            self.stalled = True
+            self.interval = None
+            self._snap(value)
+
+        self.anchor_value = value
+        self.anchor_at = now
+        self.last_frame_at = now
+
+    def _snap(self, value):
+        self.snap_count += 1
+        self.residual = 0.0
+        self.shown = value
+
+    def _value_at(self, moment):
+        # 超时后停在最后一帧之后 timeout 秒处，不再外推
+        moment = min(moment, self.last_frame_at + self.timeout())
+        elapsed = moment - self.anchor_at
+        value = self.anchor_value + elapsed
+        if elapsed < self.slew_time:
+            value -= self.residual * (1 - elapsed / self.slew_time)
+        return value
+
+    def value(self, now=None):
+        """ 当前应显示的实时时间（秒），外推值不会小于上一次的显示值。 """
+        if not self.running:
+            return self.held_value
+        if self.stalled:
+            return self.shown
+        self.shown = max(self.shown, self._value_at(self.clock() if now is None else now))
+        return self.shown
+
+    def freeze(self, value):
+        """ 收到最终成绩：停止外推并显示成绩。 """
+        self.running = False
+        self.held_value = value
+
+    def reset(self):
+        """ 计时器重置：停止外推并归零。 """
+        self.running = False
+        self.held_value = 0.0
+        self.last_frame_at = None
+
+    def statistics(self):
+        """ 返回外推偏差统计（毫秒）。 """
+        count = self.sync_count
+        return {
+            "校准次数": count,
+            "直接校准次数": self.snap_count,
+            "平均偏差": self.error_sum / count * 1000 if count else 0.0,
+            "均方根偏差": math.sqrt(self.error_square_sum / count) * 1000 if count else 0.0,
+            "最大偏差": self.error_max * 1000,
+        }
@@ -0,0 +1,242 @@
+import multiprocessing
+import queue
+import struct
+import time
+from multiprocessing import shared_memory
+
+from PySide6.QtCore import QObject, Qt, Signal
+
+from .capture import CaptureWriter
+from .communication import FRAME_REAL, FRAME_FINAL, FRAME_RESET, LINK_TYPES, CommunicationHub, LinkStats
+
+FRAME_CODES = {FRAME_REAL: 0, FRAME_FINAL: 1, FRAME_RESET: 2}
+FRAME_KINDS = {code: kind for kind, code in FRAME_CODES.items()}
+
+# 环形缓冲区布局：头部为写序号与读序号，之后是定长记录（帧类型、数值、接收时间）
+RING_HEADER = struct.Struct("<QQ")
+RING_RECORD = struct.Struct("<Bxxxxxxxdd")
+
+
+class SharedFrameRing:
+    """
+    基于共享内存的单生产者单消费者环形缓冲区。
+
+    接收进程只写写序号，界面进程只写读序号，因此无需加锁。
+    缓冲区满时实时帧直接丢弃（计入 overflow），成绩与 Reset 等待消费者腾出空间。
+    """
+
+    def __init__(self, name=None, capacity=65536):
+        self.capacity = capacity
+        size = RING_HEADER.size + RING_RECORD.size * capacity
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            RING_HEADER.pack_into(self.shm.buf, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.overflow = 0
+
+    def post_real(self, value):
+        self._write(FRAME_REAL, value, time.time(), wait=False)
+
+    def post_event(self, kind, value=None, timestamp=None):
+        self._write(kind, value, time.time() if timestamp is None else timestamp, wait=True)
+
+    def _write(self, kind, value, timestamp, wait):
+        buf = self.shm.buf
+        write_index, read_index = RING_HEADER.unpack_from(buf, 0)
+        while write_index - read_index >= self.capacity:
+            if not wait:
+                self.overflow += 1
+                return
+            time.sleep(0.001)
+            read_index = RING_HEADER.unpack_from(buf, 0)[1]
+
+        offset = RING_HEADER.size + RING_RECORD.size * (write_index % self.capacity)
+        RING_RECORD.pack_into(buf, offset, FRAME_CODES[kind], 0.0 if value is None else value, timestamp)
+        struct.pack_into("<Q", buf, 0, write_index + 1)
+
+    def read_all(self):
+        """
+        取出全部未读记录（界面进程调用）。
+
+        :return: list，[(帧类型, 数值, 接收时间), ...]，Reset 的数值为 None。
+        """
+        buf = self.shm.buf
+        write_index, read_index = RING_HEADER.unpack_from(buf, 0)
+        records = []
+        for index in range(read_index, write_index):
+            offset = RING_HEADER.size + RING_RECORD.size * (index % self.capacity)
+            code, value, timestamp = RING_RECORD.unpack_from(buf, offset)
+            kind = FRAME_KINDS[code]
+            records.append((kind, None if kind == FRAME_RESET else value, timestamp))
+        struct.pack_into("<Q", buf, 8, write_index)
+        return records
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def receiver_main(ring_name, capacity, command_queue, status_queue, capture_path=None):
+    """ 接收进程入口：在独立进程中运行通信中枢，帧写入共享内存环形缓冲区。 """
+    ring = SharedFrameRing(ring_name, capacity)
+
+    hub = CommunicationHub(ring, CaptureWriter(capture_path) if capture_path else None)
+    hub.send_status.connect(lambda message: status_queue.put(("status", None, message)),
+                            Qt.ConnectionType.DirectConnection)
+    hub.start()
+    links = {}
+
+    while True:
+        try:
+            command = command_queue.get(timeout=0.5)
+        except queue.Empty:
+            command = ("poll",)
+
+        if command[0] == "stop":
+            break
+        elif command[0] == "add":
+            _, name, args = command
+            link = LINK_TYPES[name](*args)
+            link.send_status.connect(lambda message: status_queue.put(("status", None, message)),
+                                     Qt.ConnectionType.DirectConnection)
+            if name == "串口":
+                link.message_received.connect(lambda text, n=name: status_queue.put(("line", n, text)),
+                                              Qt.ConnectionType.DirectConnection)
+            if link.status_message:
+                status_queue.put(("status", None, link.status_message))
+            links[name] = link
+            hub.add_link(link)
+        elif command[0] == "remove":
+            link = links.pop(command[1], None)
+            if link:
+                link.stop()
+        elif command[0] == "write":
+            link = links.get(command[1])
+            if link and link.running:
+                link.serial_connection.write(command[2])
+
+        # 同步链路状态与统计供界面显示
+        for name, link in links.items():
+            status_queue.put(("state", name, link.running, len(getattr(link, "clients", ())), link.statistics()))
+
+    hub.stop()
+    hub.wait()
+    ring.close()
+
+
+class RemoteSerialConnection:
+    """ 接收进程中串口的代理，供 ESP 调试页发送指令。 """
+
+    def __init__(self, link):
+        self.link = link
+
+    @property
+    def is_open(self):
+        return self.link.running
+
+    def write(self, data):
+        self.link.process.command_queue.put(("write", self.link.name, data))
+
+    def flush(self):
+        pass
+
+
+class RemoteLink(QObject):
+    """ 接收进程中链路的代理，接口与 CommunicationLink 保持一致，供通信设置对话框使用。 """
+    send_status = Signal(str)
+    message_received = Signal(str)
+
+    def __init__(self, process, name):
+        super().__init__()
+        self.process = process
+        self.name = name
+        self.running = True
+        self.clients = ()
+        self.status_message = ""
+        self.serial_connection = RemoteSerialConnection(self)
+        self.last_statistics = LinkStats().snapshot()
+
+    def statistics(self):
+        """ 返回接收进程最近一次同步的统计快照（最多滞后约 0.5 秒）。 """
+        return self.last_statistics
+
+    def stop(self):
+        self.running = False
+        self.process.command_queue.put(("remove", self.name))
+
+
+class ReceiverProcess:
+    """
+    独立接收进程（可选模式）。
+
+    帧的接收与解码在子进程中完成并带上接收时间写入共享内存，界面线程阻塞时也不会丢帧；
+    界面进程定期调用 drain 把帧转入邮箱。
+    """
+
+    def __init__(self, capacity=65536, capture_path=None):
+        context = multiprocessing.get_context("spawn")
+        self.ring = SharedFrameRing(capacity=capacity)
+        self.command_queue = context.Queue()
+        self.status_queue = context.Queue()
+        self.process = context.Process(target=receiver_main,
+                                       args=(self.ring.name, capacity, self.command_queue, self.status_queue,
+                                             capture_path),
+                                       daemon=True)
+        self.links = {}
+
+    def start(self):
+        self.process.start()
+
+    def add_link(self, name, *args):
+        """
+        在接收进程中打开链路。
+
+        :param name: str，"串口"、"TCP" 或 "UDP"。
+        :return: RemoteLink，链路代理。
+        """
+        link = RemoteLink(self, name)
+        self.links[name] = link
+        self.command_queue.put(("add", name, args))
+        return link
+
+    def drain(self, mailbox, send_status=None):
+        """ 把共享内存中的帧转入邮箱，并处理子进程发回的状态（界面线程调用）。 """
+        # 环形缓冲区中的接收时间为 time.time()，换算为本进程的单调时钟
+        offset = time.monotonic() - time.time()
+        for kind, value, timestamp in self.ring.read_all():
+            if kind == FRAME_REAL:
+                mailbox.post_real(value, timestamp + offset)
+            else:
+                mailbox.post_event(kind, value, timestamp)
+
+        while True:
+            try:
+                message = self.status_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            kind, name, *payload = message
+            if kind == "status":
+                if send_status:
+                    send_status(payload[0])
+                continue
+
+            link = self.links.get(name)
+            if link is None:
+                continue
+            if kind == "line":
+                link.message_received.emit(payload[0])
+            elif kind == "state":
+                link.running = link.running and payload[0]
+                link.clients = range(payload[1])
+                link.last_statistics = payload[2]
+
+    def stop(self):
+        self.command_queue.put(("stop",))
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close(unlink=True)
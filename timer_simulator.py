@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# 计时器硬件模拟器：按计时器协议发送 {实时时间}、[最终成绩] 与 Reset，用于压力测试与离线复现
+
+import argparse
+import os
+import random
+import socket
+import threading
+import time
+
+
+class SimulatedTimer(threading.Thread):
+    """
+    模拟一台计时器设备。
+
+    每轮比赛从 0 开始按 rate 发送实时时间帧，run_time 秒后发送最终成绩与 Reset，间隔 gap 秒后开始下一轮。
+    """
+
+    def __init__(self, send, rate=100, jitter=0.0, fragment=0, burst=1, run_time=10.0, gap=1.0, runs=1,
+                 line_ending=b"\r\n", seed=None):
+        """
+        :param send: callable，发送一段字节数据。
+        :param rate: int，实时时间帧频率（帧/秒）。
+        :param jitter: float，每批数据发送前的随机延迟上限（秒）。
+        :param fragment: int，大于 0 时把数据随机切成 1~fragment 字节的小段分别发送。
+        :param burst: int，每批合并发送的实时帧数量。
+        :param run_time: float，每轮比赛时长（秒）。
+        :param gap: float，两轮之间的间隔（秒）。
+        :param runs: int，比赛轮数。
+        :param line_ending: bytes，每帧之后追加的分隔符。
+        :param seed: int，随机种子。
+        """
+        super().__init__(daemon=True)
+        self.send = send
+        self.rate = rate
+        self.jitter = jitter
+        self.fragment = fragment
+        self.burst = max(1, burst)
+        self.run_time = run_time
+        self.gap = gap
+        self.runs = runs
+        self.line_ending = line_ending
+        self.random = random.Random(seed)
+        self.running = True
+
+        # 发送记录：最终成绩（毫秒）与发送时刻（perf_counter），供延迟测量使用
+        self.sent_finals = []
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def run(self):
+        try:
+            for _ in range(self.runs):
+                if not self.running:
+                    break
+                self._run_once()
+                self._sleep_until(time.perf_counter() + self.gap)
+        except OSError:
+            self.running = False
+
+    def _run_once(self):
+        interval = 1 / self.rate
+        total_ticks = int(self.run_time * self.rate)
+        start = time.perf_counter()
+        tick = 0
+
+        while self.running and tick < total_ticks:
+            # 按批发送已到期的帧，批大小由 burst 决定
+            due = min(total_ticks, int((time.perf_counter() - start) / interval) + 1)
+            if due - tick < self.burst and due < total_ticks:
+                self._sleep_until(start + (tick + self.burst - 1) * interval)
+                continue
+
+            batch = b"".join(b"{%d}" % (index * 1000 // self.rate) + self.line_ending for index in range(tick, due))
+            self._transmit(batch, due - tick)
+            tick = due
+
+        if self.running:
+            final = int(self.run_time * 1000)
+            self.sent_finals.append((final, time.perf_counter()))
+            self._transmit(b"[%d]" % final + self.line_ending + b"Reset" + self.line_ending, 2)
+
+    def _transmit(self, data, frames):
+        if self.jitter > 0:
+            time.sleep(self.random.uniform(0, self.jitter))
+
+        if self.fragment > 0:
+            position = 0
+            while position < len(data):
+                size = self.random.randint(1, self.fragment)
+                self.send(data[position:position + size])
+                position += size
+        else:
+            self.send(data)
+
+        self.frames_sent += frames
+        self.bytes_sent += len(data)
+
+    def _sleep_until(self, deadline):
+        while self.running:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.05))
+
+    def stop(self):
+        self.running = False
+
+
+def open_transport(transport, host="127.0.0.1", port=32767):
+    """
+    打开一条到上位机的传输通道。
+
+    :param transport: str，"tcp"、"udp" 或 "pty"。
+    :return: tuple，(send 函数, close 函数, 描述)，pty 的描述为供上位机打开的串口路径。
+    """
+    if transport == "tcp":
+        connection = socket.create_connection((host, port))
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection.sendall, connection.close, f"TCP {host}:{port}"
+    elif transport == "udp":
+        connection = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return lambda data: connection.sendto(data, (host, port)), connection.close, f"UDP {host}:{port}"
+    elif transport == "pty":
+        if not hasattr(os, "openpty"):
+            raise RuntimeError("当前平台不支持伪终端")
+        master, slave = os.openpty()
+
+        def close():
+            os.close(master)
+            os.close(slave)
+
+        return lambda data: os.write(master, data), close, os.ttyname(slave)
+    raise ValueError(f"未知的传输方式: {transport}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="计时器硬件模拟器")
+    parser.add_argument("transport", choices=["tcp", "udp", "pty"], help="传输方式")
+    parser.add_argument("--host", default="127.0.0.1", help="上位机地址（tcp/udp）")
+    parser.add_argument("--port", type=int, default=32767, help="上位机端口（tcp/udp）")
+    parser.add_argument("--devices", type=int, default=1, help="并发设备数量")
+    parser.add_argument("--rate", type=int, default=100, help="实时时间帧频率（帧/秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="发送抖动上限（毫秒）")
+    parser.add_argument("--fragment", type=int, default=0, help="拆包最大字节数，0 为不拆包")
+    parser.add_argument("--burst", type=int, default=1, help="每批合并发送的帧数")
+    parser.add_argument("--run-time", type=float, default=10, help="每轮比赛时长（秒）")
+    parser.add_argument("--gap", type=float, default=1, help="两轮之间的间隔（秒）")
+    parser.add_argument("--runs", type=int, default=1, help="比赛轮数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    arguments = parser.parse_args()
+
+    transports = [open_transport(arguments.transport, arguments.host, arguments.port)
+                  for _ in range(arguments.devices)]
+    if arguments.transport == "pty":
+        for _, _, path in transports:
+            print(f"模拟串口: {path}")
+        input("在上位机中打开以上串口后按回车开始发送...")
+
+    devices = [SimulatedTimer(send, arguments.rate, arguments.jitter / 1000, arguments.fragment, arguments.burst,
+                              arguments.run_time, arguments.gap, arguments.runs,
+                              seed=None if arguments.seed is None else arguments.seed + index)
+               for index, (send, _, _) in enumerate(transports)]
+
+    start = time.perf_counter()
+    for device in devices:
+        device.start()
+    try:
+        for device in devices:
+            device.join()
+    except KeyboardInterrupt:
+        for device in devices:
+            device.stop()
+
+    elapsed = time.perf_counter() - start
+    frames = sum(device.frames_sent for device in devices)
+    print(f"设备: {len(devices)}，发送 {frames} 帧 / {sum(device.bytes_sent for device in devices)} 字节，"
+          f"耗时 {elapsed:.1f} 秒（{frames / elapsed:.0f} 帧/秒）")
+    for _, close, _ in transports:
+        close()
@@ -0,0 +1,2 @@
+from .lazy_import import *
+from .resource import *
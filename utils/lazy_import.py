@@ -0,0 +1,59 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    模块代理：首次访问属性时才真正导入模块。
+
+    用于 pandas、openpyxl 等只在导入导出等少数功能中使用的重量级依赖，避免拖慢启动。
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            # importlib 自带导入锁，多个线程同时首次访问也只会导入一次
+            module = self._module = importlib.import_module(self._name)
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "已导入" if self._module is not None else "未导入"
+        return f"<LazyModule {self._name}（{state}）>"
+
+
+def lazy_import(name):
+    """
+    :param name: str，模块全名，如 "pandas" 或 "serial.tools.list_ports"。
+    :return: LazyModule，可像模块一样使用。
+    """
+    return LazyModule(name)
+
+
+def warm_up(names):
+    """
+    在后台线程中依次导入模块，使之后的首次使用无需等待（导入失败时忽略）。
+
+    :param names: list，模块全名列表。
+    :return: threading.Thread，预加载线程。
+    """
+
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                continue
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
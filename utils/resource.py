@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+
+# 程序根目录（utils 的上一级），资源相对于程序而不是当前工作目录查找
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 覆盖目录的环境变量：其中的同名文件优先于程序自带的资源
+RESOURCE_DIR_VARIABLE = "TIMER_RESOURCE_DIR"
+
+# 程序自带资源所在的目录（相对于程序根目录）
+RESOURCE_DIRECTORIES = ["", "audio"]
+
+# 重建索引时跳过的目录
+INDEX_SKIP_DIRECTORIES = {".git", "__pycache__", "capture", "venv", ".venv", "build", "dist"}
+
+
+class ResourceResolver:
+    """
+    资源查找：覆盖目录 -> 程序自带资源目录 -> 持久化索引。
+
+    前两步只检查固定的几个路径；索引记录文件路径与修改时间，命中时校验修改时间，
+    失效或未命中时只遍历程序根目录重建一次，耗时与当前工作目录的大小无关。
+    """
+
+    def __init__(self, root=PACKAGE_ROOT, override_directory=None, index_path=None):
+        """
+        :param root: str，程序根目录。
+        :param override_directory: str，覆盖目录，默认读取环境变量 TIMER_RESOURCE_DIR。
+        :param index_path: str，索引文件路径，默认为程序根目录下的 .resource_index.json。
+        """
+        self.root = root
+        self.override_directory = override_directory or os.environ.get(RESOURCE_DIR_VARIABLE)
+        self.index_path = index_path or os.path.join(root, ".resource_index.json")
+        self.index = None
+        self.rebuilt = False
+        self._lock = threading.Lock()
+
+    def resolve(self, name, default=None):
+        """
+        :param name: str，资源文件名，如 "reset.mp3"。
+        :param default: 找不到时的返回值。
+        :return: str，资源的完整路径。
+        """
+        if self.override_directory:
+            path = os.path.join(self.override_directory, name)
+            if os.path.isfile(path):
+                return path
+
+        for directory in RESOURCE_DIRECTORIES:
+            path = os.path.join(self.root, directory, name)
+            if os.path.isfile(path):
+                return path
+
+        with self._lock:
+            path = self._lookup(name)
+            if path is None and not self.rebuilt:
+                self._rebuild()
+                path = self._lookup(name)
+        return path or default
+
+    def _lookup(self, name):
+        if self.index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as file:
+                    self.index = json.load(file)
+            except (OSError, ValueError):
+                self.index = {}
+
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+        path, mtime = entry
+        try:
+            if os.stat(path).st_mtime == mtime:
+                return path
+        except OSError:
+            pass
+        return None
+
+    def _rebuild(self):
+        self.rebuilt = True
+        index = {}
+        for directory, directories, files in os.walk(self.root):
+            directories[:] = [d for d in directories if d not in INDEX_SKIP_DIRECTORIES]
+            for file_name in files:
+                if file_name not in index:
+                    path = os.path.join(directory, file_name)
+                    try:
+                        index[file_name] = (path, os.stat(path).st_mtime)
+                    except OSError:
+                        continue
+        self.index = index
+
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as file:
+                json.dump(index, file, ensure_ascii=False)
+        except OSError:
+            # 程序目录只读时只在内存中使用索引
+            pass
+
+
+resource_resolver = ResourceResolver()
+
+
+def resolve_resource(name, default=None):
+    """ 使用默认的查找器查找资源，见 ResourceResolver.resolve。 """
+    return resource_resolver.resolve(name, default)
@@ -1,4 +1,8 @@
+from .button_panel import *
 from .dialog import *
+from .display_state import *
+from .record_list import *
 from .console import *
 from .round_indicator import *
+from .scoreboard import *
 from .screen import *
@@ -0,0 +1,51 @@
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QWidget, QGridLayout
+
+from .common import *
+
+
+class ButtonPanel(QWidget):
+    """
+    按钮面板：按网格排列一组文本按钮，点击时发出按钮的序号。
+
+    set_texts 复用已有的按钮，只修改文本变化的按钮、隐藏多余的按钮，按钮数量超过以往最大值时才新建按钮，
+    因此添加、撤销罚时或切换队伍时不会重建按钮与布局。
+    """
+    clicked = Signal(int)
+
+    def __init__(self, columns=1, parent=None):
+        """
+        :param columns: int，每行的按钮数量。
+        :param parent: QWidget，父控件。
+        """
+        super().__init__(parent)
+        self.columns = columns
+        self.buttons = []
+        self.visible_count = 0
+
+        self.grid_layout = QGridLayout(self)
+        self.grid_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        # 各列等宽，按钮数量不足一行时也不会拉伸
+        for column in range(columns):
+            self.grid_layout.setColumnStretch(column, 1)
+
+    def set_texts(self, texts):
+        """
+        :param texts: list，每个按钮的文本。
+        """
+        for position, text in enumerate(texts):
+            if position < len(self.buttons):
+                button = self.buttons[position]
+                if button.text() != text:
+                    button.setText(text)
+            else:
+                button = create_button(text)
+                button.clicked.connect(lambda _, p=position: self.clicked.emit(p))
+                self.grid_layout.addWidget(button, *divmod(position, self.columns))
+                self.buttons.append(button)
+            if position >= self.visible_count:
+                button.show()
+
+        for button in self.buttons[len(texts):self.visible_count]:
+            button.hide()
+        self.visible_count = len(texts)
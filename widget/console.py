@@ -1,31 +1,59 @@
+import functools
 import json
 import os
 
-import chardet
-from PySide6.QtGui import QGuiApplication, QAction
-from PySide6.QtWidgets import QMainWindow, QMenu, QApplication
-from openpyxl import Workbook
+from PySide6.QtGui import QGuiApplication, QAction, QKeySequence
+from PySide6.QtWidgets import QMainWindow, QMenu, QApplication, QInputDialog, QListWidget
 
+from race import *
 from task_thread import *
+from utils import *
+from widget.button_panel import *
 from widget.dialog import *
+from widget.display_state import *
+from widget.record_list import *
+from widget.scoreboard import *
 from widget.screen import *
 
+# 仅在导入导出名单时使用的依赖，首次使用时才导入
+chardet = lazy_import("chardet")
+openpyxl = lazy_import("openpyxl")
+pd = lazy_import("pandas")
+
 
 class Console(QMainWindow):
-    def __init__(self):
+    def __init__(self, journal_directory=None, capture_directory="capture"):
+        """
+        :param journal_directory: str，比赛记录目录，默认使用配置中的"比赛记录目录"。
+        :param capture_directory: str，原始通信数据记录目录。
+        """
         super().__init__()
         self.setWindowTitle("北京科技大学智能汽车竞赛计时器控制台 V2.0")
         self.setGeometry(100, 100, 900, 600)
-        self.full_screen_window = None
-        self.communication_thread = {
+        # 投屏窗口：显示器序号 -> (窗口, 布局, 显示状态绑定)，所有窗口共用显示状态与字符位图缓存
+        self.projector_windows = {}
+        self.display_state = DisplayState(self)
+        self.glyph_cache = GlyphCache()
+        self.communication_links = {
             "串口": None,
             "TCP": None,
             "UDP": None,
         }
         self.real_time = 0
+        self.mailbox = FrameMailbox()
+        self.real_time_clock = RealTimeClock()
+
+        # 原始通信数据记录（始终开启，用于成绩争议复核与回放）
+        self.capture_path = os.path.join(capture_directory, f"{datetime.datetime.now():%Y%m%d-%H%M%S}.cap")
+        self.replay_thread = None
+
+        # 通信中枢（所有串口与套接字共用一个线程）
+        self.communication_hub = CommunicationHub(self.mailbox, CaptureWriter(self.capture_path))
+        self.communication_hub.send_status.connect(self.update_status)
+        self.communication_hub.start()
         self.audio_path = {
-            "重置": search_file("reset.mp3"),
-            "时间到": search_file("timeup.mp3")
+            "重置": resolve_resource("reset.mp3"),
+            "时间到": resolve_resource("timeup.mp3")
         }
 
         # 默认配置文件
@@ -42,12 +70,26 @@ class Console(QMainWindow):
                 ("碰撞小型路障", -10)
             ],
             "SSID": "LAPTOP-XXY",
-            "Password": "12345000"
+            "Password": "12345000",
+            "独立接收进程": False,
+            "提示音规则": {
+                "重置": [2, "preempt"],
+                "时间到": [1, "preempt"]
+            },
+            "提示音时间": {
+                "赛前准备阶段": [60, 30, 10, 5, 4, 3, 2, 1],
+                "正式比赛阶段": [60, 30, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+            },
+            "后台预加载": True,
+            "比赛记录目录": "journal",
+            "排行榜显示数量": 10,
+            "投屏显示排行榜": False,
+            "投屏绘制记分板": False
         }
 
         # 读取配置文件
         try:
-            with open("config.json", "r", encoding="utf-8") as file:
+            with open(resolve_resource("config.json", "config.json"), "r", encoding="utf-8") as file:
                 data = json.load(file)
                 if "罚时种类" in data and isinstance(data["罚时种类"], list):
                     data["罚时种类"] = [tuple(item) if isinstance(item, list) else item for item in data["罚时种类"]]
@@ -67,40 +109,71 @@ class Console(QMainWindow):
             missing_keys = ', '.join([f'"{key}"' for key in missing_config])
             self._show_warning(f"发现缺失配置: \n{missing_keys} \n将使用默认配置！")
 
-        # 比赛数据
-        self.race_data = {
-            "比赛进度": 0,
-            "队伍名单": [
-                {
-                    "队伍编号": "Test",
-                    "队伍名称": "Test",
-                    "队伍成员": "Test",
-                    "比赛阶段": "赛前准备阶段",
-                    "剩余时间": self.configuration["赛前准备时间"],
-                    "是否暂停": True,
-                    "所有成绩": [
-                        {
-                            "原始时间": 20.744,
-                            "修正时间": 20.744,
-                            "状态": "未处理",
-                            "罚时": [],
-                        },
-                        {
-                            "原始时间": 24.552,
-                            "修正时间": 24.552,
-                            "状态": "未处理",
-                            "罚时": [],
-                        }
-                    ],
-                    "最好成绩": 999.999,
-                }
-            ],
-        }
-
-        # 倒计时
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_timer)
-        self.timer.start(1000)
+        # 比赛记录目录由一个程序独占，第二个程序启动时直接退出，不会覆盖正在使用的记录
+        self.journal = RaceJournal(journal_directory or self.configuration["比赛记录目录"])
+        try:
+            self.journal.lock()
+        except JournalLockedError as e:
+            self.communication_hub.stop()
+            self.communication_hub.wait()
+            QMessageBox.critical(self, "错误", f"{e}，请勿同时运行多个计时程序！")
+            raise SystemExit(1)
+
+        # 独立接收进程（可选，界面阻塞时由子进程继续接收并记录接收时间）
+        self.receiver_process = None
+        if self.configuration["独立接收进程"]:
+            self.receiver_process = ReceiverProcess(capture_path=self.capture_path + ".receiver")
+            self.receiver_process.start()
+
+        # 音频服务（混音器只初始化一次，提示音预先解码到内存）
+        self.audio_service = AudioService(self.audio_path, {name: tuple(rule) for name, rule in
+                                                            self.configuration["提示音规则"].items()})
+        self.audio_service.send_status.connect(self.update_status)
+        for name, frequencies in WARNING_TONES.items():
+            self.audio_service.register(name, functools.partial(synthesize_tone, frequencies))
+        self.audio_service.start()
+
+        # 比赛数据（每次修改都写入比赛记录，程序异常退出后从快照与记录尾部恢复）
+        self.race_data = self.default_race_data()
+        recovered, self.recovered_events = self.journal.recover(apply_event)
+        if recovered:
+            self.race_data = recovered
+            # 异常退出前正在进行的倒计时恢复为暂停状态
+            self.race_data.current_team.paused = True
+        elif self.journal.damaged:
+            self._show_warning(f"比赛记录无法读取，已移至 {self.journal.damaged}，请检查后手动恢复！")
+        self.journal.start(self.race_data)
+        self.history = UndoHistory()
+
+        # 排行榜（随成绩确认、作废与罚时增量更新）
+        self.leaderboard = Leaderboard()
+        self.leaderboard.rebuild(self.race_data.teams)
+        self.leaderboard_changed = False
+
+        # 定期快照
+        self.snapshot_timer = QTimer()
+        self.snapshot_timer.timeout.connect(self.snapshot_race_data)
+        self.snapshot_timer.start(60000)
+
+        # 倒计时的剩余时间不逐秒记录，进行中每 5 秒写入一次，异常退出最多丢失 5 秒
+        self.timer_state_timer = QTimer()
+        self.timer_state_timer.timeout.connect(self.journal_timer_state)
+        self.timer_state_timer.start(5000)
+
+        # 倒计时（按单调时钟截止时刻计时，只在显示秒数变化时唤醒）
+        self.countdown = CountdownEngine(lambda: self.configuration["比赛时间"])
+        self.countdown.remaining_changed.connect(self.update_timer_display)
+        self.countdown.phase_changed.connect(self.update_timer_display)
+        self.countdown.phase_changed.connect(self.commit_timer_state)
+        self.countdown.finished.connect(self.finish_countdown)
+        self.countdown.attach(self.race_data.current_team)
+        self.warning_cues = []
+        self.schedule_warning_cues()
+
+        # 显示刷新（每个显示帧最多刷新一次实时时间，成绩与重置事件按顺序处理）
+        self.display_timer = QTimer()
+        self.display_timer.timeout.connect(self.drain_mailbox)
+        self.display_timer.start(16)
 
         # 创建菜单栏
         menu_bar = self.menuBar()
@@ -108,6 +181,10 @@ class Console(QMainWindow):
         # 文件菜单
         file_menu = menu_bar.addMenu("文件")
 
+        new_race_action = QAction("新建比赛记录", self)
+        new_race_action.triggered.connect(self.new_race_record)
+        file_menu.addAction(new_race_action)
+
         import_action = QAction("导入抽签结果", self)
         import_action.triggered.connect(self.import_team_list)
         file_menu.addAction(import_action)
@@ -116,6 +193,23 @@ class Console(QMainWindow):
         save_action.triggered.connect(self.save_team_list)
         file_menu.addAction(save_action)
 
+        replay_action = QAction("回放通信记录", self)
+        replay_action.triggered.connect(self.replay_capture_file)
+        file_menu.addAction(replay_action)
+
+        # 编辑菜单
+        edit_menu = menu_bar.addMenu("编辑")
+
+        self.undo_action = QAction("撤销", self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.triggered.connect(self.undo)
+        edit_menu.addAction(self.undo_action)
+
+        self.redo_action = QAction("重做", self)
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        self.redo_action.triggered.connect(self.redo)
+        edit_menu.addAction(self.redo_action)
+
         # 设置
         set_menu = menu_bar.addMenu("设置")
 
@@ -192,8 +286,7 @@ class Console(QMainWindow):
         display_layout.addWidget(self.race_phase_display, 2, 1)
 
         self.real_time_display = create_label()
-        time = f"{self.real_time:.3f}s"
-        self.real_time_display.setText(time)
+        self.display_state.update(real_time=f"{self.real_time:.3f}s")
         display_layout.addWidget(self.real_time_display, 3, 0)
 
         self.remaining_time_display = create_label()
@@ -238,35 +331,48 @@ class Console(QMainWindow):
         self.cancel_record_button.clicked.connect(lambda: self.update_record_state("已作废"))
         display_layout.addWidget(self.cancel_record_button, 6, 3, 2, 1)
 
+        self.record_model = RecordListModel(self)
         self.record_option_display = create_combo_box()
+        self.record_option_display.setModel(self.record_model)
+        self.record_option_display.currentIndexChanged.connect(self.update_penalty_area)
         display_layout.addWidget(self.record_option_display, 7, 0)
 
         self.add_record_button = create_button("添加比赛成绩")
         self.add_record_button.clicked.connect(lambda: self.open_dialog("添加比赛成绩"))
         display_layout.addWidget(self.add_record_button, 6, 1, 2, 1)
 
-        # 已执行罚时
-        left_widget = QWidget()
+        # 已执行罚时，点击撤销对应的罚时
+        self.applied_penalty_panel = ButtonPanel(columns=4)
+        self.applied_penalty_panel.clicked.connect(
+            lambda i: self.remove_penalty(self.record_option_display.currentIndex(), i))
         left_scroll_area = QScrollArea()
-        left_scroll_area.setWidget(left_widget)
+        left_scroll_area.setWidget(self.applied_penalty_panel)
         left_scroll_area.setWidgetResizable(True)
         display_layout.addWidget(left_scroll_area, 8, 0, 2, 3)
-        self.left_layout = QFormLayout(left_widget)
 
-        # 可选罚时
-        right_widget = QWidget()
+        # 可选罚时，点击为选中的成绩添加罚时
+        self.penalty_option_panel = ButtonPanel()
+        self.penalty_option_panel.clicked.connect(lambda i: self.add_penalty(tuple(self.configuration["罚时种类"][i])))
         right_scroll_area = QScrollArea()
-        right_scroll_area.setWidget(right_widget)
+        right_scroll_area.setWidget(self.penalty_option_panel)
         right_scroll_area.setWidgetResizable(True)
         display_layout.addWidget(right_scroll_area, 8, 3, 2, 1)
-        self.right_layout = QVBoxLayout(right_widget)
-        self.right_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+
+        # 排行榜
+        leaderboard_layout = QVBoxLayout()
+        leaderboard_layout.addWidget(create_label("排行榜"))
+        self.rank_display = create_label()
+        leaderboard_layout.addWidget(self.rank_display)
+        self.leaderboard_display = QListWidget()
+        leaderboard_layout.addWidget(self.leaderboard_display)
+        display_layout.addLayout(leaderboard_layout, 0, 4, 10, 1)
 
         # 设置列的伸展因子，控制左右区域的占比
         display_layout.setColumnStretch(0, 1)
         display_layout.setColumnStretch(1, 1)
         display_layout.setColumnStretch(2, 1)
         display_layout.setColumnStretch(3, 1)
+        display_layout.setColumnStretch(4, 1)
 
         # 设置行的伸展因子
         display_layout.setRowStretch(8, 1)
@@ -274,16 +380,164 @@ class Console(QMainWindow):
 
         layout.addLayout(display_layout)
 
+        self.display_state.subscribe({
+            "progress": self.progress_display,
+            "team_id": self.team_id_display,
+            "team_name": self.team_name_display,
+            "team_members": self.team_members_display,
+            "next_team": self.next_team_display,
+            "race_phase": self.race_phase_display,
+            "remaining_time": self.remaining_time_display,
+            "real_time": self.real_time_display,
+            "best_record": self.best_record_display,
+        })
+
         # 设置中心组件
         central_widget = QWidget()
         central_widget.setLayout(layout)
         self.setCentralWidget(central_widget)
 
         self.update_title_settings()
-        self.update_record_option()
+        self.record_model.set_team(self.race_data.current_team)
         self.update_team_information()
         self.update_timer_display()
         self.update_penalty_panel()
+        self.update_undo_actions()
+        self.update_leaderboard_display()
+
+        if recovered:
+            self.update_status(f"已从比赛记录恢复比赛数据（重放 {self.recovered_events} 个事件）")
+
+        # 窗口显示后在后台预先导入导入导出等功能的依赖，首次使用时无需等待
+        if self.configuration["后台预加载"]:
+            QTimer.singleShot(1000, lambda: warm_up(["pandas", "openpyxl", "chardet", "psutil"]))
+
+    def default_race_data(self):
+        return RaceData(0, [
+            Team("Test", "Test", "Test", "赛前准备阶段", self.configuration["赛前准备时间"],
+                 records=[Record(20.744, 20.744), Record(24.552, 24.552)])
+        ])
+
+    def closeEvent(self, event):
+        if self.replay_thread:
+            self.replay_thread.stop()
+            self.replay_thread.wait()
+        self.communication_hub.stop()
+        self.communication_hub.wait()
+        if self.receiver_process:
+            self.receiver_process.stop()
+        self.audio_service.stop()
+        self.audio_service.wait()
+        for screen_index in list(self.projector_windows):
+            self.close_projector_window(screen_index)
+        self.journal.snapshot(self.race_data)
+        self.journal.close()
+        super().closeEvent(event)
+
+    def commit_event(self, event, undoable=False):
+        """
+        修改比赛数据：应用事件、写入比赛记录并刷新受影响的界面。
+
+        :param event: dict，事件，见 race.events。
+        :param undoable: bool，是否加入撤销栈（裁判的操作可撤销，计时器上报的成绩与计时状态不可撤销）。
+        """
+        inverse = self._apply_event(event)
+        if undoable:
+            self.history.push(event, inverse)
+        self.refresh_after_event(event)
+        self.update_undo_actions()
+
+    def _apply_event(self, event):
+        inverse = apply_event(self.race_data, event)
+        index = event.get("队伍")
+        if isinstance(index, int) and self.leaderboard.update(index, self.race_data.teams[index]):
+            self.leaderboard_changed = True
+        self.journal.append(event)
+        if self.journal.needs_snapshot():
+            self.journal.snapshot(self.race_data)
+        return inverse
+
+    def undo(self):
+        step = self.history.peek_undo()
+        if step is None:
+            return
+        if step[1]["队伍"] != self.race_data.progress:
+            self._show_warning("上一步操作属于其他队伍，请先切换到该队伍再撤销！")
+            return
+        self.refresh_after_event(self.history.undo(self._apply_event))
+        self.update_undo_actions()
+        self.update_status(f"已撤销：{step[0]['类型']}")
+
+    def redo(self):
+        step = self.history.peek_redo()
+        if step is None:
+            return
+        if step[1]["队伍"] != self.race_data.progress:
+            self._show_warning("下一步操作属于其他队伍，请先切换到该队伍再重做！")
+            return
+        event = self.history.redo(self._apply_event)
+        self.refresh_after_event(event)
+        self.update_undo_actions()
+        self.update_status(f"已重做：{event['类型']}")
+
+    def update_undo_actions(self):
+        self.undo_action.setEnabled(self.history.peek_undo() is not None)
+        self.redo_action.setEnabled(self.history.peek_redo() is not None)
+
+    def refresh_after_event(self, event):
+        # 只刷新事件涉及的界面部分：其他队伍的修改不刷新，单个成绩的修改只更新对应的选项
+        kind = event["类型"]
+        progress = self.race_data.progress
+        if kind == EVENT_IMPORT_TEAMS:
+            self.leaderboard.rebuild(self.race_data.teams)
+            self.leaderboard_changed = True
+        if self.leaderboard_changed or kind == EVENT_SWITCH_TEAM:
+            self.update_leaderboard_display()
+        if kind in (EVENT_IMPORT_TEAMS, EVENT_SWITCH_TEAM):
+            self.update_team_information()
+            self.update_timer_display()
+            self.record_model.set_team(self.race_data.current_team)
+            self.update_penalty_area()
+            return
+        if event["队伍"] != progress:
+            return
+
+        if kind == EVENT_SET_TIMER:
+            self.update_timer_display()
+        elif kind == EVENT_ADD_RECORD:
+            records = self.race_data.current_team.records
+            self.record_model.record_inserted(event.get("位置", len(records) - 1))
+            if len(records) == 1 or "位置" in event:
+                # 撤销删除时插入的成绩可能是已确认的成绩
+                self.update_penalty_area()
+                self.update_best_record_display()
+        elif kind == EVENT_REMOVE_RECORD:
+            self.record_model.record_removed(event["成绩"])
+            self.update_penalty_area()
+            self.update_best_record_display()
+        else:
+            self.record_model.record_changed(event["成绩"])
+            if kind != EVENT_SET_RECORD_STATE and event["成绩"] == self.record_option_display.currentIndex():
+                self.update_penalty_area()
+            self.update_best_record_display()
+
+    def timer_state_event(self):
+        progress = self.race_data.progress
+        team = self.race_data.teams[progress]
+        return {"类型": EVENT_SET_TIMER, "队伍": progress, "比赛阶段": team.phase,
+                "剩余时间": team.remaining_time, "是否暂停": team.paused}
+
+    def commit_timer_state(self):
+        self.commit_event(self.timer_state_event())
+
+    def journal_timer_state(self):
+        # 只写入比赛记录，剩余时间已由倒计时显示，无需刷新界面
+        if self.countdown.running:
+            self._apply_event(self.timer_state_event())
+
+    def snapshot_race_data(self):
+        if self.journal.events_since_snapshot or self.countdown.running:
+            self.journal.snapshot(self.race_data)
 
     def update_status(self, message):
         self.status_bar.showMessage(f"{datetime.datetime.now().strftime('%H:%M:%S')}: " + message, 0)
@@ -291,14 +545,8 @@ class Console(QMainWindow):
     def _show_warning(self, message):
         QMessageBox.warning(self, "警告", message)
 
-    def update_full_screen_display(self, widget_name, text):
-        if self.full_screen_window:
-            widget = getattr(self.full_screen_window, widget_name, None)
-            if widget and widget.text() != text:  # 仅在内容变化时才更新
-                widget.setText(text)
-
     def import_team_list(self):
-        if self.race_data["比赛进度"] > 0:
+        if self.race_data.progress > 0:
             self._show_warning("当前已开始比赛，请先清空队伍名单后再导入！")
             return
 
@@ -343,31 +591,25 @@ class Console(QMainWindow):
                 team_list = []
                 for index, row in df.iterrows():
                     team_members = [str(member) for member in row.iloc[2:6] if pd.notna(member)]  # 过滤掉第三至第六列的空值
-                    team = {
-                        "队伍编号": row.iloc[0],  # 第一列
-                        "队伍名称": row.iloc[1],  # 第二列
-                        "队伍成员": '、'.join(team_members),  # 把过滤结果合并为字符串
-                        "比赛阶段": "赛前准备阶段",
-                        "剩余时间": self.configuration["赛前准备时间"],
-                        "是否暂停": True,
-                        "所有成绩": [],
-                        "最好成绩": 999.999,
-                    }
-                    team_list.append(team)
-
-                self.race_data["队伍名单"] += team_list
-                self.race_data["比赛进度"] = 1
+                    team = Team(
+                        str(row.iloc[0]),  # 第一列
+                        str(row.iloc[1]),  # 第二列
+                        '、'.join(team_members),  # 把过滤结果合并为字符串
+                        "赛前准备阶段",
+                        self.configuration["赛前准备时间"],
+                    )
+                    team_list.append(team.to_dict())
+
+                self.commit_event({"类型": EVENT_IMPORT_TEAMS, "队伍": team_list, "比赛进度": 1})
 
                 self.update_status(f"读取文件 {file_name} 成功！")
-                self.update_team_information()
-                self.update_timer_display()
-                self.update_record_option()
+                self.countdown.attach(self.race_data.current_team)
 
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"读取文件时出错：{e}")
 
     def save_team_list(self):
-        if self.race_data["比赛进度"] == 0:
+        if self.race_data.progress == 0:
             self._show_warning("当前未开始比赛，无法保存比赛结果！")
             return
 
@@ -376,7 +618,7 @@ class Console(QMainWindow):
 
         if filename:
             # 创建一个新的 Excel 工作簿
-            workbook = Workbook()
+            workbook = openpyxl.Workbook()
             sheet = workbook.active
             sheet.title = "队伍信息"
 
@@ -385,11 +627,11 @@ class Console(QMainWindow):
             sheet.append(headers)
 
             # 添加字典信息到 Excel
-            for team in self.race_data["队伍名单"][1:]:
+            for team in self.race_data.teams[1:]:
                 row_data = [
-                    team["队伍编号"],
-                    team["队伍名称"],
-                    team["最好成绩"],
+                    team.number,
+                    team.name,
+                    team.best_record,
                 ]
                 sheet.append(row_data)
 
@@ -397,14 +639,59 @@ class Console(QMainWindow):
             workbook.save(filename)
             self.update_status(f"文件已保存到: {filename}")  # 可以根据需要打印或显示消息
 
+    def new_race_record(self):
+        progress = self.race_data.progress
+        if not self.race_data.teams[progress].paused:
+            self._show_warning("请将比赛暂停后再新建比赛记录！")
+            return
+        reply = QMessageBox.question(self, "新建比赛记录", "当前比赛数据将被归档并清空，是否继续？")
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        archive = self.journal.archive()
+        self.race_data = self.default_race_data()
+        self.journal.start(self.race_data)
+        self.history.clear()
+        self.update_undo_actions()
+        self.leaderboard.rebuild(self.race_data.teams)
+        self.update_leaderboard_display()
+
+        self.countdown.attach(self.race_data.current_team)
+        self.update_team_information()
+        self.update_timer_display()
+        self.record_model.set_team(self.race_data.current_team)
+        self.update_penalty_area()
+        self.update_status(f"已新建比赛记录，原记录已归档至 {archive}")
+
+    def replay_capture_file(self):
+        if self.replay_thread and self.replay_thread.isRunning():
+            self.replay_thread.stop()
+            self.replay_thread.wait()
+            self.update_status("已停止回放！")
+            return
+
+        file_name, _ = QFileDialog.getOpenFileName(self, "回放通信记录", "capture", "Capture Files (*.cap*);;All Files (*)")
+        if not file_name:
+            return
+
+        speeds = {"1 倍速": 1.0, "2 倍速": 2.0, "10 倍速": 10.0, "最快速度": 0}
+        speed, ok = QInputDialog.getItem(self, "回放通信记录", "回放速度:", list(speeds), 0, False)
+        if not ok:
+            return
+
+        self.replay_thread = ReplayThread(file_name, self.mailbox, speeds[speed])
+        self.replay_thread.send_status.connect(self.update_status)
+        self.replay_thread.start()
+        self.update_status(f"正在回放 {file_name}（{speed}），再次选择“回放通信记录”可停止")
+
     def open_dialog(self, dialog_type):
         dialog_map = {
-            "通信设置": CommunicationSettingDialog(self.configuration, self.communication_thread),
+            "通信设置": CommunicationSettingDialog(self.configuration, self.communication_links, self.mailbox),
             "比赛设置": CompetitionSettingDialog(self.configuration),
-            "计时设置": TimerSettingDialog(self.configuration, self.race_data["比赛进度"]),
+            "计时设置": TimerSettingDialog(self.configuration, self.race_data.progress),
             "罚时设置": PenaltySettingDialog(self.configuration),
-            "修改剩余时间": ModifyTimeDialog(self.race_data["队伍名单"][self.race_data["比赛进度"]]),
-            "添加比赛成绩": AddRecordDialog(self.race_data["队伍名单"][self.race_data["比赛进度"]])
+            "修改剩余时间": ModifyTimeDialog(self.race_data.current_team),
+            "添加比赛成绩": AddRecordDialog(self.race_data.current_team)
         }
 
         # 根据对话框类型创建对象
@@ -422,15 +709,15 @@ class Console(QMainWindow):
             elif dialog_type == "罚时设置":
                 dialog.setting_saved.connect(self.update_penalty_panel)
             elif dialog_type == "修改剩余时间":
-                progress = self.race_data["比赛进度"]
-                if self.race_data["队伍名单"][progress]["是否暂停"]:
-                    dialog = ModifyTimeDialog(self.race_data["队伍名单"][progress])
-                    dialog.setting_saved.connect(self.update_timer_display)
+                progress = self.race_data.progress
+                if self.race_data.teams[progress].paused:
+                    dialog = ModifyTimeDialog(self.race_data.teams[progress])
+                    dialog.setting_saved.connect(self.modify_timer_state)
                 else:
                     self._show_warning("请先暂停再修改剩余时间！")
                     return
             elif dialog_type == "添加比赛成绩":
-                dialog.setting_saved.connect(self.update_record_option)
+                dialog.setting_saved.connect(lambda record: self.add_record(record["原始时间"], undoable=True))
         else:
             return
 
@@ -438,36 +725,51 @@ class Console(QMainWindow):
         dialog.exec()
 
     def open_serial_port(self, config):
-        self.communication_thread["串口"] = SerialPortThread(config[0], config[1])
-        self.communication_thread["串口"].real_received.connect(self.update_real_time_display)
-        self.communication_thread["串口"].final_received.connect(self.add_record)
-        self.communication_thread["串口"].send_status.connect(self.update_status)
-        self.communication_thread["串口"].timer_reset.connect(lambda: self.audio_play("重置"))
-        self.communication_thread["串口"].start()
+        self.communication_links["串口"] = self.open_communication_link("串口", config[0], config[1])
 
     def open_tcp_server(self, config):
-        self.communication_thread["TCP"] = TcpServerThread(config[0], config[1])
-        self.communication_thread["TCP"].real_received.connect(self.update_real_time_display)
-        self.communication_thread["TCP"].final_received.connect(self.add_record)
-        self.communication_thread["TCP"].send_status.connect(self.update_status)
-        self.communication_thread["TCP"].timer_reset.connect(lambda: self.audio_play("重置"))
-        self.communication_thread["TCP"].start()
+        self.communication_links["TCP"] = self.open_communication_link("TCP", config[0], config[1])
 
     def open_udp_server(self, config):
-        self.communication_thread["UDP"] = UdpServerThread(config[0], config[1])
-        self.communication_thread["UDP"].real_received.connect(self.update_real_time_display)
-        self.communication_thread["UDP"].final_received.connect(self.add_record)
-        self.communication_thread["UDP"].send_status.connect(self.update_status)
-        self.communication_thread["UDP"].timer_reset.connect(lambda: self.audio_play("重置"))
-        self.communication_thread["UDP"].start()
+        self.communication_links["UDP"] = self.open_communication_link("UDP", config[0], config[1])
+
+    def open_communication_link(self, name, *args):
+        if self.receiver_process:
+            link = self.receiver_process.add_link(name, *args)
+        else:
+            link = LINK_TYPES[name](*args)
+            self.communication_hub.add_link(link)
+
+        if link.status_message:
+            self.update_status(link.status_message)
+        link.send_status.connect(self.update_status)
+        return link
+
+    def drain_mailbox(self):
+        if self.receiver_process:
+            self.receiver_process.drain(self.mailbox, self.update_status)
+
+        real_time, events = self.mailbox.take()
+
+        for kind, value, timestamp in events:
+            if kind == FRAME_FINAL:
+                self.real_time_clock.freeze(value)
+                self.add_record(value, timestamp)
+            elif kind == FRAME_RESET:
+                self.real_time_clock.reset()
+                self.audio_play("重置")
+
+        # 实时时间以收到的帧为锚点在本地外推，每个显示帧刷新一次
+        if real_time is not None:
+            self.real_time_clock.anchor(*real_time)
+        self.update_real_time_display(self.real_time_clock.value())
 
     def update_title_settings(self):
         self.race.setText(
             self.configuration["比赛名称"] + self.configuration["比赛阶段"] + self.configuration["比赛组别"])
 
-        if self.full_screen_window:
-            self.update_full_screen_display('title', self.configuration["比赛名称"] + self.configuration["比赛阶段"])
-            self.update_full_screen_display('subheading', self.configuration["比赛组别"])
+        self.display_state.update(title=self.configuration["比赛名称"] + self.configuration["比赛阶段"],
+                                  subheading=self.configuration["比赛组别"])
 
     def update_project_menu(self):
         project_menu = self.menuBar().findChild(QMenu, "投屏")
@@ -481,36 +783,60 @@ class Console(QMainWindow):
         # 获取当前所有显示器
         screens = QGuiApplication.screens()
 
-        # 根据检测到的屏幕数量动态添加 QAction
+        # 每个显示器可以选择一种布局，各显示器的投屏窗口同时显示
         for i, screen in enumerate(screens):
-            action = QAction(f"显示器 {i + 1}: {screen.name()}", self)
-            action.setCheckable(True)
-            action.triggered.connect(lambda checked, idx=i: self.project_to_screen(idx))
-            project_menu.addAction(action)
-
-    def project_to_screen(self, screen_index):
-        if self.full_screen_window and self.full_screen_window.screen() == QApplication.screens()[screen_index]:
-            self.full_screen_window.close()  # 关闭当前全屏窗口
-            self.full_screen_window = None  # 清空当前全屏窗口
-            return
+            if i:
+                project_menu.addSeparator()
+            current = self.projector_windows.get(i)
+            for board_layout in PROJECTOR_LAYOUTS:
+                action = project_menu.addAction(f"显示器 {i + 1}: {screen.name()} - {board_layout}")
+                action.setCheckable(True)
+                action.setChecked(bool(current) and current[1] == board_layout)
+                action.triggered.connect(lambda checked, idx=i, layout=board_layout: self.project_to_screen(idx, layout))
+
+    def project_to_screen(self, screen_index, board_layout=LAYOUT_SCOREBOARD):
+        """
+        在指定显示器上打开或关闭投屏窗口：再次选择正在显示的布局时关闭，选择其他布局时替换。
+
+        :param screen_index: int，显示器序号。
+        :param board_layout: str，PROJECTOR_LAYOUTS 之一。
+        """
+        current = self.projector_windows.get(screen_index)
+        if current:
+            self.close_projector_window(screen_index)
+            if current[1] == board_layout:
+                return
 
-        # 如果已经有全屏窗口打开，先关闭它
-        if self.full_screen_window is not None:
-            self.full_screen_window.close()
-
-        # 创建全屏窗口
-        self.full_screen_window = FullScreenWindow(self.configuration, self.race_data)
         screens = QApplication.screens()
+        if not 0 <= screen_index < len(screens):
+            return
 
-        if 0 <= screen_index < len(screens):
-            # 将全屏窗口移到指定的屏幕并显示全屏
-            target_screen = screens[screen_index - 1]
-            self.full_screen_window.setGeometry(target_screen.geometry())
-            self.full_screen_window.showFullScreen()
-
-            # 信息更新
-            self.update_team_information()
-            self.update_timer_display()
+        # 新窗口订阅显示状态后立即显示当前内容，显示文本只在控制台格式化一次
+        if board_layout == LAYOUT_SCOREBOARD and not self.configuration["投屏绘制记分板"]:
+            window = FullScreenWindow(self.configuration)
+        else:
+            window = ScoreboardWindow(self.configuration, self.glyph_cache, board_layout)
+        binding = self.display_state.subscribe(window.display_labels)
+        self.projector_windows[screen_index] = (window, board_layout, binding)
+        window.closed.connect(lambda: self.projector_window_closed(screen_index, window))
+
+        # 将全屏窗口移到指定的屏幕并显示全屏
+        window.setGeometry(screens[screen_index].geometry())
+        window.showFullScreen()
+
+    def close_projector_window(self, screen_index):
+        window, _, binding = self.projector_windows.pop(screen_index)
+        self.display_state.unsubscribe(binding)
+        window.close()
+        window.deleteLater()
+
+    def projector_window_closed(self, screen_index, window):
+        # 投屏窗口自行关闭（按 Esc 或关闭按钮）时取消订阅并移除；由控制台关闭时已先移除，这里不再处理
+        current = self.projector_windows.get(screen_index)
+        if current and current[0] is window:
+            del self.projector_windows[screen_index]
+            self.display_state.unsubscribe(current[2])
+            window.deleteLater()
 
     def show_about(self):
         QMessageBox.about(self, "关于","""
@@ -523,128 +849,89 @@ class Console(QMainWindow):
                                             """)
 
     def update_team_information(self):
-        progress = self.race_data["比赛进度"]
-        team_list = self.race_data["队伍名单"]
+        progress = self.race_data.progress
+        team_list = self.race_data.teams
         team_data = team_list[progress]
-        total_teams = len(team_list) - 1
-
-        # 更新比赛进度
-        self.progress_display.setText(f"{progress}/{total_teams}")
-
-        # 更新全屏显示窗口
-        if self.full_screen_window:
-            self.update_full_screen_display("progress_display", f"{progress}/{total_teams}")
-
-        # 更新队伍编号
-        self.team_id_display.setText(team_data.get("队伍编号", "Null"))
-        self.update_full_screen_display('team_id_display', team_data.get("队伍编号", "Null"))
 
-        # 更新队伍名称
-        self.team_name_display.setText(team_data.get("队伍名称", "Null"))
-        self.update_full_screen_display('team_name_display', team_data.get("队伍名称", "Null"))
-
-        # 更新队伍成员
-        self.team_members_display.setText(team_data.get("队伍成员", "Null"))
-        self.update_full_screen_display('team_members_display', team_data.get("队伍成员", "Null"))
-
-        # 更新下一支队伍信息
+        # 下一支队伍信息
         if progress + 1 < len(team_list):
             next_team = team_list[progress + 1]
-            next_team_text = f"{next_team['队伍编号']}：{next_team['队伍名称']}"
+            next_team_text = f"{next_team.number}：{next_team.name}"
         else:
             next_team_text = "无"
 
-        self.next_team_display.setText(next_team_text)
-        if self.full_screen_window:
-            self.update_full_screen_display("next_team_display", next_team_text)
+        self.display_state.update(progress=f"{progress}/{len(team_list) - 1}", team_id=team_data.number,
+                                  team_name=team_data.name, team_members=team_data.members, next_team=next_team_text)
 
         # 更新计时器
         if progress > 0:
             self.update_timer_display()
 
-        # 刷新大屏
-        if self.full_screen_window:
-            self.full_screen_window.update()
-
     def update_real_time_display(self, time):
-        # 更新显示内容
-        formatted_time = f"{time:.3f}s"
-        self.real_time_display.setText(formatted_time)
-
-        # 更新全屏窗口显示
-        self.update_full_screen_display('real_time_display', formatted_time)
-
-    def update_timer(self):
-        progress = self.race_data["比赛进度"]
-        team_data = self.race_data["队伍名单"][progress]
-
-        # 如果比赛未暂停，进行时间更新
-        if team_data["是否暂停"]:
+        # 数值未变化时无需重绘
+        if time == self.real_time:
             return
-
-        # 减少剩余时间
-        team_data["剩余时间"] -= 1
-
-        if team_data["剩余时间"] <= 0:
-            if team_data["比赛阶段"] == "赛前准备阶段":
-                team_data["比赛阶段"] = "正式比赛阶段"
-                team_data["剩余时间"] = self.configuration["比赛时间"]
-            else:
-                team_data["剩余时间"] = 0
-                self.audio_play("时间到")
-                self.toggle_start_and_pause_button()
-
-        # 更新显示
-        self.update_timer_display()
+        self.real_time = time
+
+        self.display_state.update(real_time=f"{time:.3f}s")
+
+    def schedule_warning_cues(self):
+        # 提示音由倒计时引擎在剩余时间越过整秒的时刻触发，播放请求只入队，不阻塞界面线程
+        for entry in self.warning_cues:
+            self.countdown.cancel(entry)
+        self.warning_cues = [
+            self.countdown.schedule(phase, seconds,
+                                    lambda seconds=seconds: self.audio_service.play(warning_cue(seconds)))
+            for phase, times in self.configuration["提示音时间"].items() for seconds in times
+        ]
+
+    def finish_countdown(self):
+        # 倒计时引擎已自动暂停，这里只同步按钮、比赛记录与提示
+        self.start_and_pause_button.setText("开始倒计时")
+        self.commit_timer_state()
+        self.audio_play("时间到")
 
     def update_timer_display(self):
-        progress = self.race_data["比赛进度"]
-
-        # 比赛阶段
-        race_stage = self.race_data["队伍名单"][progress].get("比赛阶段", "未知比赛阶段")
-        self.race_phase_display.setText(race_stage)
-        self.update_full_screen_display("race_phase_display", race_stage)
-
-        # 剩余时间
-        remaining_time = self.race_data["队伍名单"][progress].get("剩余时间", None)
-        if remaining_time is not None:
-            if remaining_time < 60:
-                time_text = f'{remaining_time} 秒'
-            else:
-                minutes = remaining_time // 60
-                seconds = remaining_time % 60
-                time_text = f'{minutes} 分 {seconds} 秒'
-            self.remaining_time_display.setText(time_text)
-            self.update_full_screen_display("remaining_time_display", f'{time_text}')
+        # 每秒调用一次，未变化的字段（比赛阶段、最好成绩）在显示状态中被过滤，不会重绘
+        team = self.race_data.current_team
+        remaining_time = team.remaining_time
+        if remaining_time is None:
+            time_text = "Null"
+        elif remaining_time < 60:
+            time_text = f'{remaining_time} 秒'
         else:
-            self.remaining_time_display.setText("Null")
-            self.update_full_screen_display("remaining_time_display", "Null")
+            time_text = f'{remaining_time // 60} 分 {remaining_time % 60} 秒'
 
-        # 最好成绩
-        best_record = self.race_data["队伍名单"][progress].get("最好成绩", "Null")
-        self.best_record_display.setText(f'{best_record}s')
-        self.update_full_screen_display("best_record_display", f'{best_record}s')
-
-        # 刷新大屏幕
-        if self.full_screen_window:
-            self.full_screen_window.update()
+        self.display_state.update(race_phase=team.phase, remaining_time=time_text,
+                                  best_record=f'{team.best_record:.3f}s')
 
     def toggle_start_and_pause_button(self):
-        progress = self.race_data["比赛进度"]
-        team = self.race_data["队伍名单"][progress]
+        progress = self.race_data.progress
+        team = self.race_data.teams[progress]
 
         # 切换暂停状态并更新按钮文本
-        team["是否暂停"] = not team["是否暂停"]
-        button_text = "开始倒计时" if team["是否暂停"] else "暂停倒计时"
+        if team.paused:
+            self.countdown.start()
+        else:
+            self.countdown.pause()
+        self.commit_timer_state()
+        button_text = "开始倒计时" if team.paused else "暂停倒计时"
         self.start_and_pause_button.setText(button_text)
 
+    def modify_timer_state(self, phase, remaining_time):
+        progress = self.race_data.progress
+        team = self.race_data.teams[progress]
+        self.commit_event({"类型": EVENT_SET_TIMER, "队伍": progress, "比赛阶段": phase,
+                           "剩余时间": remaining_time, "是否暂停": team.paused})
+        self.countdown.attach(team)
+
     def modify_time(self):
-        progress = self.race_data["比赛进度"]
-        if not self.race_data["队伍名单"][progress]["是否暂停"]:
+        progress = self.race_data.progress
+        if not self.race_data.teams[progress].paused:
             self._show_warning("仅暂停状态下允许调整时间！")
 
     def switch_to_previous_team(self):
-        progress = self.race_data["比赛进度"]
+        progress = self.race_data.progress
 
         # 检查是否有未处理成绩
         if self.check_unprocessed_scores(progress):
@@ -656,235 +943,142 @@ class Console(QMainWindow):
             self.switch_team(progress, -1)
 
     def switch_to_next_team(self):
-        progress = self.race_data["比赛进度"]
+        progress = self.race_data.progress
 
         # 检查是否有未处理成绩
         if self.check_unprocessed_scores(progress):
             return
 
-        if progress == len(self.race_data["队伍名单"]) - 1:
+        if progress == len(self.race_data.teams) - 1:
             self._show_warning("当前已经是最后一支队伍！")
         else:
             self.switch_team(progress, 1)
 
     def check_unprocessed_scores(self, progress):
-        for data in self.race_data["队伍名单"][progress]["所有成绩"]:
-            if data["状态"] == "未处理":
+        for data in self.race_data.teams[progress].records:
+            if data.state == "未处理":
                 self._show_warning("还有成绩未处理，请将所有成绩处理完毕后再切换队伍！")
                 return True
         return False
 
     def switch_team(self, progress, step):
-        if self.race_data["队伍名单"][progress]["是否暂停"]:
-            self.race_data["比赛进度"] += step
-            self.update_team_information()
-            self.update_record_option()
-            self.update_penalty_area()
+        if self.race_data.teams[progress].paused:
+            self.commit_event({"类型": EVENT_SWITCH_TEAM, "比赛进度": progress + step})
+            self.countdown.attach(self.race_data.current_team)
         else:
             self._show_warning("请将比赛暂停后再调整比赛进度！")
 
-    def update_record_option(self):
-        progress = self.race_data["比赛进度"]
-        all_records = self.race_data["队伍名单"][progress]["所有成绩"]
-
-        # 获取当前选择的索引
-        old_index = self.record_option_display.currentIndex() if self.record_option_display.currentText() else 0
-
-        # 清除旧的显示内容
-        self.record_option_display.clear()
-
-        if all_records:
-            # 遍历每个成绩
-            for data in all_records:
-                total_penalty = sum(penalty[1] for penalty in data['罚时'])
-                self.record_option_display.addItem(f"{data['原始时间']:.3f}+{total_penalty} ({data['状态']})")
-
-            # 设置默认选择项
-            self.record_option_display.setCurrentIndex(old_index)
+    def update_best_record_display(self):
+        self.display_state.update(best_record=f'{self.race_data.current_team.best_record:.3f}s')
+
+    def update_leaderboard_display(self):
+        self.leaderboard_changed = False
+        teams = self.race_data.teams
+        lines = [f"{rank}. {teams[index].number} {teams[index].name}  {best_record:.3f}s"
+                 for rank, index, best_record in self.leaderboard.top(self.configuration["排行榜显示数量"])]
+
+        # 只更新内容变化的行
+        for row, line in enumerate(lines):
+            if row < self.leaderboard_display.count():
+                item = self.leaderboard_display.item(row)
+                if item.text() != line:
+                    item.setText(line)
+            else:
+                self.leaderboard_display.addItem(line)
+        while self.leaderboard_display.count() > len(lines):
+            self.leaderboard_display.takeItem(len(lines))
 
-            # 获取所有项的索引并设置居中
-            for i in range(self.record_option_display.count()):
-                index = self.record_option_display.model().index(i, 0)
-                self.record_option_display.model().setData(index,
-                                                           Qt.AlignmentFlag.AlignCenter,
-                                                           Qt.ItemDataRole.TextAlignmentRole)
-        else:
-            self.record_option_display.addItem("暂无成绩")
-            index = self.record_option_display.model().index(0, 0)
-            self.record_option_display.model().setData(index,
-                                                       Qt.AlignmentFlag.AlignCenter,
-                                                       Qt.ItemDataRole.TextAlignmentRole)
+        rank = self.leaderboard.rank(self.race_data.progress)
+        self.rank_display.setText(f"当前队伍：第 {rank} 名 / 共 {len(self.leaderboard)} 支" if rank else
+                                  f"当前队伍暂无排名 / 共 {len(self.leaderboard)} 支")
+        self.display_state.update(leaderboard="\n".join(lines))
 
     def update_record_state(self, text):
         # 检查是否有选中的成绩
-        if self.record_option_display.currentText() == "暂无成绩":
+        if not self.record_model.has_records():
             self._show_warning("请先选中一个成绩再进行操作！")
             return
 
-        progress = self.race_data["比赛进度"]
+        progress = self.race_data.progress
         index = self.record_option_display.currentIndex()
 
-        # 更新选中成绩的状态
-        team_data = self.race_data["队伍名单"][progress]
-        team_data["所有成绩"][index]["状态"] = text
-
-        # 更新显示
-        self.update_record_option()
+        # 更新选中成绩的状态与最好成绩
+        if self.race_data.teams[progress].records[index].state != text:
+            self.commit_event({"类型": EVENT_SET_RECORD_STATE, "队伍": progress, "成绩": index, "状态": text},
+                              undoable=True)
 
-        # 更新最好成绩
-        best_record = min((data["修正时间"] for data in team_data["所有成绩"] if data["状态"] == "已确认"), default=999.999)
-
-        # 更新最好成绩显示
-        team_data["最好成绩"] = best_record
-        self.best_record_display.setText(f'{best_record:.3f}s')
-
-    def add_record(self, time):
-        progress = self.race_data["比赛进度"]
-        self.race_data["队伍名单"][progress]["所有成绩"].append({
+    def add_record(self, time, received_at=None, undoable=False):
+        progress = self.race_data.progress
+        self.commit_event({"类型": EVENT_ADD_RECORD, "队伍": progress, "成绩": {
             "原始时间": time,
             "修正时间": time,
             "状态": "未处理",
             "罚时": [],
-        })
+            "接收时间": received_at,
+        }}, undoable)
 
-        self.update_record_option()
         self.update_status("成绩有更新，请及时处理！")
 
-    def update_penalty_panel(self):
-        # 清除右侧布局中的所有控件
-        for i in reversed(range(self.right_layout.count())):
-            item = self.right_layout.itemAt(i)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-        # 遍历配置中的罚时种类
-        penalty_types = self.configuration["罚时种类"]
-        for text, value in penalty_types:
-            button = QPushButton()
-
-            # 预计算按钮文本
-            if value >= 0:
-                button_text = f"{text} (+{value}s)"
-            else:
-                button_text = f"{text} ({value}s)"
-
-            button.setText(button_text)
-            button.setStyleSheet("padding: 8px;")
-
-            # 使用默认参数捕获当前的 text 和 value，避免闭包问题
-            button.clicked.connect(lambda _, t=text, v=value: self.add_penalty((t, v)))
+    @staticmethod
+    def penalty_button_text(penalty):
+        text, value = penalty
+        return f"{text} ({'+' if value >= 0 else ''}{value}s)"
 
-            # 将按钮添加到布局中
-            self.right_layout.addWidget(button)
+    def update_penalty_panel(self):
+        # 罚时种类修改后更新可选罚时的按钮
+        self.penalty_option_panel.set_texts([self.penalty_button_text(penalty)
+                                             for penalty in self.configuration["罚时种类"]])
 
     def add_penalty(self, penalty):
         # 获取当前比赛进度和当前选中的成绩索引
-        progress = self.race_data["比赛进度"]
+        progress = self.race_data.progress
         index = self.record_option_display.currentIndex()
 
         # 检查是否选中成绩
-        if self.record_option_display.currentText() == "暂无成绩":
+        if not self.record_model.has_records():
             self._show_warning("当前未选中任何成绩，不能添加罚时！")
             return
 
         # 检查选中成绩的状态是否已确认
-        current_record = self.race_data["队伍名单"][progress]["所有成绩"][index]
-        if current_record["状态"] == "已确认":
+        current_record = self.race_data.teams[progress].records[index]
+        if current_record.state == "已确认":
             self._show_warning("本次成绩已确认，不能添加罚时！")
             return
 
-        # 添加罚时并进行时间计算
-        current_record["罚时"].append(penalty)
-
-        # 计算修正时间
-        total_penalty = sum(penalty[1] for penalty in current_record["罚时"])
-        corrected_time = current_record["原始时间"] + total_penalty
-
-        # 更新修正时间
-        current_record["修正时间"] = corrected_time
-
-        # 更新界面
-        self.update_record_option()
-        self.update_penalty_area()
+        # 添加罚时并更新修正时间
+        self.commit_event({"类型": EVENT_ADD_PENALTY, "队伍": progress, "成绩": index, "罚时": penalty}, True)
 
     def update_penalty_area(self):
-        # 清除当前左侧布局中的所有控件
-        for i in reversed(range(self.left_layout.count())):
-            item = self.left_layout.itemAt(i)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-        # 获取当前成绩的罚时列表
-        progress = self.race_data["比赛进度"]
+        # 获取当前成绩的罚时列表，没有选中成绩时清空
+        progress = self.race_data.progress
         try:
-            penalties = self.race_data["队伍名单"][progress]["所有成绩"][self.record_option_display.currentIndex()]["罚时"]
-        except Exception:
-            return
+            record_index = self.record_option_display.currentIndex()
+            penalties = self.race_data.teams[progress].records[record_index].penalties
+        except IndexError:
+            penalties = []
 
-        if penalties:
-            grid_layout = QGridLayout()
-            column_count = 4
-            button_index = 0
+        self.applied_penalty_panel.set_texts([self.penalty_button_text(penalty) for penalty in penalties])
 
-            for text, value in penalties:
-                button = QPushButton(f"{text} ({'+' if value >= 0 else ''}{value}s)")
-                button.setStyleSheet("padding: 8px;")
-                button.clicked.connect(lambda _, i=button_index: self.remove_penalty(penalties, i))
-
-                # 计算行列位置
-                row, col = divmod(button_index, column_count)
-                grid_layout.addWidget(button, row, col)
-
-                button_index += 1
-
-            # 填充剩余的单元格（可选）
-            if button_index % column_count != 0:
-                row = button_index // column_count
-                for empty_index in range(button_index % column_count, column_count):
-                    grid_layout.addWidget(QWidget(), row, empty_index)  # 使用空QWidget作为占位符
-
-            grid_widget = QWidget()
-            grid_widget.setLayout(grid_layout)
-            self.left_layout.addRow(grid_widget)
-
-    def remove_penalty(self, penalties, penalty_index):
-        progress = self.race_data["比赛进度"]
-        record_index = self.record_option_display.currentIndex()
+    def remove_penalty(self, record_index, penalty_index):
+        progress = self.race_data.progress
+        record = self.race_data.teams[progress].records[record_index]
 
         # 确保成绩未确认才能修改罚时
-        if self.race_data["队伍名单"][progress]["所有成绩"][record_index]["状态"] == "已确认":
+        if record.state == "已确认":
             self._show_warning("本次成绩已确认，不能撤销罚时！")
             return
 
         # 确保索引有效
-        if 0 <= penalty_index < len(penalties):
-            # 删除指定罚时
-            del penalties[penalty_index]
-            self.update_record_option()
-            self.update_penalty_area()
+        if 0 <= penalty_index < len(record.penalties):
+            # 删除指定罚时并更新修正时间
+            self.commit_event({"类型": EVENT_REMOVE_PENALTY, "队伍": progress, "成绩": record_index,
+                               "罚时序号": penalty_index}, True)
 
     def audio_play(self, type):
-        path = self.audio_path[type]
-        self.task = AudioPlayThread(path)
-        self.task.start()
+        self.audio_service.play(type)
         if type == "重置":
             self.update_status("计时器已手动重置！")
             self.update_real_time_display(0)
         else:
             self.update_status("当前队伍比赛时间结束！")
 
-
-def search_file(filename, search_root=None):
-    """
-    从指定目录递归搜索文件.
-    :param filename: 要搜索的文件名
-    :param search_root: 起始搜索目录，默认为当前脚本目录
-    :return: 文件的完整路径，若找不到返回 None
-    """
-    search_root = search_root or os.getcwd()
-    for root, _, files in os.walk(search_root):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
@@ -7,7 +7,8 @@ from widget.common import *
 
 
 class AddRecordDialog(QDialog):
-    setting_saved = Signal()
+    # 新成绩，由控制台写入比赛记录
+    setting_saved = Signal(dict)
 
     def __init__(self, team):
         super().__init__()
@@ -60,11 +61,10 @@ class AddRecordDialog(QDialog):
         else:
             average_record = 999.999
 
-        self.team["所有成绩"].append({
+        self.setting_saved.emit({
             "原始时间": average_record,
             "修正时间": average_record,
             "状态": "未处理",
             "罚时": [],
         })
-        self.setting_saved.emit()
         self.accept()
@@ -2,16 +2,20 @@
 
 import datetime
 import socket
+import time
 
-import psutil
-import serial.tools.list_ports
 from PySide6.QtCore import QTimer, Signal
 from PySide6.QtGui import QTextOption
-from PySide6.QtWidgets import QVBoxLayout, QDialog, QMessageBox, QGridLayout, QTextEdit, QTabWidget, QScrollArea
+from PySide6.QtWidgets import QVBoxLayout, QDialog, QMessageBox, QGridLayout, QTextEdit, QTabWidget, QScrollArea, \
+    QTableWidget, QTableWidgetItem, QHeaderView
 
+from utils import *
 from widget.common import *
 from widget.round_indicator import *
 
+psutil = lazy_import("psutil")
+list_ports = lazy_import("serial.tools.list_ports")
+
 
 class CommunicationSettingDialog(QDialog):
     serial_port_state_changed = Signal(tuple)
@@ -19,11 +23,17 @@ class CommunicationSettingDialog(QDialog):
     udp_server_state_changed = Signal(tuple)
     send_status = Signal(str)
 
-    def __init__(self, configuration, communication_thread):
+    def __init__(self, configuration, communication_links, mailbox=None):
+        """
+        :param configuration: dict，配置。
+        :param communication_links: dict，{链路名称: 链路}。
+        :param mailbox: FrameMailbox，界面邮箱，在链路状态页显示实时帧的合并与丢弃计数。
+        """
         super().__init__()
         self.setWindowTitle("通信设置")
         self.configuration = configuration
-        self.communication_thread = communication_thread
+        self.communication_links = communication_links
+        self.mailbox = mailbox
 
         layout = QVBoxLayout()
         self.tab_widget = QTabWidget()
@@ -158,8 +168,31 @@ class CommunicationSettingDialog(QDialog):
         scroll_area.setWidgetResizable(True)
         esp_debug_layout.addWidget(scroll_area, 5, 0, 1, 2)
 
+        # 链路状态
+        self.link_statistics_columns = ["字节/秒", "实时帧/秒", "成绩帧/秒", "Reset/秒", "成绩帧总数", "Reset 总数",
+                                        "丢弃字节", "抖动(ms)", "最近帧(秒前)", "待解码字节"]
+        self.link_statistics_table = QTableWidget(len(self.communication_links), len(self.link_statistics_columns))
+        self.link_statistics_table.setHorizontalHeaderLabels(self.link_statistics_columns)
+        self.link_statistics_table.setVerticalHeaderLabels(list(self.communication_links))
+        self.link_statistics_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.link_statistics_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        for row in range(self.link_statistics_table.rowCount()):
+            for column in range(self.link_statistics_table.columnCount()):
+                self.link_statistics_table.setItem(row, column, QTableWidgetItem("-"))
+        self.previous_statistics = {}
+
+        # 界面邮箱：界面来不及显示而被新值覆盖（合并）或被成绩、Reset 取代（丢弃）的实时帧
+        link_statistics = QWidget()
+        link_statistics_layout = QVBoxLayout(link_statistics)
+        link_statistics_layout.addWidget(self.link_statistics_table)
+        self.mailbox_statistics_display = create_label(alignment=Qt.AlignmentFlag.AlignLeft)
+        self.mailbox_statistics_display.setVisible(mailbox is not None)
+        link_statistics_layout.addWidget(self.mailbox_statistics_display)
+        self.previous_mailbox_statistics = None
+
         self.tab_widget.addTab(communication_setting, "通信设置")
         self.tab_widget.addTab(esp_debug, "ESP调试")
+        self.tab_widget.addTab(link_statistics, "链路状态")
         layout.addWidget(self.tab_widget)
 
         self.setLayout(layout)
@@ -175,7 +208,7 @@ class CommunicationSettingDialog(QDialog):
 
     def refresh_serial_ports(self):
         self.select_port.clear()
-        ports = serial.tools.list_ports.comports()
+        ports = list_ports.comports()
         port_list = []
         for index, port in enumerate(ports):
             if "USB" in port.description or "USB" in port.hwid:
@@ -219,9 +252,9 @@ class CommunicationSettingDialog(QDialog):
             QMessageBox.warning(self, "警告", "请先选择有效的USB串口！")
             return
 
-        if self.communication_thread["串口"]:
-            self.communication_thread["串口"].stop()
-            self.communication_thread["串口"] = None
+        if self.communication_links["串口"]:
+            self.communication_links["串口"].stop()
+            self.communication_links["串口"] = None
             self.serial_connect_state_display.setColor("Red")
             self.serial_port_connect_button.setText("打开串口")
             self.send_status.emit("串口已关闭！")
@@ -233,9 +266,9 @@ class CommunicationSettingDialog(QDialog):
             self.send_status.emit(f"串口{self.select_port.currentText().split(' ')[0]}已开启！")
 
     def toggle_tcp_server_state(self):
-        if self.communication_thread["TCP"]:
-            self.communication_thread["TCP"].stop()
-            self.communication_thread["TCP"] = None
+        if self.communication_links["TCP"]:
+            self.communication_links["TCP"].stop()
+            self.communication_links["TCP"] = None
             self.tcp_server_state_display.setColor("Red")
             self.tcp_server_button.setText("打开TCP服务器")
             self.send_status.emit("TCP服务器已关闭！")
@@ -247,9 +280,9 @@ class CommunicationSettingDialog(QDialog):
                 f"TCP服务器已启动（正在监听{self.set_listening_ip.text()}:{self.set_listening_port.text()}）！")
 
     def toggle_udp_server_state(self):
-        if self.communication_thread["UDP"]:
-            self.communication_thread["UDP"].stop()
-            self.communication_thread["UDP"] = None
+        if self.communication_links["UDP"]:
+            self.communication_links["UDP"].stop()
+            self.communication_links["UDP"] = None
             self.udp_server_state_display.setColor("Red")
             self.udp_server_button.setText("打开UDP服务器")
             self.send_status.emit("UDP服务器已关闭！")
@@ -261,19 +294,19 @@ class CommunicationSettingDialog(QDialog):
                 f"UDP服务器已启动（正在监听{self.set_listening_ip.text()}:{self.set_listening_port.text()}）！")
 
     def send_command(self):
-        if not self.communication_thread["串口"] or not self.communication_thread["串口"].serial_connection.is_open:
+        if not self.communication_links["串口"] or not self.communication_links["串口"].serial_connection.is_open:
             QMessageBox.warning(self, "警告", "串口异常，请检查串口连接状态！")
             return
 
         text = self.select_command.currentText()
         if text == "+++":
-            self.communication_thread["串口"].serial_connection.write(
+            self.communication_links["串口"].serial_connection.write(
                 (self.select_command.currentText()).encode('ascii', errors='ignore'))
         else:
-            self.communication_thread["串口"].serial_connection.write(
+            self.communication_links["串口"].serial_connection.write(
                 (self.select_command.currentText() + "\r\n").encode('ascii', errors='ignore'))
         self.update_output_panel(f"{self.select_command.currentText()}", "发送")
-        self.communication_thread["串口"].serial_connection.flush()
+        self.communication_links["串口"].serial_connection.flush()
 
     def update_output_panel(self, text, type="接收"):
         timestamp = datetime.datetime.now().strftime('%H:%M:%S.%f')[:-3]
@@ -281,63 +314,122 @@ class CommunicationSettingDialog(QDialog):
 
     def update_serial_connect_state(self):
         # 指示灯
-        if self.communication_thread["串口"] and self.communication_thread["串口"].running:
+        if self.communication_links["串口"] and self.communication_links["串口"].running:
             self.serial_connect_state_display.setColor("Green")
         else:
             self.serial_connect_state_display.setColor("Red")
-            self.communication_thread["串口"] = None
+            self.communication_links["串口"] = None
 
         # 按钮
-        if self.communication_thread["串口"]:
+        if self.communication_links["串口"]:
             self.serial_port_connect_button.setText("关闭串口")
         else:
             self.serial_port_connect_button.setText("打开串口")
 
         # 接收内容
-        if self.communication_thread["串口"]:
+        if self.communication_links["串口"]:
             try:
-                self.communication_thread["串口"].message_received.disconnect(self.update_output_panel)
+                self.communication_links["串口"].message_received.disconnect(self.update_output_panel)
             except Exception:
                 pass
 
-            self.communication_thread["串口"].message_received.connect(self.update_output_panel)
+            self.communication_links["串口"].message_received.connect(self.update_output_panel)
 
     def update_tcp_server_state(self):
         # 指示灯
-        if self.communication_thread["TCP"] and self.communication_thread["TCP"].running:
+        if self.communication_links["TCP"] and self.communication_links["TCP"].running:
             self.tcp_server_state_display.setColor("Green")
         else:
             self.tcp_server_state_display.setColor("Red")
-            self.communication_thread["TCP"] = None
+            self.communication_links["TCP"] = None
 
         # 按钮
-        if self.communication_thread["TCP"]:
+        if self.communication_links["TCP"]:
             self.tcp_server_button.setText("关闭TCP服务器")
         else:
             self.tcp_server_button.setText("启动TCP服务器")
 
         # 客户端数量
-        if self.communication_thread["TCP"]:
-            self.client_count_display.setText(str(len(self.communication_thread["TCP"].clients)))
+        if self.communication_links["TCP"]:
+            self.client_count_display.setText(str(len(self.communication_links["TCP"].clients)))
         else:
             self.client_count_display.setText("0")
 
     def update_udp_server_state(self):
         # 指示灯
-        if self.communication_thread["UDP"] and self.communication_thread["UDP"].running:
+        if self.communication_links["UDP"] and self.communication_links["UDP"].running:
             self.udp_server_state_display.setColor("Green")
         else:
             self.udp_server_state_display.setColor("Red")
-            self.communication_thread["UDP"] = None
+            self.communication_links["UDP"] = None
 
         # 按钮
-        if self.communication_thread["UDP"]:
+        if self.communication_links["UDP"]:
             self.udp_server_button.setText("关闭UDP服务器")
         else:
             self.udp_server_button.setText("启动UDP服务器")
 
+    def update_link_statistics(self):
+        now = time.monotonic()
+        for row, (name, link) in enumerate(self.communication_links.items()):
+            if not link:
+                self.previous_statistics.pop(name, None)
+                values = ["-"] * len(self.link_statistics_columns)
+            else:
+                statistics = link.statistics()
+                # 速率由相邻两次采样的累计计数之差计算，链路更换后重新开始
+                previous_link, previous_time, previous = self.previous_statistics.get(name, (None, now, statistics))
+                if previous_link is not link:
+                    previous_time, previous = now, statistics
+                self.previous_statistics[name] = (link, now, statistics)
+                elapsed = now - previous_time
+
+                def rate(key, digits=0):
+                    if elapsed <= 0:
+                        return "-"
+                    return f"{(statistics[key] - previous[key]) / elapsed:.{digits}f}"
+
+                age = statistics["最近帧间隔"]
+                # 成绩帧与 Reset 频率很低，速率保留两位小数
+                values = [
+                    rate("字节数"),
+                    rate("实时帧"),
+                    rate("成绩帧", 2),
+                    rate("Reset", 2),
+                    str(statistics["成绩帧"]),
+                    str(statistics["Reset"]),
+                    str(statistics["丢弃字节"]),
+                    f"{statistics['抖动'] * 1000:.2f}",
+                    "-" if age is None else f"{age:.1f}",
+                    str(statistics["待解码字节"]),
+                ]
+
+            for column, value in enumerate(values):
+                item = self.link_statistics_table.item(row, column)
+                if item.text() != value:
+                    item.setText(value)
+
+        if self.mailbox is not None:
+            self.update_mailbox_statistics(now)
+
+    def update_mailbox_statistics(self, now):
+        statistics = self.mailbox.statistics()
+        previous_time, previous = self.previous_mailbox_statistics or (now, statistics)
+        self.previous_mailbox_statistics = (now, statistics)
+        elapsed = now - previous_time
+
+        def rate(key):
+            return f"{(statistics[key] - previous[key]) / elapsed:.0f}" if elapsed > 0 else "-"
+
+        text = (f"界面邮箱：实时帧 {rate('实时帧')}/秒，合并 {rate('合并实时帧')}/秒"
+                f"（累计 {statistics['合并实时帧']}），成绩与 Reset 前丢弃 {statistics['丢弃实时帧']}，"
+                f"待处理事件 {statistics['待处理事件']}")
+        if self.mailbox_statistics_display.text() != text:
+            self.mailbox_statistics_display.setText(text)
+
     def update_ui(self):
         self.update_serial_connect_state()
         self.update_tcp_server_state()
         self.update_udp_server_state()
+        self.update_link_statistics()
         self.refresh_serial_ports()
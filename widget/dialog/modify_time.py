@@ -6,7 +6,8 @@ from widget.common import *
 
 
 class ModifyTimeDialog(QDialog):
-    setting_saved = Signal()
+    # (比赛阶段, 剩余时间)，由控制台写入比赛记录
+    setting_saved = Signal(str, int)
 
     def __init__(self, team):
         super().__init__()
@@ -38,7 +39,5 @@ class ModifyTimeDialog(QDialog):
         self.setLayout(layout)
 
     def save_data(self):
-        self.team["比赛阶段"] = self.modify_phase.currentText()
-        self.team["剩余时间"] = self.modify_remaining_time.value()
-        self.setting_saved.emit()
+        self.setting_saved.emit(self.modify_phase.currentText(), self.modify_remaining_time.value())
         self.accept()
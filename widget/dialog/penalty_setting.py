@@ -2,13 +2,15 @@
 
 from copy import deepcopy
 
-import pandas as pd
 from PySide6.QtCore import QSize, Signal
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QDialog, QMessageBox, QFileDialog, QSpinBox, QScrollArea,
-                               QHBoxLayout, QSpacerItem, QSizePolicy, QGridLayout, QToolButton)
+                               QHBoxLayout, QGridLayout, QToolButton)
 
+from utils import *
 from widget.common import *
 
+pd = lazy_import("pandas")
+
 
 class PenaltySettingDialog(QDialog):
     setting_saved = Signal()
@@ -48,7 +50,26 @@ class PenaltySettingDialog(QDialog):
         layout.addLayout(button_layout)
 
         self.setLayout(layout)
-        self.fixed_layout()
+
+        # 罚时列表的控件只创建一次，之后随罚时种类的增删显示、隐藏或修改内容
+        self.empty_label = create_label("罚时种类为空，请手动导入！")
+        self.penalty_layout.addWidget(self.empty_label, 1, 0, 1, 2)
+        self.type_label = create_label("罚时种类")
+        self.penalty_layout.addWidget(self.type_label, 0, 0)
+        self.duration_label = create_label("时长")
+        self.penalty_layout.addWidget(self.duration_label, 0, 1)
+
+        self.add_type = create_line_edit(alignment=Qt.AlignmentFlag.AlignCenter)
+        self.add_duration = create_spin_box(QSpinBox, min_value=-32768, max_value=32767, suffix=" 秒",
+                                            alignment=Qt.AlignmentFlag.AlignCenter)
+        self.add_button = QToolButton()
+        self.add_button.setText("+")
+        self.add_button.setFixedSize(QSize(20, 20))
+        self.add_button.clicked.connect(lambda: self.add_penalty(self.add_type.text(), self.add_duration.value()))
+        self.add_row = None
+
+        # 每行的 (罚时种类输入框, 时长输入框, 删除按钮)
+        self.penalty_rows = []
 
         self.update_penalty_list()
 
@@ -97,74 +118,54 @@ class PenaltySettingDialog(QDialog):
                 QMessageBox.critical(self, "错误", f"读取文件时出错：{e}")
 
     def update_penalty_list(self):
-        # 清除罚时面板中的所有控件
-        for i in reversed(range(self.penalty_layout.count())):
-            item = self.penalty_layout.itemAt(i)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-        if not self.penalties:
-            spacer_top = QSpacerItem(0, 40, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-            self.penalty_layout.addItem(spacer_top, 0, 0, 1, 2)
-
-            empty_label = create_label("罚时种类为空，请手动导入！")
-            self.penalty_layout.addWidget(empty_label, 1, 0, 1, 2)
-
-            spacer_bottom = QSpacerItem(0, 40, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-            self.penalty_layout.addItem(spacer_bottom, 2, 0, 1, 2)
-        else:
-            type_label = create_label("罚时种类")
-            self.penalty_layout.addWidget(type_label, 0, 0)
-
-            duration_label = create_label("时长")
-            self.penalty_layout.addWidget(duration_label, 0, 1)
-
-            button_size = QSize(20, 20)
-            for number, (penalty_type, penalty_duration) in enumerate(self.penalties):
-                set_type = create_line_edit(text=penalty_type, alignment=Qt.AlignmentFlag.AlignCenter)
-                set_type.editingFinished.connect(
-                    lambda line_edit=set_type, n=number: self.update_penalty_text(n, line_edit))
-                self.penalty_layout.addWidget(set_type, number + 1, 0)
-
-                set_duration = create_spin_box(QSpinBox, min_value=-32768, max_value=32767,
-                                               current_value=penalty_duration, suffix=" 秒",
-                                               alignment=Qt.AlignmentFlag.AlignCenter)
-                set_duration.editingFinished.connect(
-                    lambda spinbox=set_duration, n=number: self.update_penalty_duration(n, spinbox))
-                self.penalty_layout.addWidget(set_duration, number + 1, 1)
-
-                remove_button = QToolButton()
-                remove_button.setText("-")
-                remove_button.setFixedSize(button_size)
-                remove_button.clicked.connect(lambda _, n=number: self.remove_penalty(n))
-                self.penalty_layout.addWidget(remove_button, number + 1, 2)
-
-            add_type = create_line_edit(alignment=Qt.AlignmentFlag.AlignCenter)
-            self.penalty_layout.addWidget(add_type, len(self.penalties) + 1, 0)
-
-            add_duration = create_spin_box(QSpinBox, min_value=-32768, max_value=32767, suffix=" 秒",
-                                           alignment=Qt.AlignmentFlag.AlignCenter)
-            self.penalty_layout.addWidget(add_duration, len(self.penalties) + 1, 1)
-
-            add_button = QToolButton()
-            add_button.setText("+")
-            add_button.setFixedSize(button_size)
-            add_button.clicked.connect(lambda: self.add_penalty(add_type.text(), add_duration.value()))
-            self.penalty_layout.addWidget(add_button, len(self.penalties) + 1, 2)
-
-            self.fixed_layout()
-
-    def fixed_layout(self):
-        total_rows = 4
-        total_columns = 3
-
-        for row in range(total_rows):
-            for column in range(total_columns):
-                if self.penalty_layout.itemAtPosition(row, column) is None:
-                    placeholder = QWidget()
-                    placeholder.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-                    self.penalty_layout.addWidget(placeholder, row, column)
+        empty = not self.penalties
+        self.empty_label.setVisible(empty)
+        self.type_label.setVisible(not empty)
+        self.duration_label.setVisible(not empty)
+
+        for number, (penalty_type, penalty_duration) in enumerate(self.penalties):
+            if number == len(self.penalty_rows):
+                self.penalty_rows.append(self.create_penalty_row(number))
+            set_type, set_duration, remove_button = self.penalty_rows[number]
+            if set_type.text() != penalty_type:
+                set_type.setText(penalty_type)
+            if set_duration.value() != penalty_duration:
+                set_duration.setValue(penalty_duration)
+            for widget in self.penalty_rows[number]:
+                widget.show()
+        for row in self.penalty_rows[len(self.penalties):]:
+            for widget in row:
+                widget.hide()
+
+        # 添加罚时的一行始终位于列表末尾，其下一行占据剩余空间，使列表靠上排列
+        add_widgets = (self.add_type, self.add_duration, self.add_button)
+        if self.add_row != len(self.penalties) + 1:
+            if self.add_row is not None:
+                self.penalty_layout.setRowStretch(self.add_row + 1, 0)
+            self.add_row = len(self.penalties) + 1
+            self.penalty_layout.setRowStretch(self.add_row + 1, 1)
+            for column, widget in enumerate(add_widgets):
+                self.penalty_layout.removeWidget(widget)
+                self.penalty_layout.addWidget(widget, self.add_row, column)
+        for widget in add_widgets:
+            widget.setVisible(not empty)
+
+    def create_penalty_row(self, number):
+        set_type = create_line_edit(alignment=Qt.AlignmentFlag.AlignCenter)
+        set_type.editingFinished.connect(lambda: self.update_penalty_text(number, set_type))
+        self.penalty_layout.addWidget(set_type, number + 1, 0)
+
+        set_duration = create_spin_box(QSpinBox, min_value=-32768, max_value=32767, suffix=" 秒",
+                                       alignment=Qt.AlignmentFlag.AlignCenter)
+        set_duration.editingFinished.connect(lambda: self.update_penalty_duration(number, set_duration))
+        self.penalty_layout.addWidget(set_duration, number + 1, 1)
+
+        remove_button = QToolButton()
+        remove_button.setText("-")
+        remove_button.setFixedSize(QSize(20, 20))
+        remove_button.clicked.connect(lambda: self.remove_penalty(number))
+        self.penalty_layout.addWidget(remove_button, number + 1, 2)
+        return set_type, set_duration, remove_button
 
     def remove_penalty(self, penalty_id):
         if 0 <= penalty_id < len(self.penalties):
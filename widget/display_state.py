@@ -0,0 +1,54 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class DisplayState(QObject):
+    """
+    控制台与投屏窗口共用的显示状态。
+
+    字段为显示文本（如 "remaining_time": "1 分 30 秒"），update 只记录与当前值不同的字段，
+    同一轮事件循环中的多次修改合并为一次 changed 信号，各窗口据此只更新发生变化的标签，
+    所有窗口收到的是同一组修改，显示内容始终一致。
+    """
+    changed = Signal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = {}
+        self._pending = {}
+        self._scheduled = False
+
+    def update(self, **fields):
+        """ 修改字段，在本轮事件循环结束后发出 changed。 """
+        for field, text in fields.items():
+            if self.values.get(field) != text:
+                self.values[field] = text
+                self._pending[field] = text
+        if self._pending and not self._scheduled:
+            self._scheduled = True
+            QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        changes = self._pending
+        self._pending = {}
+        self._scheduled = False
+        self.changed.emit(changes)
+
+    def subscribe(self, labels):
+        """
+        把字段绑定到标签：立即显示当前的全部字段，之后随 changed 更新。
+
+        :param labels: dict，字段到 QLabel 的映射，不需要的字段不必绑定。
+        :return: callable，传给 unsubscribe 以解除绑定。
+        """
+        def apply(changes):
+            for field, text in changes.items():
+                label = labels.get(field)
+                if label is not None:
+                    label.setText(text)
+
+        apply(self.values)
+        self.changed.connect(apply)
+        return apply
+
+    def unsubscribe(self, apply):
+        self.changed.disconnect(apply)
@@ -0,0 +1,83 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+EMPTY_RECORD_TEXT = "暂无成绩"
+
+
+class RecordListModel(QAbstractListModel):
+    """
+    当前队伍成绩列表的模型，供选择成绩的下拉框使用。
+
+    模型直接读取队伍的成绩列表，事件应用后由控制台通知哪一行发生了变化，只发出该行的
+    dataChanged / rowsInserted / rowsRemoved 信号，视图据此保持当前选中的成绩，无需清空重建。
+    每个成绩的显示文本在首次显示时格式化并缓存，该成绩变化时才失效。
+    没有成绩时显示一行“暂无成绩”。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        # 视图已知的每一行的显示文本，None 表示需要重新格式化
+        self._texts = []
+
+    def set_team(self, team):
+        """ 切换到另一支队伍（导入名单、切换队伍或新建比赛记录后调用）。 """
+        self.beginResetModel()
+        self.records = team.records
+        self._texts = [None] * len(self.records)
+        self.endResetModel()
+
+    def has_records(self):
+        return bool(self._texts)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._texts) or 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if not self._texts:
+                return EMPTY_RECORD_TEXT
+            row = index.row()
+            text = self._texts[row]
+            if text is None:
+                record = self.records[row]
+                text = self._texts[row] = f"{record.raw_time:.3f}+{record.total_penalty} ({record.state})"
+            return text
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def record_inserted(self, row):
+        """
+        队伍的成绩列表在 row 处插入了一个成绩。
+
+        :param row: int，新成绩的序号。
+        """
+        if not self._texts:
+            # 第一个成绩替换“暂无成绩”所在的行
+            self._texts.append(None)
+            self._row_changed(0)
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._texts.insert(row, None)
+        self.endInsertRows()
+
+    def record_removed(self, row):
+        """ 队伍的成绩列表删除了第 row 个成绩。 """
+        if len(self._texts) == 1:
+            self._texts.clear()
+            self._row_changed(0)
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._texts[row]
+        self.endRemoveRows()
+
+    def record_changed(self, row):
+        """ 第 row 个成绩的状态或罚时发生了变化。 """
+        self._texts[row] = None
+        self._row_changed(row)
+
+    def _row_changed(self, row):
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
@@ -0,0 +1,236 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QPointF, QRect, Signal
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QKeyEvent, QPainter, QPixmap
+from PySide6.QtWidgets import QWidget
+
+ATTENTION_TEXT = ">>>>>>>>>>  北科大智能车队提醒您，冷静发车，赛出实力！ <<<<<<<<<<"
+
+# 投屏布局
+LAYOUT_SCOREBOARD = "记分板"
+LAYOUT_LEADERBOARD = "排行榜"
+PROJECTOR_LAYOUTS = [LAYOUT_SCOREBOARD, LAYOUT_LEADERBOARD]
+
+
+class GlyphCache:
+    """
+    字符位图缓存：每个 (字符, 字体, 颜色) 只绘制一次。
+
+    投屏的字号较大（4K 下约 100 像素），Qt 不会缓存这么大的字形，每次绘制都要重新光栅化轮廓；
+    记分板改为逐字符贴图，数字、冒号等常用字符只在第一次出现时绘制。
+    队名、队员名的汉字种类多，窗口缩放或换屏后字号也会变化，缓存按位图字节数限制大小，
+    超出时淘汰最久未使用的字符（4K 下一个大号字符约 77 KB，默认 32 MB 可缓存数百个字符）。
+    """
+
+    def __init__(self, capacity=32 * 1024 * 1024):
+        """
+        :param capacity: int，缓存位图的总字节数上限。
+        """
+        self.capacity = capacity
+        self.size = 0
+        self.glyphs = OrderedDict()
+
+    def glyph(self, char, font, color, device_pixel_ratio=1.0):
+        """
+        :return: QPixmap，字符的位图（透明背景，宽为字符的步进宽度，高为行距）。
+        """
+        key = (char, font.pixelSize(), font.bold(), color.rgba(), device_pixel_ratio)
+        pixmap = self.glyphs.get(key)
+        if pixmap is not None:
+            self.glyphs.move_to_end(key)
+        else:
+            metrics = QFontMetrics(font)
+            pixmap = QPixmap(max(1, round(metrics.horizontalAdvance(char) * device_pixel_ratio)),
+                             max(1, round(metrics.height() * device_pixel_ratio)))
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+            painter.setFont(font)
+            painter.setPen(color)
+            painter.drawText(0, metrics.ascent(), char)
+            painter.end()
+            self.glyphs[key] = pixmap
+            self.size += self._bytes(pixmap)
+            # 至少保留刚绘制的字符
+            while self.size > self.capacity and len(self.glyphs) > 1:
+                _, evicted = self.glyphs.popitem(last=False)
+                self.size -= self._bytes(evicted)
+        return pixmap
+
+    @staticmethod
+    def _bytes(pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+
+class ScoreboardField:
+    """
+    记分板上的一个区域：文本、颜色、字体与排好版的字符位图。
+
+    文本或字体变化时才重新排版，setText 只请求重绘本区域，与 QLabel 的接口一致，可直接绑定到显示状态。
+    """
+
+    def __init__(self, window, color, text=""):
+        self.window = window
+        self.color = QColor(color)
+        self.text = text
+        self.rect = QRect()
+        self.font = None
+        self.glyphs = None
+
+    def setText(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        self.glyphs = None
+        self.window.update(self.rect)
+
+    def set_geometry(self, rect, font):
+        self.rect = rect
+        if font is not self.font:
+            self.font = font
+            self.glyphs = None
+
+    def _prepare(self):
+        # 超出区域宽度的行以省略号结尾，每行在区域内居中，多行整体垂直居中
+        metrics = QFontMetrics(self.font)
+        lines = self.text.split("\n") if self.text else []
+        line_height = metrics.lineSpacing()
+        top = self.rect.top() + (self.rect.height() - line_height * len(lines)) / 2
+        ratio = self.window.devicePixelRatioF()
+        self.glyphs = []
+        for row, line in enumerate(lines):
+            line = metrics.elidedText(line, Qt.TextElideMode.ElideRight, self.rect.width())
+            pixmaps = [self.window.glyph_cache.glyph(char, self.font, self.color, ratio) for char in line]
+            left = self.rect.left() + (self.rect.width() - sum(pixmap.deviceIndependentSize().width()
+                                                                 for pixmap in pixmaps)) / 2
+            for char, pixmap in zip(line, pixmaps):
+                if not char.isspace():
+                    self.glyphs.append((QPointF(left, top + row * line_height), pixmap))
+                left += pixmap.deviceIndependentSize().width()
+
+    def paint(self, painter):
+        if self.glyphs is None:
+            self._prepare()
+        for position, pixmap in self.glyphs:
+            painter.drawPixmap(position, pixmap)
+
+
+class ScoreboardWindow(QWidget):
+    """
+    自绘的投屏记分板，与 FullScreenWindow 的 display_labels 接口一致。
+
+    布局为 LAYOUT_SCOREBOARD 时与 FullScreenWindow 相同，为 LAYOUT_LEADERBOARD 时只显示标题与排行榜。
+    多个窗口可以共用同一个 GlyphCache，相同字号与颜色的字符只绘制一次。
+
+    整个记分板在一次 paintEvent 中绘制，不使用样式表和 QLabel；字段更新时只重绘该字段的区域，
+    文字由缓存的字符位图拼接，字体按窗口分辨率计算并按像素大小缓存。
+    """
+    # 窗口关闭（包括按 Esc）时发出，控制台据此取消显示状态的订阅
+    closed = Signal()
+
+    # 信息区：(说明, 字段, 字段颜色)，每行两组
+    GRID = [
+        [("比赛进度", "progress", "#FFA500"), ("下支队伍", "next_team", "#FFA500")],
+        [("队伍号", "team_id", "#FFA500"), ("实时时间", "real_time", "white")],
+        [("队伍名称", "team_name", "#FFA500"), ("最好成绩", "best_record", "#FF0000")],
+        [("队伍成员", "team_members", "#FFA500"), ("剩余时间", "remaining_time", "white")],
+    ]
+
+    def __init__(self, configuration, glyph_cache=None, board_layout=LAYOUT_SCOREBOARD):
+        """
+        :param configuration: dict，配置。
+        :param glyph_cache: GlyphCache，字符位图缓存，默认新建。
+        :param board_layout: str，PROJECTOR_LAYOUTS 之一。
+        """
+        super().__init__()
+        self.configuration = configuration
+        self.glyph_cache = glyph_cache or GlyphCache()
+        self.board_layout = board_layout
+        self.setWindowTitle(f"投屏窗口 - {board_layout}")
+        # 每次绘制都会先填充背景，无需 Qt 预先擦除
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.font_cache = {}
+
+        self.title = ScoreboardField(self, "#FFD700")
+        self.subheading = ScoreboardField(self, "#FFD700")
+        self.attention = ScoreboardField(self, "#FFFF00", text=ATTENTION_TEXT)
+        self.captions = []
+        self.display_labels = {"title": self.title, "subheading": self.subheading}
+        self.grid = board_layout == LAYOUT_SCOREBOARD
+        if self.grid:
+            for row in self.GRID:
+                for caption, field, color in row:
+                    self.captions.append(ScoreboardField(self, "white", text=caption))
+                    self.display_labels[field] = ScoreboardField(self, color)
+
+        self.leaderboard = None
+        if not self.grid or self.configuration["投屏显示排行榜"]:
+            self.leaderboard = ScoreboardField(self, "#00FF7F")
+            self.display_labels["leaderboard"] = self.leaderboard
+
+        self.fields = [self.attention] + self.captions + list(self.display_labels.values())
+
+    def _font(self, pixel_size, bold=False):
+        pixel_size = max(8, int(pixel_size))
+        font = self.font_cache.get((pixel_size, bold))
+        if font is None:
+            font = QFont()
+            font.setPixelSize(pixel_size)
+            font.setBold(bold)
+            self.font_cache[(pixel_size, bold)] = font
+        return font
+
+    def resizeEvent(self, event):
+        # 按窗口大小划分区域：标题、组别、四行信息、排行榜、提示，字体随区域大小变化
+        width, height = self.width(), self.height()
+        grid_rows = len(self.GRID) if self.grid else 0
+        leaderboard_lines = self.configuration["排行榜显示数量"] if self.leaderboard else 0
+        # 只显示排行榜时每行更高
+        line_size = 0.5 if self.grid else 0.9
+        units = 1.2 + 1.4 + grid_rows * 1.4 + leaderboard_lines * line_size + 1.2
+        unit = height / units
+        top = 0
+
+        def band(size):
+            nonlocal top
+            rect = QRect(0, round(top), width, round(top + size * unit) - round(top))
+            top += size * unit
+            return rect
+
+        self.title.set_geometry(band(1.2), self._font(unit * 0.6, True))
+        self.subheading.set_geometry(band(1.4), self._font(unit * 0.8, True))
+
+        column_width = width / 4
+        row_height = 1.4 * unit
+        grid_font = self._font(min(row_height * 0.5, column_width / 8))
+        grid_top = top
+        band(grid_rows * 1.4)
+        for row, items in enumerate(self.GRID[:grid_rows]):
+            for pair, (_, field, _) in enumerate(items):
+                for offset, target in enumerate((self.captions[row * 2 + pair], self.display_labels[field])):
+                    column = pair * 2 + offset
+                    rect = QRect(round(column * column_width), round(grid_top + row * row_height),
+                                 round((column + 1) * column_width) - round(column * column_width), round(row_height))
+                    target.set_geometry(rect, grid_font)
+
+        if self.leaderboard:
+            self.leaderboard.set_geometry(band(leaderboard_lines * line_size), self._font(unit * line_size * 0.7))
+        self.attention.set_geometry(band(1.2), self._font(min(unit * 0.5, width / 45), True))
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        region = event.rect()
+        painter.fillRect(region, Qt.GlobalColor.black)
+        for field in self.fields:
+            if field.rect.intersects(region):
+                field.paint(painter)
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if event.key() == Qt.Key.Key_Escape:
+            self.close()
+
+    def closeEvent(self, event):
+        self.closed.emit()
+        super().closeEvent(event)
@@ -1,3 +1,4 @@
+from PySide6.QtCore import Signal
 from PySide6.QtGui import QFont, QKeyEvent
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QGridLayout
 
@@ -5,10 +6,17 @@ from .common import *
 
 
 class FullScreenWindow(QWidget):
-    def __init__(self, configuration, race_data):
+    # 窗口关闭（包括按 Esc）时发出，控制台据此取消显示状态的订阅
+    closed = Signal()
+
+    def __init__(self, configuration):
+        """
+        投屏窗口只负责布局，显示内容由控制台的显示状态推送（见 display_labels）。
+
+        :param configuration: dict，配置。
+        """
         super().__init__()
         self.configuration = configuration
-        self.race_data = race_data
         self.initialization = False
         self.setWindowTitle("投屏窗口")
 
@@ -33,11 +41,11 @@ class FullScreenWindow(QWidget):
         self.font.setPointSize(30)
 
         # 标题
-        self.title = create_label(self.configuration["比赛名称"] + self.configuration["比赛阶段"], font=self.fontTitle,
+        self.title = create_label(font=self.fontTitle,
                                   style="color: #FFD700; font: bold; margin-top: 30px; margin-bottom: 10px;")
         layout.addWidget(self.title)
 
-        self.subheading = create_label(self.configuration["比赛组别"], font=self.font,
+        self.subheading = create_label(font=self.font,
                                        style="color: #FFD700; font: bold; margin-top: 10px; margin-bottom: 20px;")
         layout.addWidget(self.subheading)
 
@@ -99,6 +107,13 @@ class FullScreenWindow(QWidget):
 
         layout.addLayout(grid_layout)
 
+        # 排行榜（可选）
+        if self.configuration["投屏显示排行榜"]:
+            self.leaderboard_font = QFont()
+            self.leaderboard_font.setPointSize(20)
+            self.leaderboard_display = create_label(font=self.leaderboard_font, style="color: #00FF7F;")
+            layout.addWidget(self.leaderboard_display)
+
         # 提示
         attention = create_label(">>>>>>>>>>  北科大智能车队提醒您，冷静发车，赛出实力！ <<<<<<<<<<", font=self.font,
                                  style="color: #FFFF00; font: bold; margin-top: 30px; margin-bottom: 30px;")
@@ -107,6 +122,22 @@ class FullScreenWindow(QWidget):
         self.setLayout(layout)
         self.initialization = True
 
+        # 显示状态字段到标签的映射
+        self.display_labels = {
+            "title": self.title,
+            "subheading": self.subheading,
+            "progress": self.progress_display,
+            "next_team": self.next_team_display,
+            "team_id": self.team_id_display,
+            "real_time": self.real_time_display,
+            "team_name": self.team_name_display,
+            "best_record": self.best_record_display,
+            "team_members": self.team_members_display,
+            "remaining_time": self.remaining_time_display,
+        }
+        if self.configuration["投屏显示排行榜"]:
+            self.display_labels["leaderboard"] = self.leaderboard_display
+
     def resizeEvent(self, event):
         width = self.width()
         new_font_size = max(10, width // 30)
@@ -116,3 +147,7 @@ class FullScreenWindow(QWidget):
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key.Key_Escape:
             self.close()
+
+    def closeEvent(self, event):
+        self.closed.emit()
+        super().closeEvent(event)